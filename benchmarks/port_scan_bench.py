@@ -0,0 +1,207 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+# Offline throughput benchmark for modules/scan_engine.py (Linux).
+#
+# A stand-in server process listens on loopback with four kinds of ports:
+#   open       - listening and accepting
+#   closed     - nothing bound, the kernel answers with RST
+#   blackhole  - listen(0) with the accept queue pre-filled, so further SYNs are
+#                dropped and the scanner sees a filtered port (connect timeout)
+#   delayed    - accepting, but the greeting is held back for --delay-ms, which
+#                exercises the banner stage's read deadline
+# The scanner runs in this process so CPU time and FD counts are its own.
+#
+#   python benchmarks/port_scan_bench.py --open 2000 --closed 2000 --blackhole 50
+#   python benchmarks/port_scan_bench.py --open 500 --delayed 100 --banners --json
+#   python benchmarks/port_scan_bench.py --min-pps 5000   # exit 1 below the floor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.scan_engine import PortScanEngine  # noqa: E402
+
+
+def raise_fd_limit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else max(soft, 65536), hard))
+
+
+def _listener(backlog=1024):
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(('127.0.0.1', 0))
+    s.listen(backlog)
+    return s
+
+
+def serve(conn, n_open, n_closed, n_blackhole, n_delayed, delay_ms):
+    # Runs in a child process; sends back the port lists and serves until told to stop
+    import selectors
+    raise_fd_limit()
+    sel = selectors.DefaultSelector()
+    ports = {'open': [], 'closed': [], 'blackhole': [], 'delayed': []}
+    keep = []
+    for _ in range(n_open):
+        s = _listener()
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ, 'open')
+        ports['open'].append(s.getsockname()[1])
+    for _ in range(n_delayed):
+        s = _listener()
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ, 'delayed')
+        ports['delayed'].append(s.getsockname()[1])
+    for _ in range(n_blackhole):
+        s = _listener(0)
+        # Fill the accept queue so later SYNs are silently dropped
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.setblocking(False)
+        filler.connect_ex(s.getsockname())
+        keep.extend((s, filler))
+        ports['blackhole'].append(s.getsockname()[1])
+    for _ in range(n_closed):
+        s = _listener()
+        ports['closed'].append(s.getsockname()[1])
+        s.close()
+    time.sleep(0.2)
+    conn.send(ports)
+    pending = []
+    while not conn.poll():
+        now = time.monotonic()
+        for key, _ in sel.select(0.01):
+            try:
+                client, _ = key.fileobj.accept()
+            except OSError:
+                continue
+            if key.data == 'delayed':
+                pending.append((now + delay_ms / 1000, client))
+            else:
+                client.close()
+        due = [c for t, c in pending if t <= now]
+        pending = [(t, c) for t, c in pending if t > now]
+        for client in due:
+            try:
+                client.sendall(b'SSH-2.0-BenchServer_1.0\r\n')
+            except OSError:
+                pass
+            client.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def count_fds():
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def run_bench(args, ports):
+    targets = ports['open'] + ports['closed'] + ports['blackhole'] + ports['delayed']
+    targets.sort()
+    latencies = []
+    states = {}
+    services = [0]
+    peak = [count_fds() or 0]
+    done = threading.Event()
+
+    def watch_fds():
+        while not done.is_set():
+            n = count_fds()
+            if n is not None and n > peak[0]:
+                peak[0] = n
+            time.sleep(0.005)
+
+    def on_result(host, port, state, elapsed):
+        latencies.append(elapsed)
+        states[state] = states.get(state, 0) + 1
+
+    def on_service(host, port, service, version, banner):
+        services[0] += 1
+
+    engine = PortScanEngine(concurrency=args.concurrency, max_timeout=args.max_timeout, rate=args.rate,
+                            per_host=args.per_host, banners=args.banners, banner_timeout=args.banner_timeout)
+    watcher = threading.Thread(target=watch_fds, daemon=True)
+    watcher.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    engine.run(['127.0.0.1'], targets, on_result, on_service=on_service)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    done.set()
+    watcher.join()
+    return {
+        'ports': len(targets),
+        'seconds': round(wall, 3),
+        'ports_per_second': round(len(targets) / wall, 1) if wall else None,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_percent': round(100 * cpu / wall, 1) if wall else None,
+        'peak_fds': peak[0],
+        'attempts': engine.attempts,
+        'states': states,
+        'services': services[0] if args.banners else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the port scan engine against a local many-port server')
+    parser.add_argument('--open', type=int, default=1000, help='listening ports')
+    parser.add_argument('--closed', type=int, default=2000, help='unbound ports (RST)')
+    parser.add_argument('--blackhole', type=int, default=20, help='ports that drop SYNs (filtered)')
+    parser.add_argument('--delayed', type=int, default=0, help='ports whose banner is delayed')
+    parser.add_argument('--delay-ms', type=float, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=500)
+    parser.add_argument('--rate', type=float, default=0)
+    parser.add_argument('--per-host', type=int, default=0)
+    parser.add_argument('--max-timeout', type=float, default=10)
+    parser.add_argument('--banners', action='store_true')
+    parser.add_argument('--banner-timeout', type=float, default=1.0)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print one JSON object per run')
+    parser.add_argument('--min-pps', type=float, default=0, help='exit with status 1 if any run is slower')
+    args = parser.parse_args(argv)
+
+    raise_fd_limit()
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child, args.open, args.closed, args.blackhole, args.delayed, args.delay_ms), daemon=True)
+    server.start()
+    try:
+        ports = parent.recv()
+        status = 0
+        for i in range(args.repeat):
+            result = run_bench(args, ports)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"run {i + 1}: {result['ports']} ports in {result['seconds']} s = {result['ports_per_second']} ports/s | "
+                      f"p50 {result['p50_ms']} ms p99 {result['p99_ms']} ms max {result['max_ms']} ms | "
+                      f"cpu {result['cpu_seconds']} s ({result['cpu_percent']}%) | peak fds {result['peak_fds']} | {result['states']}")
+            if args.min_pps and (result['ports_per_second'] or 0) < args.min_pps:
+                status = 1
+        return status
+    finally:
+        parent.send('stop')
+        server.join(5)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
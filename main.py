@@ -1,4 +1,10 @@
 import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == '--cli':
+    # Headless mode: dispatch before anything imports PyQt6
+    from modules.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[2:]))
+
 from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget
 from shared.theme import apply_oled_theme
 
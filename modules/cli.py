@@ -0,0 +1,359 @@
+import argparse
+import json
+import sys
+import time
+
+# Headless entry point: `python main.py --cli <command> ...`.
+# Every result is written to stdout as one JSON object per line as soon as it is
+# known, so output can be piped into jq or collected by cron/CI. Nothing in here
+# (or in the modules it imports) may pull in PyQt6.
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, default=str) + '\n')
+    sys.stdout.flush()
+
+
+def cmd_scan(args):
+    from modules.scan_engine import PortScanEngine, parse_hosts, parse_ports, OPEN, ERROR
+    from modules.service_probe import printable
+    hosts = parse_hosts(args.hosts)
+    ports = parse_ports(args.ports)
+    engine = PortScanEngine(concurrency=args.concurrency, max_timeout=args.max_timeout, banners=args.banners,
+                            rate=args.rate, per_host=args.per_host)
+    rows = []
+    counts = {}
+
+    def on_result(host, port, state, elapsed):
+        if state == ERROR and port == 0:
+            emit({'type': 'error', 'host': host, 'error': 'could not resolve host'})
+            return
+        counts[state] = counts.get(state, 0) + 1
+        rows.append((host, port, state, elapsed, time.time(), None))
+        if state == OPEN or args.all:
+            emit({'type': 'port', 'host': host, 'port': port, 'state': state, 'ms': round(elapsed, 2)})
+
+    def on_host(host, alive):
+        emit({'type': 'host', 'host': host, 'alive': alive})
+
+    def on_service(host, port, service, version, banner):
+        emit({'type': 'service', 'host': host, 'port': port, 'service': service, 'version': version, 'banner': printable(banner)})
+
+    started = time.time()
+    engine.run(hosts, ports, on_result, discover=not args.no_discover and len(hosts) > 1,
+               on_host=on_host, on_service=on_service)
+    if args.history:
+        from modules.scan_history import ScanHistory
+        history = ScanHistory()
+        try:
+            run_id = history.start_run(args.hosts, args.ports, started)
+            history.add_results(run_id, rows)
+            history.finish_run(run_id)
+            previous_id, opened, closed = history.diff(run_id)
+        finally:
+            history.close()
+        emit({'type': 'diff', 'run_id': run_id, 'previous_run_id': previous_id,
+              'opened': [c[:2] for c in opened], 'closed': [c[:2] for c in closed]})
+    seconds = time.time() - started
+    emit({'type': 'summary', 'hosts': len(hosts), 'ports': len(ports), 'states': counts,
+          'seconds': round(seconds, 3), 'ports_per_second': round(sum(counts.values()) / seconds, 1) if seconds else None})
+    return 0
+
+
+def cmd_dns(args):
+    from modules.dns_lookup import lookup, bulk_lookup, bulk_row, parse_domains, RECORD_TYPES, BULK_TYPES
+    if args.bulk:
+        # One record per domain, streamed in completion order
+        types = tuple(t.upper() for t in args.types.split(',')) if args.types else BULK_TYPES
+        domains = parse_domains(' '.join(args.domains))
+        started = time.time()
+        bulk_lookup(domains, lambda *result: emit({'type': 'dns_bulk', **bulk_row(*result, types=types)}),
+                    types=types, concurrency=args.concurrency, deadline=args.deadline)
+        seconds = time.time() - started
+        emit({'type': 'summary', 'domains': len(domains), 'seconds': round(seconds, 3),
+              'domains_per_second': round(len(domains) / seconds, 1) if seconds else None})
+        return 0
+    types = tuple(t.upper() for t in args.types.split(',')) if args.types else RECORD_TYPES
+    for domain in args.domains:
+        lookup(domain, lambda rtype, values, error: emit({'type': 'dns', 'domain': domain, 'rtype': rtype,
+                                                          'values': values, 'error': error}),
+               types=types, deadline=args.deadline)
+    return 0
+
+
+def cmd_ptr(args):
+    from modules.dns_lookup import ptr_sweep, ptr_row, parse_addresses
+    addresses = parse_addresses(' '.join(args.ranges))
+    named = [0]
+
+    def on_result(address, names, error):
+        if names:
+            named[0] += 1
+        if names or args.all:
+            emit({'type': 'ptr', **ptr_row(address, names, error)})
+
+    started = time.time()
+    ptr_sweep(addresses, on_result, concurrency=args.concurrency, deadline=args.deadline)
+    emit({'type': 'summary', 'addresses': len(addresses), 'named': named[0], 'seconds': round(time.time() - started, 3)})
+    return 0
+
+
+def cmd_subdomains(args):
+    from modules.dns_lookup import enumerate_subdomains, subdomain_row, parse_domains, DEFAULT_WORDS
+    words = parse_domains(args.wordlist) if args.wordlist else list(DEFAULT_WORDS)
+    started = time.time()
+    tried, hits, filtered = enumerate_subdomains(
+        args.domain, words, lambda *hit: emit({'type': 'subdomain', **subdomain_row(*hit)}),
+        concurrency=args.concurrency, deadline=args.deadline,
+        on_wildcard=lambda addresses: emit({'type': 'wildcard', 'domain': args.domain, 'addresses': addresses}))
+    emit({'type': 'summary', 'tried': tried, 'found': hits, 'wildcard_filtered': filtered,
+          'seconds': round(time.time() - started, 3)})
+    return 0
+
+
+def cmd_resolvers(args):
+    from modules.resolver_bench import bench, parse_queries, DEFAULT_RESOLVERS, DEFAULT_QUERIES
+    queries = parse_queries(','.join(args.query)) if args.query else DEFAULT_QUERIES
+    for stats in bench(args.resolvers or list(DEFAULT_RESOLVERS), queries, rounds=args.rounds, deadline=args.deadline):
+        emit({'type': 'resolver', **stats})
+    return 0
+
+
+def cmd_whois(args):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from modules.whois_lookup import cached_whois
+    max_age = args.max_age * 3600
+
+    def one(domain):
+        # Queries to the same registry are serialized and paced inside cached_whois
+        try:
+            info, age = cached_whois(domain, max_age, refresh=args.refresh)
+            return {'type': 'whois', 'domain': domain, 'info': info, 'cached': age > 0, 'age': round(age)}
+        except Exception as e:
+            return {'type': 'whois', 'domain': domain, 'error': str(e)}
+
+    status = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        for future in as_completed([pool.submit(one, d) for d in args.domains]):
+            record = future.result()
+            if 'error' in record:
+                status = 1
+            emit(record)
+    return status
+
+
+def cmd_trace(args):
+    from modules.ip_lookup import trace_ip, cached_trace, cached_trace_many, offline_db, read_ips
+    max_age = args.max_age * 3600
+    if args.bulk:
+        # Addresses found in the arguments (text or @file) go out 100 per request, or are
+        # answered from the offline database
+        ips = []
+        for spec in args.targets:
+            ips.extend(ip for ip in read_ips(spec) if ip not in ips)
+        started = time.time()
+        failed = [0]
+        def on_result(data):
+            if data.get('status') != 'success':
+                failed[0] += 1
+            emit({'type': 'trace', 'target': data.get('query'), **data})
+        if args.offline:
+            offline_db().trace_many(ips, on_result)
+        else:
+            cached_trace_many(ips, on_result, max_age)
+        seconds = time.time() - started
+        emit({'type': 'summary', 'addresses': len(ips), 'failed': failed[0], 'seconds': round(seconds, 3)})
+        return 1 if failed[0] else 0
+    status = 0
+    for ip in args.targets:
+        try:
+            if args.offline:
+                data = trace_ip(ip, offline=True)
+            else:
+                data, age = cached_trace(ip, max_age)
+                data = dict(data, cached=age is not None, age=round(age) if age is not None else None)
+        except Exception as e:
+            data = {'status': 'fail', 'message': str(e)}
+        if data.get('status') != 'success':
+            status = 1
+        emit({'type': 'trace', 'target': ip, **data})
+    return status
+
+
+def cmd_route(args):
+    from modules.traceroute import trace
+    result = trace(args.host, lambda ttl, address, rtt, mark: emit({'type': 'hop', 'ttl': ttl, 'address': address,
+                                                                  'rtt': round(rtt, 3), 'mark': mark}),
+                   max_hops=args.max_hops, queries=args.queries, timeout=args.timeout)
+    if args.geo or args.offline:
+        # All hop addresses in one batch request (or the offline database)
+        from modules.ip_lookup import geo_client, offline_db
+        geo = {}
+        addresses = list(dict.fromkeys(h['address'] for h in result['hops'] if h['address']))
+        (offline_db() if args.offline else geo_client()).trace_many(addresses, lambda data: geo.setdefault(data['query'], data))
+        for hop in result['hops']:
+            data = geo.get(hop['address'])
+            if data and data.get('status') == 'success':
+                hop['geo'] = {k: data.get(k) for k in ('country', 'city', 'lat', 'lon', 'asname', 'org')}
+    emit({'type': 'route', 'host': args.host, **result})
+    return 0 if result['reached'] else 1
+
+
+def cmd_aggregate(args):
+    from modules.ip_lookup import read_ips
+    from modules.ip_aggregate import summarize, asn_table, load_table, import_table
+    if args.import_table:
+        emit({'type': 'asn_table', 'prefixes': import_table(args.import_table)})
+    ips = []
+    for spec in args.targets:
+        ips.extend(ip for ip in read_ips(spec) if ip not in ips)
+    table = load_table(args.table) if args.table else asn_table()
+    rows = summarize(ips, table)
+    for row in rows:
+        emit({'type': 'asn_group', **row, 'share': round(row['share'], 2),
+              'cidrs': row['cidrs'].split('; '), 'prefixes': row['prefixes'].split('; ') if row['prefixes'] else []})
+    emit({'type': 'summary', 'addresses': len(ips), 'groups': len(rows), 'blocks': sum(r['blocks'] for r in rows),
+          'asn_table': table is not None})
+    return 0
+
+
+def cmd_geodb(args):
+    from modules.geo_db import import_db
+    columns = [c.strip() or None for c in args.columns.split(',')] if args.columns else None
+    started = time.time()
+    info = import_db(args.source, columns, on_progress=lambda n: emit({'type': 'progress', 'ranges': n}))
+    emit({'type': 'geodb', **info, 'seconds': round(time.time() - started, 3)})
+    return 0
+
+
+def cmd_ping(args):
+    from modules.latency_probe import measure
+    status = 0
+    for host in args.hosts:
+        stats = measure(host, count=args.count, interval=args.interval, timeout=args.timeout,
+                        method=args.method, port=args.port)
+        if not stats['received']:
+            status = 1
+        emit({'type': 'ping', 'host': host, **stats})
+    return status
+
+
+def cmd_sysinfo(args):
+    from modules.system_probe import sample
+    import psutil
+    psutil.cpu_percent()  # prime the counter so the first sample is meaningful
+    for _ in range(args.count):
+        time.sleep(args.interval)
+        emit({'type': 'sysinfo', 'ts': time.time(), **sample(include_gpu=not args.no_gpu)})
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py --cli', description='Toolbelt network tools without the GUI (JSON lines on stdout)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('scan', help='TCP port scan of hosts, ranges, CIDR blocks or @files')
+    p.add_argument('hosts', help='e.g. example.com, 10.0.0.0/24, 10.0.0.1-50, @hosts.txt')
+    p.add_argument('-p', '--ports', default='22', help='e.g. 22 or 1-1024,3306,8080-8090')
+    p.add_argument('-c', '--concurrency', type=int, default=200, help='max probes in flight')
+    p.add_argument('--rate', type=float, default=0, help='max connect attempts per second (0 = unlimited)')
+    p.add_argument('--per-host', type=int, default=0, help='max probes in flight per host (0 = unlimited)')
+    p.add_argument('--max-timeout', type=float, default=10, help='upper bound for the adaptive connect timeout (s)')
+    p.add_argument('--no-discover', action='store_true', help='scan every host, skipping the liveness pre-pass')
+    p.add_argument('--banners', action='store_true', help='grab banners and identify services on open ports')
+    p.add_argument('--history', action='store_true', help='record the run in the scan history and print the diff')
+    p.add_argument('--all', action='store_true', help='also print closed and filtered ports')
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser('dns', help='DNS records of one or more domains')
+    p.add_argument('domains', nargs='+', help='domains or @file (one domain per line)')
+    p.add_argument('-t', '--types', help='comma separated record types (default: A,AAAA,CNAME,MX,TXT,NS,SOA,CAA; with --bulk A,AAAA,MX,NS)')
+    p.add_argument('--deadline', type=float, default=5.0, help='seconds allowed per record type')
+    p.add_argument('--bulk', action='store_true', help='resolve many domains concurrently, one summary record per domain')
+    p.add_argument('-c', '--concurrency', type=int, default=200, help='domains in flight with --bulk')
+    p.set_defaults(func=cmd_dns)
+
+    p = sub.add_parser('ptr', help='reverse DNS sweep over CIDR blocks, ranges or @files')
+    p.add_argument('ranges', nargs='+', help='e.g. 192.168.1.0/24, 10.0.0.1-50, @ips.txt')
+    p.add_argument('-c', '--concurrency', type=int, default=512, help='queries in flight')
+    p.add_argument('--deadline', type=float, default=2.0, help='seconds allowed per query')
+    p.add_argument('--all', action='store_true', help='also print addresses without a PTR record')
+    p.set_defaults(func=cmd_ptr)
+
+    p = sub.add_parser('subdomains', help='wordlist subdomain enumeration with wildcard filtering')
+    p.add_argument('domain')
+    p.add_argument('-w', '--wordlist', help='@file or comma separated words (default: a built-in list)')
+    p.add_argument('-c', '--concurrency', type=int, default=300, help='names in flight')
+    p.add_argument('--deadline', type=float, default=2.0, help='seconds allowed per query')
+    p.set_defaults(func=cmd_subdomains)
+
+    p = sub.add_parser('resolvers', help='benchmark DNS resolvers with the same query set')
+    p.add_argument('resolvers', nargs='*', help="'system', IPs or ip:port (default: system 1.1.1.1 8.8.8.8 9.9.9.9)")
+    p.add_argument('-q', '--query', action='append', help="'name [TYPE]'; repeatable (default: a built-in set)")
+    p.add_argument('-r', '--rounds', type=int, default=3)
+    p.add_argument('--deadline', type=float, default=2.0, help='seconds before a query counts as timed out')
+    p.set_defaults(func=cmd_resolvers)
+
+    p = sub.add_parser('whois', help='WHOIS data of one or more domains')
+    p.add_argument('domains', nargs='+')
+    p.add_argument('--max-age', type=float, default=24, help='reuse cached answers younger than this many hours')
+    p.add_argument('--refresh', action='store_true', help='ignore the cache and query the registries')
+    p.add_argument('-c', '--concurrency', type=int, default=8, help='registries queried in parallel')
+    p.set_defaults(func=cmd_whois)
+
+    p = sub.add_parser('trace', help='geolocate IPs or hostnames')
+    p.add_argument('targets', nargs='+')
+    p.add_argument('--bulk', action='store_true', help='geolocate every IP found in the targets (text or @file, e.g. a log) in batches')
+    p.add_argument('--offline', action='store_true', help='answer from the database imported with geodb instead of ip-api.com')
+    p.add_argument('--max-age', type=float, default=168, help='reuse cached answers younger than this many hours (0 = always ask)')
+    p.set_defaults(func=cmd_trace)
+
+    p = sub.add_parser('route', help='traceroute with all TTLs probed at once (Linux, no root needed)')
+    p.add_argument('host')
+    p.add_argument('-m', '--max-hops', type=int, default=30)
+    p.add_argument('-q', '--queries', type=int, default=3, help='probes per hop')
+    p.add_argument('-W', '--timeout', type=float, default=2.0, help='seconds to wait for hops that stay silent')
+    p.add_argument('--geo', action='store_true', help='geolocate the hops through ip-api.com')
+    p.add_argument('--offline', action='store_true', help='geolocate the hops from the offline database')
+    p.set_defaults(func=cmd_route)
+
+    p = sub.add_parser('aggregate', help='collapse IPs into CIDR blocks grouped by ASN')
+    p.add_argument('targets', nargs='+', help='addresses or text/@file (e.g. a log) to pull them from')
+    p.add_argument('--table', help='prefix -> ASN table to use instead of the imported one')
+    p.add_argument('--import', dest='import_table', metavar='PATH', help='import PATH as the prefix -> ASN table first')
+    p.set_defaults(func=cmd_aggregate)
+
+    p = sub.add_parser('geodb', help='import an offline geolocation database (.mmdb or CSV of IP ranges)')
+    p.add_argument('source')
+    p.add_argument('--columns', help='CSV column names for files without a header, default: the DB-IP lite layout '
+                                     'start,end,continentCode,countryCode,regionName,city,lat,lon; '
+                                     'e.g. start,end,country,,city '
+                                     '(fields: start,end,network,continentCode,country,countryCode,regionName,city,zip,lat,lon,isp,org,as,asname)')
+    p.set_defaults(func=cmd_geodb)
+
+    p = sub.add_parser('ping', help='latency statistics via ICMP datagram sockets or TCP connect')
+    p.add_argument('hosts', nargs='+')
+    p.add_argument('-n', '--count', type=int, default=5)
+    p.add_argument('-i', '--interval', type=float, default=0.2)
+    p.add_argument('-W', '--timeout', type=float, default=1.0)
+    p.add_argument('-m', '--method', choices=('auto', 'icmp', 'tcp'), default='auto')
+    p.add_argument('-p', '--port', type=int, help='TCP port for the tcp method (default: first of 443, 80, 22 that answers)')
+    p.set_defaults(func=cmd_ping)
+
+    p = sub.add_parser('sysinfo', help='sample CPU/RAM/disk/battery usage')
+    p.add_argument('-n', '--count', type=int, default=1)
+    p.add_argument('-i', '--interval', type=float, default=1.0)
+    p.add_argument('--no-gpu', action='store_true', help='skip the nvidia-smi/lspci GPU queries')
+    p.set_defaults(func=cmd_sysinfo)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, OSError) as e:
+        emit({'type': 'error', 'error': str(e)})
+        return 2
+    except KeyboardInterrupt:
+        return 130
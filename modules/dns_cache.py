@@ -0,0 +1,154 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+# Process-wide name cache shared by the Domain Lookup, IP Trace, Port Scanner and SSH
+# tools. DNS answers keep their record TTL (negative answers the SOA-derived TTL of
+# RFC 2308); system resolver answers (getaddrinfo, which honours /etc/hosts but
+# reports no TTL) are kept for SYSTEM_TTL seconds, failures for NEGATIVE_TTL.
+
+MAX_ENTRIES = 4096
+MAX_TTL = 86400
+NEGATIVE_TTL = 60
+SYSTEM_TTL = 60
+
+
+class DNSCache:
+    def __init__(self, maxsize=MAX_ENTRIES, max_ttl=MAX_TTL):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns (value, error) for a live entry, or None (counted as a miss)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, ttl, error=None):
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, error)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def flush(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_shared = DNSCache()
+
+
+def shared_cache():
+    return _shared
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host.split('%', 1)[0])
+        return True
+    except ValueError:
+        return False
+
+
+def _addr_key(host, family, type):
+    return ('addr', host.lower().rstrip('.'), family, type)
+
+
+def _cached(host, family, type, bypass):
+    # Returns the cached addrinfo list, raises the cached resolver error, or returns None
+    if bypass or _is_ip(host):
+        return None
+    entry = _shared.get(_addr_key(host, family, type))
+    if entry is None:
+        return None
+    infos, error = entry
+    if error is not None:
+        raise socket.gaierror(*error)
+    return infos
+
+
+def _store(host, family, type, infos=None, error=None):
+    if _is_ip(host):
+        return
+    if error is not None:
+        _shared.put(_addr_key(host, family, type), None, NEGATIVE_TTL, error=tuple(error.args))
+    else:
+        _shared.put(_addr_key(host, family, type), infos, SYSTEM_TTL)
+
+
+def getaddrinfo(host, family=0, type=socket.SOCK_STREAM, bypass=False):
+    # Cached socket.getaddrinfo(host, None, family, type); port is always 0
+    infos = _cached(host, family, type, bypass)
+    if infos is not None:
+        return infos
+    try:
+        infos = socket.getaddrinfo(host, None, family, type)
+    except socket.gaierror as e:
+        _store(host, family, type, error=e)
+        raise
+    _store(host, family, type, infos)
+    return infos
+
+
+async def getaddrinfo_async(host, family=0, type=socket.SOCK_STREAM, bypass=False):
+    infos = _cached(host, family, type, bypass)
+    if infos is not None:
+        return infos
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, family=family, type=type)
+    except socket.gaierror as e:
+        _store(host, family, type, error=e)
+        raise
+    _store(host, family, type, infos)
+    return infos
+
+
+def create_connection(host, port, timeout=None, bypass=False):
+    # socket.create_connection over the cached addresses of host
+    error = None
+    for family, type, proto, _, sockaddr in getaddrinfo(host, bypass=bypass):
+        sock = socket.socket(family, type, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect((sockaddr[0], port) + tuple(sockaddr[2:]))
+            return sock
+        except OSError as e:
+            error = e
+            sock.close()
+    raise error or OSError(f'could not connect to {host}:{port}')
+
+
+def resolve_ip(host, bypass=False):
+    # First address of host (host itself when it already is an IP)
+    if _is_ip(host):
+        return host
+    return getaddrinfo(host, bypass=bypass)[0][4][0]
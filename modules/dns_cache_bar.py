@@ -0,0 +1,38 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QCheckBox
+from PyQt6.QtCore import QTimer
+from modules.dns_cache import shared_cache
+
+
+class DNSCacheBar(QWidget):
+    # Hit/miss counter of the shared DNS cache with a flush button and a per-query bypass toggle
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        row = QHBoxLayout()
+        row.setContentsMargins(0, 0, 0, 0)
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet('color: #8888aa;')
+        row.addWidget(self.stats_label)
+        self.bypass_check = QCheckBox('Bypass cache')
+        self.bypass_check.setToolTip('Resolve the next queries fresh without reading the cache')
+        row.addWidget(self.bypass_check)
+        self.flush_btn = QPushButton('Flush')
+        self.flush_btn.setFixedWidth(60)
+        self.flush_btn.clicked.connect(self.flush)
+        row.addWidget(self.flush_btn)
+        self.setLayout(row)
+        # The cache is shared with the other tabs, so poll rather than wait for our own queries
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(1000)
+        self.refresh()
+
+    def bypass(self):
+        return self.bypass_check.isChecked()
+
+    def flush(self):
+        shared_cache().flush()
+        self.refresh()
+
+    def refresh(self):
+        stats = shared_cache().stats()
+        self.stats_label.setText(f"DNS cache: {stats['hits']} hits / {stats['misses']} misses ({stats['entries']} entries)")
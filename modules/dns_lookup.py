@@ -0,0 +1,324 @@
+import asyncio
+from modules.dns_cache import shared_cache, resolve_ip, NEGATIVE_TTL
+
+# Record types the Domain Lookup tab shows
+RECORD_TYPES = ('A', 'AAAA', 'CNAME', 'MX', 'TXT', 'NS', 'SOA', 'CAA')
+# Seconds each record type may take before it is reported as timed out
+DEFAULT_DEADLINE = 5.0
+# Columns of an exported Domain Lookup result (one row per DNS value or WHOIS field value)
+LOOKUP_FIELDS = ('section', 'type', 'value', 'error')
+
+_resolver = None
+_pinned = None
+
+
+def get_resolver():
+    # One async resolver (system nameservers unless one was pinned) shared by every lookup in the process
+    global _resolver
+    if _resolver is None:
+        from modules.resolver_bench import make_resolver, SYSTEM
+        _resolver = make_resolver(_pinned or SYSTEM)
+    return _resolver
+
+
+def pin_resolver(spec):
+    # Sends all later record lookups to spec ('1.1.1.1', '[::1]:5353'); None or 'system'
+    # goes back to the OS nameservers. Answers cached from the old upstream are dropped.
+    global _resolver, _pinned
+    from modules.resolver_bench import parse_spec
+    _pinned = spec if parse_spec(spec or '') is not None else None
+    _resolver = None
+    shared_cache().flush()
+
+
+def pinned_resolver():
+    return _pinned
+
+
+def format_rdata(rtype, r):
+    if rtype == 'CNAME':
+        return str(r.target)
+    if rtype == 'MX':
+        return f"{r.exchange} (priority {r.preference})"
+    if rtype == 'TXT':
+        return b''.join(r.strings).decode(errors='ignore')
+    if rtype == 'NS':
+        return str(r.target)
+    if rtype == 'SOA':
+        return f"{r.mname} {r.rname} (serial {r.serial})"
+    return r.to_text()
+
+
+def describe_error(e):
+    import dns.resolver
+    import dns.exception
+    if isinstance(e, dns.resolver.NoAnswer):
+        return None
+    if isinstance(e, dns.resolver.NXDOMAIN):
+        return 'NXDOMAIN'
+    if isinstance(e, dns.exception.Timeout):
+        return 'timeout'
+    if isinstance(e, dns.resolver.NoNameservers):
+        return 'no nameserver answered'
+    return str(e) or e.__class__.__name__
+
+
+def negative_ttl(e):
+    # RFC 2308: a negative answer lives for min(SOA TTL, SOA MINIMUM) of the authority section
+    import dns.resolver
+    import dns.rdatatype
+    try:
+        if isinstance(e, dns.resolver.NXDOMAIN):
+            responses = list(e.responses().values())
+        else:
+            responses = [e.response()]
+        for response in responses:
+            for rrset in response.authority:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return min(rrset.ttl, rrset[0].minimum)
+    except Exception:
+        pass
+    return NEGATIVE_TTL
+
+
+async def query(domain, rtype, deadline=DEFAULT_DEADLINE, resolver=None, bypass_cache=False):
+    # Returns (rtype, values, error); a missing record type is ([], None).
+    # Answers go through the shared cache unless bypass_cache is set; timeouts are never cached.
+    import dns.resolver
+    cache = shared_cache()
+    key = ('rr', domain.lower().rstrip('.'), rtype)
+    if not bypass_cache:
+        entry = cache.get(key)
+        if entry is not None:
+            return rtype, entry[0], entry[1]
+    resolver = resolver or get_resolver()
+    try:
+        answer = await resolver.resolve(domain, rtype, lifetime=deadline)
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+        error = describe_error(e)
+        cache.put(key, [], negative_ttl(e), error=error)
+        return rtype, [], error
+    except Exception as e:
+        return rtype, [], describe_error(e)
+    values = [format_rdata(rtype, r) for r in answer]
+    cache.put(key, values, answer.rrset.ttl)
+    return rtype, values, None
+
+
+async def lookup_async(domain, on_record, types=RECORD_TYPES, deadline=DEFAULT_DEADLINE, bypass_cache=False):
+    # Fires every record type at once; on_record(rtype, values, error) runs as each completes
+    pending = [asyncio.ensure_future(query(domain, rtype, deadline, bypass_cache=bypass_cache)) for rtype in types]
+    for done in asyncio.as_completed(pending):
+        on_record(*await done)
+
+
+def lookup(domain, on_record, types=RECORD_TYPES, deadline=DEFAULT_DEADLINE, bypass_cache=False):
+    # Blocking wrapper for worker threads and the CLI. Without dnspython only the
+    # A record is available (system resolver) and ('', [], message) follows it.
+    try:
+        import dns.asyncresolver  # noqa: F401
+    except ImportError:
+        try:
+            on_record('A', [resolve_ip(domain, bypass=bypass_cache)], None)
+        except Exception as e:
+            on_record('A', [], str(e))
+        on_record('', [], "Install 'dnspython' for more records")
+        return
+    asyncio.run(lookup_async(domain, on_record, types, deadline, bypass_cache))
+
+
+# Bulk mode: record types shown per domain and the default number of domains in flight
+BULK_TYPES = ('A', 'AAAA', 'MX', 'NS')
+BULK_CONCURRENCY = 200
+BULK_FIELDS = ('domain', 'status', 'ms') + BULK_TYPES
+
+
+def parse_domains(text):
+    # Domains separated by whitespace or commas; '#' starts a comment, @path reads a file.
+    # Order is kept and duplicates are dropped.
+    domains = []
+    seen = set()
+    for line in text.splitlines():
+        line = line.split('#', 1)[0]
+        for token in line.replace(',', ' ').split():
+            if token.startswith('@'):
+                with open(token[1:], encoding='utf-8', errors='ignore') as f:
+                    names = parse_domains(f.read())
+            else:
+                names = [token]
+            for name in names:
+                name = name.lower().rstrip('.')
+                if name and name not in seen:
+                    seen.add(name)
+                    domains.append(name)
+    return domains
+
+
+def bulk_status(records):
+    # One word per domain: OK if anything resolved, else the most telling error
+    errors = [error for values, error in records.values() if error]
+    if 'NXDOMAIN' in errors:
+        return 'NXDOMAIN'
+    if any(values for values, _ in records.values()):
+        return 'OK'
+    return errors[0] if errors else 'NO RECORDS'
+
+
+async def worker_pool(items, handle, concurrency, stop=None, sockets_per_item=1):
+    # Fixed pool of coroutines pulling from one iterator, capped by the fd budget
+    # (every query holds its own UDP socket while in flight)
+    from modules.scan_engine import fd_budget
+    budget = fd_budget()
+    if budget:
+        concurrency = min(concurrency, max(1, budget // sockets_per_item))
+    it = iter(items)
+
+    async def worker():
+        for item in it:
+            if stop and stop():
+                return
+            await handle(item)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+async def bulk_lookup_async(domains, on_result, types=BULK_TYPES, concurrency=BULK_CONCURRENCY,
+                            deadline=DEFAULT_DEADLINE, stop=None, bypass_cache=False):
+    # Each domain's record types run in parallel; stop is an optional callable.
+    # on_result(domain, status, elapsed_ms, {rtype: (values, error)})
+    import time
+
+    async def handle(domain):
+        start = time.perf_counter()
+        answers = await asyncio.gather(*(query(domain, rtype, deadline, bypass_cache=bypass_cache) for rtype in types))
+        records = {rtype: (values, error) for rtype, values, error in answers}
+        on_result(domain, bulk_status(records), (time.perf_counter() - start) * 1000, records)
+
+    await worker_pool(domains, handle, min(concurrency, len(domains)), stop, len(types))
+
+
+def bulk_lookup(domains, on_result, **kw):
+    asyncio.run(bulk_lookup_async(domains, on_result, **kw))
+
+
+def bulk_row(domain, status, ms, records, types=BULK_TYPES):
+    # Flat dict for CSV/JSON export; multiple values are joined with '; '
+    row = {'domain': domain, 'status': status, 'ms': round(ms, 1)}
+    for rtype in types:
+        row[rtype] = '; '.join(records.get(rtype, ((), None))[0])
+    return row
+
+
+def export_rows(path, rows, fmt=None, fields=BULK_FIELDS):
+    # rows: flat dicts (bulk_row, ptr_row, ...); the format follows the file extension unless fmt is given
+    import csv
+    import json
+    fmt = fmt or ('json' if path.lower().endswith('.json') else 'csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'json':
+            json.dump(rows, f, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+# PTR sweep: reverse lookups over address ranges
+PTR_CONCURRENCY = 512
+PTR_FIELDS = ('address', 'name', 'status')
+
+
+def parse_addresses(spec):
+    # CIDR blocks, ranges, single IPs and @files (see scan_engine.parse_hosts); names are rejected
+    from modules.scan_engine import parse_hosts, _is_ip
+    addresses = parse_hosts(spec)
+    names = [a for a in addresses if not _is_ip(a)]
+    if names:
+        raise ValueError(f"Not an IP address or range: {names[0]}")
+    return addresses
+
+
+async def ptr_sweep_async(addresses, on_result, concurrency=PTR_CONCURRENCY, deadline=2.0, stop=None, bypass_cache=False):
+    # on_result(address, names, error) for every address, in completion order.
+    # Answers (and NXDOMAINs) land in the shared DNS cache under the reverse name.
+    import dns.reversename
+
+    async def handle(address):
+        _, names, error = await query(dns.reversename.from_address(address).to_text(), 'PTR', deadline,
+                                      bypass_cache=bypass_cache)
+        on_result(address, [n.rstrip('.') for n in names], error)
+
+    await worker_pool(addresses, handle, min(concurrency, len(addresses)), stop)
+
+
+def ptr_sweep(addresses, on_result, **kw):
+    asyncio.run(ptr_sweep_async(addresses, on_result, **kw))
+
+
+def ptr_row(address, names, error):
+    return {'address': address, 'name': '; '.join(names), 'status': 'OK' if names else (error or 'NO PTR')}
+
+
+# Subdomain enumeration
+SUBDOMAIN_CONCURRENCY = 300
+SUBDOMAIN_FIELDS = ('name', 'A', 'AAAA', 'status')
+# Used when no wordlist is given
+DEFAULT_WORDS = ('www', 'mail', 'webmail', 'smtp', 'pop', 'imap', 'mx', 'ns', 'ns1', 'ns2', 'ns3', 'dns', 'ftp', 'sftp',
+                 'vpn', 'remote', 'gateway', 'proxy', 'api', 'app', 'apps', 'dev', 'test', 'staging', 'stage', 'uat',
+                 'qa', 'beta', 'demo', 'admin', 'portal', 'intranet', 'internal', 'corp', 'secure', 'sso', 'auth',
+                 'login', 'id', 'accounts', 'git', 'gitlab', 'github', 'jenkins', 'ci', 'build', 'jira', 'wiki',
+                 'confluence', 'docs', 'help', 'support', 'status', 'monitor', 'grafana', 'kibana', 'logs', 'metrics',
+                 'blog', 'shop', 'store', 'cdn', 'static', 'assets', 'img', 'images', 'media', 'files', 'download',
+                 'upload', 'm', 'mobile', 'old', 'new', 'web', 'www2', 'server', 'db', 'mysql', 'sql', 'redis',
+                 'backup', 'exchange', 'owa', 'autodiscover', 'cpanel', 'whm', 'panel', 'dashboard', 'crm', 'erp',
+                 'hr', 'billing', 'pay', 'payments', 'partners', 'cloud', 'office', 'calendar', 'chat', 'video')
+
+
+async def detect_wildcard(domain, deadline=2.0, probes=3):
+    # Addresses that random, surely unregistered labels resolve to (empty without wildcard DNS)
+    import secrets
+    labels = [secrets.token_hex(8) for _ in range(probes)]
+    answers = await asyncio.gather(*(query(f'{label}.{domain}', rtype, deadline, bypass_cache=True)
+                                     for label in labels for rtype in ('A', 'AAAA')))
+    return {value for _, values, _ in answers for value in values}
+
+
+async def enumerate_subdomains_async(domain, words, on_hit, concurrency=SUBDOMAIN_CONCURRENCY, deadline=2.0,
+                                     stop=None, bypass_cache=False, on_wildcard=None):
+    # Resolves word.domain for every word and calls on_hit(name, a, aaaa) for names that
+    # exist. Under wildcard DNS (checked first, reported via on_wildcard(addresses)) names
+    # answering only with wildcard addresses are dropped. Returns (tried, hits, filtered).
+    domain = domain.lower().strip().rstrip('.')
+    wildcard = await detect_wildcard(domain, deadline)
+    if wildcard and on_wildcard:
+        on_wildcard(sorted(wildcard))
+    seen = set()
+    counts = [0, 0, 0]
+
+    async def handle(word):
+        # Wordlists sometimes carry full names; either form maps to the same candidate
+        name = word if word == domain or word.endswith('.' + domain) else f'{word}.{domain}'
+        if name in seen:
+            return
+        seen.add(name)
+        counts[0] += 1
+        (_, a, _), (_, aaaa, _) = await asyncio.gather(query(name, 'A', deadline, bypass_cache=bypass_cache),
+                                                       query(name, 'AAAA', deadline, bypass_cache=bypass_cache))
+        if not a and not aaaa:
+            return
+        if wildcard and set(a + aaaa) <= wildcard:
+            counts[2] += 1
+            return
+        counts[1] += 1
+        on_hit(name, a, aaaa)
+
+    await worker_pool(words, handle, min(concurrency, len(words)), stop, 2)
+    return tuple(counts)
+
+
+def enumerate_subdomains(domain, words, on_hit, **kw):
+    return asyncio.run(enumerate_subdomains_async(domain, words, on_hit, **kw))
+
+
+def subdomain_row(name, a, aaaa):
+    return {'name': name, 'A': '; '.join(a), 'AAAA': '; '.join(aaaa), 'status': 'OK'}
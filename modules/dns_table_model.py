@@ -0,0 +1,87 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from modules.scan_results_model import _host_key
+
+_STATUS_COLORS = {'OK': QColor('#aaffaa'), 'NXDOMAIN': QColor('#ffaaaa')}
+_OTHER_STATUS = QColor('#ffd27f')
+# Columns that hold addresses sort numerically instead of as text
+_ADDRESS_FIELDS = ('address', 'query')
+# Float columns shown as they are rather than to one decimal (coordinates)
+_EXACT_FIELDS = ('lat', 'lon')
+
+
+def _sort_key(field):
+    # Empty cells (None) go after every value, whatever the column holds
+    if field in _ADDRESS_FIELDS:
+        return lambda r: (r[field] is None, _host_key(r[field]) if r[field] is not None else ())
+    return lambda r: (r[field] is None, r[field])
+
+
+class DNSTableModel(QAbstractTableModel):
+    # Rows are flat dicts (dns_lookup.bulk_row, ptr_row, ...) shown as the given fields.
+    # Streamed rows are appended as they arrive; resort() restores the chosen order
+    # once the run is over. Multi-value cells hold '; '-joined values.
+    def __init__(self, fields, headers, parent=None):
+        super().__init__(parent)
+        self.fields = fields
+        self.headers = headers
+        self._rows = []
+        self._sort = None
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+    def rows(self):
+        return list(self._rows)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fields)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        field = self.fields[index.column()]
+        value = row[field]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if isinstance(value, float):
+                return str(value) if field in _EXACT_FIELDS else f'{value:.1f}'
+            return value
+        if role == Qt.ItemDataRole.ToolTipRole and isinstance(value, str) and '; ' in value:
+            return value.replace('; ', '\n')
+        if role == Qt.ItemDataRole.ForegroundRole and field == 'status':
+            return _STATUS_COLORS.get(value, _OTHER_STATUS)
+        if role == Qt.ItemDataRole.TextAlignmentRole and isinstance(value, float):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def append_rows(self, batch):
+        if not batch:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort = (column, order) if column >= 0 else None
+        if self._sort is None:
+            return
+        field = self.fields[column]
+        self.beginResetModel()
+        self._rows.sort(key=_sort_key(field), reverse=order == Qt.SortOrder.DescendingOrder)
+        self.endResetModel()
+
+    def resort(self):
+        if self._sort is not None:
+            self.sort(*self._sort)
@@ -1,65 +1,282 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QDialog,
+                             QTreeWidget, QTreeWidgetItem)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-import socket
+import time
+from modules.dns_lookup import (lookup, bulk_lookup, bulk_row, parse_domains, export_rows, ptr_sweep, ptr_row, parse_addresses,
+                                enumerate_subdomains, subdomain_row, RECORD_TYPES, LOOKUP_FIELDS, BULK_CONCURRENCY,
+                                BULK_FIELDS, BULK_TYPES, PTR_CONCURRENCY, PTR_FIELDS, SUBDOMAIN_CONCURRENCY,
+                                SUBDOMAIN_FIELDS, DEFAULT_WORDS)
+from modules.whois_lookup import cached_whois, format_age
+from modules.whois_cache import DEFAULT_MAX_AGE
+from modules.dns_cache_bar import DNSCacheBar
+from modules.table_lookup_dialog import TableLookupDialog
 
 class DNSLookupWorker(QThread):
-    result = pyqtSignal(str)
-    def __init__(self, domain):
+    # Emits one record set per type as soon as its query completes
+    record = pyqtSignal(str, list, str)
+    def __init__(self, domain, bypass_cache=False):
         super().__init__()
         self.domain = domain
+        self.bypass_cache = bypass_cache
     def run(self):
+        lookup(self.domain, lambda rtype, values, error: self.record.emit(rtype, values, error or ''),
+               bypass_cache=self.bypass_cache)
+
+class BulkLookupDialog(TableLookupDialog):
+    # Resolves a pasted list or a file of domains, one row per domain
+    TITLE = 'Bulk Domain Lookup'
+    FIELDS = BULK_FIELDS
+    HEADERS = ('Domain', 'Status', 'Time (ms)') + BULK_TYPES
+    CONCURRENCY = BULK_CONCURRENCY
+    EXPORT_NAME = 'domains'
+    def add_inputs(self, layout):
+        self.domains_input = QTextEdit()
+        self.domains_input.setPlaceholderText('One domain per line (or separated by spaces/commas), or load a file')
+        self.domains_input.setMaximumHeight(120)
+        layout.addWidget(self.domains_input)
+        self.file_btn = QPushButton('File...')
+        self.file_btn.setFixedWidth(90)
+        self.file_btn.clicked.connect(self.choose_file)
+        layout.addWidget(self.file_btn)
+    def choose_file(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Domains File', '', 'Text files (*.txt *.lst *.csv);;All files (*)')
+        if path:
+            self.domains_input.setPlainText(f'@{path}')
+    def make_job(self):
+        domains = parse_domains(self.domains_input.toPlainText())
+        if not domains:
+            raise ValueError('Please enter at least one domain.')
+        concurrency, bypass = self.concurrency_input.value(), self.bypass_cache()
+        def job(on_row, stop, note):
+            bulk_lookup(domains, lambda *result: on_row(bulk_row(*result)), concurrency=concurrency, deadline=3.0,
+                        stop=stop, bypass_cache=bypass)
+        return len(domains), job
+
+class PTRSweepDialog(TableLookupDialog):
+    # Reverse lookups for every address of a CIDR block or range
+    TITLE = 'PTR Sweep'
+    FIELDS = PTR_FIELDS
+    HEADERS = ('Address', 'Name', 'Status')
+    CONCURRENCY = PTR_CONCURRENCY
+    EXPORT_NAME = 'ptr'
+    def add_inputs(self, layout):
+        row = QHBoxLayout()
+        row.addWidget(QLabel('Addresses:'))
+        self.range_input = QLineEdit()
+        self.range_input.setPlaceholderText('e.g. 192.168.1.0/24, 10.0.0.1-50 or @file')
+        row.addWidget(self.range_input)
+        layout.addLayout(row)
+    def make_job(self):
+        addresses = parse_addresses(self.range_input.text().strip())
+        concurrency, bypass = self.concurrency_input.value(), self.bypass_cache()
+        def job(on_row, stop, note):
+            ptr_sweep(addresses, lambda *result: on_row(ptr_row(*result)), concurrency=concurrency, stop=stop,
+                      bypass_cache=bypass)
+        return len(addresses), job
+
+class SubdomainDialog(TableLookupDialog):
+    # Wordlist-driven subdomain enumeration; wildcard answers are filtered out
+    TITLE = 'Subdomain Enumeration'
+    FIELDS = SUBDOMAIN_FIELDS
+    HEADERS = ('Name', 'A', 'AAAA', 'Status')
+    CONCURRENCY = SUBDOMAIN_CONCURRENCY
+    EXPORT_NAME = 'subdomains'
+    def add_inputs(self, layout):
+        row = QHBoxLayout()
+        row.addWidget(QLabel('Domain:'))
+        self.domain_input = QLineEdit()
+        self.domain_input.setPlaceholderText('e.g. example.com')
+        row.addWidget(self.domain_input)
+        self.file_btn = QPushButton('Wordlist...')
+        self.file_btn.clicked.connect(self.choose_file)
+        row.addWidget(self.file_btn)
+        layout.addLayout(row)
+        self.words_input = QTextEdit()
+        self.words_input.setPlaceholderText(f'Words to try, one per line or @file (empty = built-in list of {len(DEFAULT_WORDS)})')
+        self.words_input.setMaximumHeight(100)
+        layout.addWidget(self.words_input)
+    def choose_file(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Wordlist', '', 'Text files (*.txt *.lst);;All files (*)')
+        if path:
+            self.words_input.setPlainText(f'@{path}')
+    def make_job(self):
+        domain = self.domain_input.text().strip().lower().rstrip('.')
+        if not domain:
+            raise ValueError('Please enter a domain.')
+        words = parse_domains(self.words_input.toPlainText()) or list(DEFAULT_WORDS)
+        concurrency, bypass = self.concurrency_input.value(), self.bypass_cache()
+        def job(on_row, stop, note):
+            def on_wildcard(addresses):
+                note(f"Wildcard DNS: *.{domain} answers with {', '.join(addresses)}. Names resolving only there are hidden.")
+            tried, hits, filtered = enumerate_subdomains(domain, words, lambda *hit: on_row(subdomain_row(*hit)),
+                                                         concurrency=concurrency, stop=stop, bypass_cache=bypass,
+                                                         on_wildcard=on_wildcard)
+            if filtered:
+                note(f"Wildcard DNS: {filtered} of {tried} names only matched the wildcard and were hidden.")
+        return len(words), job
+    def progress_text(self, finished):
+        # Only hits become rows, so report them against the words tried
+        elapsed = time.monotonic() - self.started
+        state = 'Done' if finished else 'Running'
+        return f'{state}: {self.model.rowCount()} names found from {self.total} words ({elapsed:.1f} s)'
+
+class ResolverBenchWorker(QThread):
+    progress = pyqtSignal(int, int)
+    result = pyqtSignal(list)
+    def __init__(self, specs, queries, rounds=3):
+        super().__init__()
+        self.specs = specs
+        self.queries = queries
+        self.rounds = rounds
+        self._stopped = False
+    def stop(self):
+        self._stopped = True
+    def run(self):
+        from modules.resolver_bench import bench
+        self.result.emit(bench(self.specs, self.queries, self.rounds, on_progress=self.progress.emit,
+                               stop=lambda: self._stopped))
+
+class ResolverBenchDialog(QDialog):
+    # Sends one query set to several resolvers, ranks them and pins the fastest healthy one
+    COLUMNS = ['Resolver', 'Sent', 'Timeouts', 'p50 (ms)', 'p90 (ms)', 'Max (ms)', 'Consistency', 'Healthy']
+    def __init__(self, cache_bar=None, parent=None):
+        super().__init__(parent)
+        from PyQt6.QtWidgets import QTableWidget, QHeaderView, QSpinBox, QProgressBar
+        from modules.resolver_bench import DEFAULT_RESOLVERS, DEFAULT_QUERIES
+        self.setWindowTitle('Resolver Benchmark')
+        self.resize(820, 520)
+        self.cache_bar = cache_bar
+        self.worker = None
+        self.stats = []
+        layout = QVBoxLayout()
+        row = QHBoxLayout()
+        row.addWidget(QLabel('Resolvers:'))
+        self.resolvers_input = QLineEdit(', '.join(DEFAULT_RESOLVERS))
+        self.resolvers_input.setToolTip("'system' and/or IPs, optionally with :port ([v6]:port)")
+        row.addWidget(self.resolvers_input)
+        row.addWidget(QLabel('Rounds:'))
+        self.rounds_input = QSpinBox()
+        self.rounds_input.setRange(1, 20)
+        self.rounds_input.setValue(3)
+        row.addWidget(self.rounds_input)
+        self.run_btn = QPushButton('Run')
+        self.run_btn.clicked.connect(self.start)
+        row.addWidget(self.run_btn)
+        layout.addLayout(row)
+        layout.addWidget(QLabel('Queries (name [type], one per line):'))
+        self.queries_input = QTextEdit()
+        self.queries_input.setPlainText('\n'.join(f'{name} {rtype}' for name, rtype in DEFAULT_QUERIES))
+        self.queries_input.setMaximumHeight(110)
+        layout.addWidget(self.queries_input)
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+        bottom = QHBoxLayout()
+        self.pinned_label = QLabel()
+        bottom.addWidget(self.pinned_label)
+        bottom.addStretch(1)
+        self.pin_btn = QPushButton('Pin fastest healthy')
+        self.pin_btn.setEnabled(False)
+        self.pin_btn.clicked.connect(self.pin_fastest)
+        bottom.addWidget(self.pin_btn)
+        self.pin_selected_btn = QPushButton('Pin selected')
+        self.pin_selected_btn.clicked.connect(self.pin_selected)
+        bottom.addWidget(self.pin_selected_btn)
+        self.unpin_btn = QPushButton('Use system')
+        self.unpin_btn.clicked.connect(lambda: self.pin(None))
+        bottom.addWidget(self.unpin_btn)
+        layout.addLayout(bottom)
+        self.setLayout(layout)
+        self.update_pinned_label()
+    def update_pinned_label(self):
+        from modules.dns_lookup import pinned_resolver
+        self.pinned_label.setText(f"Lookups use: {pinned_resolver() or 'system resolver'}")
+    def start(self):
+        from modules.resolver_bench import parse_spec, parse_queries
+        specs = [s.strip() for s in self.resolvers_input.text().split(',') if s.strip()]
+        queries = parse_queries(self.queries_input.toPlainText())
         try:
-            ip = socket.gethostbyname(self.domain)
-            result = f"A record: {ip}\n"
-        except Exception as e:
-            result = f"A record: Error - {e}\n"
-        # Try to get CNAME, MX, TXT if possible (using socket only for A)
-        try:
-            import dns.resolver
-            resolver = dns.resolver.Resolver()
-            # CNAME
-            try:
-                cname = resolver.resolve(self.domain, 'CNAME')
-                for r in cname:
-                    result += f"CNAME: {r.target}\n"
-            except Exception:
-                result += "CNAME: -\n"
-            # MX
-            try:
-                mx = resolver.resolve(self.domain, 'MX')
-                for r in mx:
-                    result += f"MX: {r.exchange} (priority {r.preference})\n"
-            except Exception:
-                result += "MX: -\n"
-            # TXT
-            try:
-                txt = resolver.resolve(self.domain, 'TXT')
-                for r in txt:
-                    result += f"TXT: {b''.join(r.strings).decode(errors='ignore')}\n"
-            except Exception:
-                result += "TXT: -\n"
-        except Exception:
-            result += "(Install 'dnspython' for more records)\n"
-        self.result.emit(result)
+            for spec in specs:
+                parse_spec(spec)
+        except ValueError:
+            self.pinned_label.setText(f'Invalid resolver list: {self.resolvers_input.text()}')
+            return
+        if not specs or not queries:
+            self.pinned_label.setText('Enter at least one resolver and one query.')
+            return
+        self.run_btn.setEnabled(False)
+        self.pin_btn.setEnabled(False)
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.worker = ResolverBenchWorker(specs, queries, self.rounds_input.value())
+        self.worker.progress.connect(self.on_progress)
+        self.worker.result.connect(self.on_result)
+        self.worker.start()
+    def on_progress(self, done, total):
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+    def on_result(self, stats):
+        from PyQt6.QtWidgets import QTableWidgetItem
+        from PyQt6.QtGui import QColor
+        self.stats = stats
+        ms = lambda v: '-' if v is None else f'{v:.1f}'
+        self.table.setRowCount(len(stats))
+        for row, s in enumerate(stats):
+            consistency = '-' if s['consistency'] is None else f"{s['consistency'] * 100:.0f}%"
+            values = [s['resolver'] + ('  ★' if s['best'] else ''), str(s['sent']), f"{s['timeout_rate'] * 100:.0f}%",
+                      ms(s['p50']), ms(s['p90']), ms(s['max']), consistency, 'yes' if s['healthy'] else 'no']
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 7:
+                    item.setForeground(QColor('#aaffaa') if s['healthy'] else QColor('#ffaaaa'))
+                self.table.setItem(row, col, item)
+        self.progress.setVisible(False)
+        self.run_btn.setEnabled(True)
+        self.pin_btn.setEnabled(any(s['best'] for s in stats))
+    def pin_fastest(self):
+        best = [s for s in self.stats if s['best']]
+        if best:
+            self.pin(best[0]['resolver'])
+    def pin_selected(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.stats):
+            self.pin(self.stats[row]['resolver'])
+    def pin(self, spec):
+        from modules.dns_lookup import pin_resolver
+        pin_resolver(spec)
+        self.update_pinned_label()
+        if self.cache_bar:
+            self.cache_bar.refresh()
+    def closeEvent(self, event):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(5000)
+        super().closeEvent(event)
 
 class WhoisLookupWorker(QThread):
-    result = pyqtSignal(str)
-    def __init__(self, domain):
+    result = pyqtSignal(dict, float)
+    error = pyqtSignal(str)
+    def __init__(self, domain, max_age=DEFAULT_MAX_AGE):
         super().__init__()
         self.domain = domain
+        self.max_age = max_age
     def run(self):
         try:
-            import whois
-            w = whois.whois(self.domain)
-            lines = []
-            for k in ["domain_name", "registrar", "creation_date", "expiration_date", "name_servers", "org", "country", "emails"]:
-                v = w.get(k, None)
-                if v:
-                    lines.append(f"{k.replace('_',' ').title()}: {v}")
-            result = "WHOIS Info:\n" + ("\n".join(lines) if lines else "No WHOIS data found.")
+            # Cached answers come straight from disk; misses queue behind the registry's rate limit
+            info, age = cached_whois(self.domain, self.max_age, refresh=self.max_age <= 0)
         except Exception as e:
-            result = f"WHOIS lookup error: {e}"
-        self.result.emit(result)
+            self.error.emit(str(e))
+            return
+        self.result.emit(info, age)
 
 class DomainLookupTool(QWidget):
     def __init__(self, parent=None):
@@ -76,10 +293,42 @@ class DomainLookupTool(QWidget):
         self.whois_btn = QPushButton('WHOIS Lookup')
         self.whois_btn.clicked.connect(self.start_whois)
         row.addWidget(self.whois_btn)
+        from PyQt6.QtWidgets import QSpinBox
+        self.whois_age_input = QSpinBox()
+        self.whois_age_input.setRange(0, 24 * 30)
+        self.whois_age_input.setValue(DEFAULT_MAX_AGE // 3600)
+        self.whois_age_input.setSuffix(' h')
+        self.whois_age_input.setSpecialValueText('no cache')
+        self.whois_age_input.setToolTip('Reuse WHOIS answers younger than this')
+        row.addWidget(self.whois_age_input)
+        self.bulk_btn = QPushButton('Bulk...')
+        self.bulk_btn.setToolTip('Resolve a list or file of domains into a table')
+        self.bulk_btn.clicked.connect(lambda: self.open_dialog('bulk', BulkLookupDialog))
+        row.addWidget(self.bulk_btn)
+        self.resolvers_btn = QPushButton('Resolvers...')
+        self.resolvers_btn.setToolTip('Benchmark DNS resolvers and pin the fastest for lookups')
+        self.resolvers_btn.clicked.connect(lambda: self.open_dialog('resolvers', ResolverBenchDialog))
+        row.addWidget(self.resolvers_btn)
+        self.ptr_btn = QPushButton('PTR Sweep...')
+        self.ptr_btn.setToolTip('Reverse lookups for a whole CIDR block or range')
+        self.ptr_btn.clicked.connect(lambda: self.open_dialog('ptr', PTRSweepDialog))
+        row.addWidget(self.ptr_btn)
+        self.subdomains_btn = QPushButton('Subdomains...')
+        self.subdomains_btn.setToolTip('Find subdomains from a wordlist')
+        self.subdomains_btn.clicked.connect(lambda: self.open_dialog('subdomains', SubdomainDialog))
+        row.addWidget(self.subdomains_btn)
         layout.addLayout(row)
-        self.result_box = QTextEdit()
-        self.result_box.setReadOnly(True)
-        layout.addWidget(self.result_box)
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+        # One top-level item per record set (and one for WHOIS), one child per value;
+        # self.records keeps the same data flat for export
+        self.result_tree = QTreeWidget()
+        self.result_tree.setHeaderLabels(['Record', 'Value'])
+        self.result_tree.setColumnWidth(0, 180)
+        self.result_tree.setUniformRowHeights(True)
+        self.result_tree.setWordWrap(False)
+        layout.addWidget(self.result_tree)
+        self.records = []
         # Effects state
         self.effect_crt = False
         self.effect_scanline = False
@@ -94,11 +343,18 @@ class DomainLookupTool(QWidget):
         self.effects_btn.setFixedWidth(90)
         self.effects_btn.clicked.connect(self.open_effects_menu)
         bottom_row.addWidget(self.effects_btn)
+        self.export_btn = QPushButton('Export...')
+        self.export_btn.setFixedWidth(90)
+        self.export_btn.clicked.connect(self.export_results)
+        bottom_row.addWidget(self.export_btn)
         bottom_row.addStretch(1)
+        self.cache_bar = DNSCacheBar()
+        bottom_row.addWidget(self.cache_bar)
         layout.addLayout(bottom_row)
         self.setLayout(layout)
         self.worker = None
         self.whois_worker = None
+        self.dialogs = {}
         self.update_result_effects()
 
     def open_effects_menu(self):
@@ -144,23 +400,23 @@ class DomainLookupTool(QWidget):
 
     def _do_shake_flash(self):
         # Apply invisible border (same as background) to shift text, then remove
-        orig_style = self.result_box.styleSheet()
+        orig_style = self.result_tree.styleSheet()
         if 'border: 2px solid #101014;' not in orig_style:
-            self.result_box.setStyleSheet(orig_style + 'border: 2px solid #101014;')
+            self.result_tree.setStyleSheet(orig_style + 'border: 2px solid #101014;')
         from PyQt6.QtCore import QTimer
         QTimer.singleShot(150, lambda: self._remove_invisible_shake_border(orig_style))
         self._set_next_shake_flash_interval()
 
     def _remove_invisible_shake_border(self, orig_style):
         # Remove the invisible border
-        self.result_box.setStyleSheet(orig_style.replace('border: 2px solid #101014;', ''))
+        self.result_tree.setStyleSheet(orig_style.replace('border: 2px solid #101014;', ''))
 
     def update_result_effects(self):
         # CRT effect: green text, bold font
         if self.effect_crt:
-            self.result_box.setStyleSheet('background: #101014; color: #39ff14; font-family: Consolas; font-size: 14px; font-weight: bold;')
+            self.result_tree.setStyleSheet('background: #101014; color: #39ff14; font-family: Consolas; font-size: 14px; font-weight: bold;')
         else:
-            self.result_box.setStyleSheet('background: #101014; color: #c0c0ff; font-family: Consolas; font-size: 14px;')
+            self.result_tree.setStyleSheet('background: #101014; color: #c0c0ff; font-family: Consolas; font-size: 14px;')
         # Shake effect: stop timer if not enabled
         if not getattr(self, 'effect_shake', False):
             if hasattr(self, '_shake_flash_timer') and self._shake_flash_timer:
@@ -170,10 +426,10 @@ class DomainLookupTool(QWidget):
         from modules.scanline_overlay import ScanlineOverlay
         if self.effect_scanline:
             if not self._scanline_overlay:
-                self._scanline_overlay = ScanlineOverlay(self.result_box)
-                self._scanline_overlay.setParent(self.result_box.viewport())
+                self._scanline_overlay = ScanlineOverlay(self.result_tree)
+                self._scanline_overlay.setParent(self.result_tree.viewport())
                 self._scanline_overlay.raise_()
-            self._scanline_overlay.resize(self.result_box.viewport().size())
+            self._scanline_overlay.resize(self.result_tree.viewport().size())
             self._scanline_overlay.show()
         else:
             if self._scanline_overlay:
@@ -202,66 +458,152 @@ class DomainLookupTool(QWidget):
 
     def _do_glitch(self):
         import random
-        if not hasattr(self, '_original_text'):
-            self._original_text = self.result_box.toPlainText()
-        text = self.result_box.toPlainText()
-        if not text.strip():
+        # Scramble a few characters of the visible rows for a moment
+        items = []
+        it = self.result_tree.topLevelItem(0)
+        while it is not None and len(items) < 60:
+            items.append(it)
+            it = self.result_tree.itemBelow(it)
+        cells = [(item, col) for item in items for col in (0, 1) if item.text(col)]
+        if not cells:
+            self._set_next_glitch_interval()
             return
-        self._original_text = text
-        # Save current scroll position
-        scroll_bar = self.result_box.verticalScrollBar()
-        scroll_pos = scroll_bar.value()
-        lines = text.splitlines()
+        self._restore_result_text()
         glitch_chars = '█▓▒░@#$%&*?!/\\|><~'
-        X = 30
-        start_idx = max(0, len(lines) - X)
+        self._glitched = []
         for _ in range(random.randint(2, 6)):
-            if len(lines) == 0:
-                break
-            line_idx = random.randint(start_idx, len(lines)-1)
-            if not lines[line_idx]:
-                continue
-            char_idx = random.randint(0, len(lines[line_idx])-1)
-            gl = random.choice(glitch_chars)
-            lines[line_idx] = lines[line_idx][:char_idx] + gl + lines[line_idx][char_idx+1:]
-        self.result_box.setPlainText('\n'.join(lines))
-        scroll_bar.setValue(scroll_pos)
+            item, col = random.choice(cells)
+            text = item.text(col)
+            self._glitched.append((item, col, text))
+            char_idx = random.randint(0, len(text) - 1)
+            item.setText(col, text[:char_idx] + random.choice(glitch_chars) + text[char_idx + 1:])
         self._glitching = True
         from PyQt6.QtCore import QTimer
-        QTimer.singleShot(120, lambda: self._restore_result_text(scroll_pos))
+        QTimer.singleShot(120, self._restore_result_text)
         self._set_next_glitch_interval()
 
-    def _restore_result_text(self, scroll_pos=None):
-        if hasattr(self, '_original_text'):
-            self.result_box.setPlainText(self._original_text)
-            if scroll_pos is not None:
-                self.result_box.verticalScrollBar().setValue(scroll_pos)
+    def _restore_result_text(self):
+        # Undo in reverse so a cell glitched twice ends up with its original text
+        for item, col, text in reversed(getattr(self, '_glitched', [])):
+            try:
+                item.setText(col, text)
+            except RuntimeError:
+                pass  # the item was cleared meanwhile
+        self._glitched = []
         self._glitching = False
     def start_lookup(self):
         domain = self.domain_input.text().strip()
         if not domain:
-            self.result_box.setText('Please enter a domain.')
+            self.status_label.setText('Please enter a domain.')
             return
-        self.result_box.setText('Looking up...')
+        self._restore_result_text()
+        self.result_tree.clear()
+        self.records = []
+        self.status_label.setText(f'DNS records for {domain}...')
         self.lookup_btn.setEnabled(False)
-        self.worker = DNSLookupWorker(domain)
-        self.worker.result.connect(self.on_result)
+        self.worker = DNSLookupWorker(domain, bypass_cache=self.cache_bar.bypass())
+        self.worker.record.connect(self.on_record)
+        self.worker.finished.connect(self.on_lookup_finished)
         self.worker.start()
-    def on_result(self, text):
-        self.result_box.setText(text)
+    def on_record(self, rtype, values, error):
+        if not rtype:
+            self.status_label.setText(error)
+            return
+        if values:
+            summary = f'{len(values)} record' + ('s' if len(values) > 1 else '')
+        else:
+            summary = f'Error - {error}' if error else '-'
+        self.records.extend({'section': 'DNS', 'type': rtype, 'value': v, 'error': ''} for v in values)
+        if not values:
+            self.records.append({'section': 'DNS', 'type': rtype, 'value': '', 'error': error})
+        top = self._add_section(rtype, summary, values, error=bool(error))
+        # Keep record sets in the usual order whatever order they arrive in
+        order = RECORD_TYPES.index(rtype) if rtype in RECORD_TYPES else len(RECORD_TYPES)
+        top.setData(0, Qt.ItemDataRole.UserRole, order)
+        index = self.result_tree.indexOfTopLevelItem(top)
+        while index > 0:
+            prev = self.result_tree.topLevelItem(index - 1).data(0, Qt.ItemDataRole.UserRole)
+            if prev is None or prev <= order:
+                break
+            index -= 1
+        if index != self.result_tree.indexOfTopLevelItem(top):
+            self.result_tree.takeTopLevelItem(self.result_tree.indexOfTopLevelItem(top))
+            self.result_tree.insertTopLevelItem(index, top)
+            top.setExpanded(True)
+    def _add_section(self, label, summary, rows, error=False):
+        # rows: values, or (label, value) pairs; returns the new top-level item
+        from PyQt6.QtGui import QColor
+        top = QTreeWidgetItem([label, summary])
+        if error:
+            top.setForeground(1, QColor('#ffaaaa'))
+        top.addChildren([QTreeWidgetItem(list(r) if isinstance(r, tuple) else ['', r]) for r in rows])
+        self.result_tree.addTopLevelItem(top)
+        top.setExpanded(True)
+        return top
+    def on_lookup_finished(self):
         self.lookup_btn.setEnabled(True)
+        found = sum(1 for r in self.records if r['section'] == 'DNS' and r['value'])
+        self.status_label.setText(f'DNS lookup done: {found} records')
+        self.cache_bar.refresh()
+
+    def export_results(self):
+        from PyQt6.QtWidgets import QFileDialog
+        if not self.records:
+            self.status_label.setText('Nothing to export yet.')
+            return
+        path, selected = QFileDialog.getSaveFileName(self, 'Export Results', 'lookup.csv', 'CSV files (*.csv);;JSON files (*.json)')
+        if not path:
+            return
+        try:
+            export_rows(path, self.records, 'json' if 'json' in selected.lower() or path.lower().endswith('.json') else 'csv',
+                        LOOKUP_FIELDS)
+            self.status_label.setText(f'Exported {len(self.records)} entries to {path}')
+        except OSError as e:
+            self.status_label.setText(f'Export failed: {e}')
+
+    def open_dialog(self, name, cls):
+        # Tool dialogs are created once and keep their results while hidden
+        dialog = self.dialogs.get(name)
+        if dialog is None:
+            dialog = self.dialogs[name] = cls(self.cache_bar, self)
+        dialog.show()
+        dialog.raise_()
 
     def start_whois(self):
         domain = self.domain_input.text().strip()
         if not domain:
-            self.result_box.setText('Please enter a domain.')
+            self.status_label.setText('Please enter a domain.')
             return
-        self.result_box.append('\nWHOIS: Looking up...')
+        self.status_label.setText('WHOIS: Looking up...')
         self.whois_btn.setEnabled(False)
-        self.whois_worker = WhoisLookupWorker(domain)
+        self.whois_worker = WhoisLookupWorker(domain, self.whois_age_input.value() * 3600)
         self.whois_worker.result.connect(self.on_whois_result)
+        self.whois_worker.error.connect(self.on_whois_error)
         self.whois_worker.start()
 
-    def on_whois_result(self, text):
-        self.result_box.append(text)
+    def _replace_whois(self, summary, rows, records, error=False):
+        # A new WHOIS answer replaces the previous one and sits below the DNS record sets
+        self._restore_result_text()
+        for i in range(self.result_tree.topLevelItemCount() - 1, -1, -1):
+            if self.result_tree.topLevelItem(i).text(0) == 'WHOIS':
+                self.result_tree.takeTopLevelItem(i)
+        self.records = [r for r in self.records if r['section'] != 'WHOIS'] + records
+        top = self._add_section('WHOIS', summary, rows, error)
+        top.setData(0, Qt.ItemDataRole.UserRole, len(RECORD_TYPES) + 1)
         self.whois_btn.setEnabled(True)
+
+    def on_whois_result(self, info, age):
+        rows = []
+        records = []
+        for field, value in info.items():
+            label = field.replace('_', ' ').title()
+            for v in (value if isinstance(value, list) else [value]):
+                rows.append((label, str(v)))
+                records.append({'section': 'WHOIS', 'type': field, 'value': str(v), 'error': ''})
+        summary = f'cached, fetched {format_age(age)}' if age else 'fresh'
+        self._replace_whois(summary if rows else 'No WHOIS data found.', rows, records)
+        self.status_label.setText('WHOIS: done')
+
+    def on_whois_error(self, message):
+        self._replace_whois(f'Error - {message}', [], [{'section': 'WHOIS', 'type': '', 'value': '', 'error': message}], error=True)
+        self.status_label.setText('WHOIS: failed')
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+import threading
+import time
+from shared.paths import data_path
+
+# Where an address is located changes rarely, so answers are reused for a week by default
+DEFAULT_MAX_AGE = 7 * 86400
+DEFAULT_MAX_ENTRIES = 50000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geo (
+    ip TEXT PRIMARY KEY,
+    fetched REAL NOT NULL,
+    used REAL NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS geo_used ON geo (used);
+"""
+
+# Hits and misses since the process started, over all connections
+_counters = {'hits': 0, 'misses': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(hits, misses):
+    with _counters_lock:
+        _counters['hits'] += hits
+        _counters['misses'] += misses
+
+
+class GeoCache:
+    # SQLite-backed geolocation answers keyed by IP, kept as an LRU: every read refreshes
+    # an entry's use time and writes beyond max_entries drop the least recently used.
+    # Like WhoisCache, each connection belongs to the thread that opened it.
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or data_path('geo_cache.db')
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, ips, max_age=DEFAULT_MAX_AGE):
+        # Returns {ip: (info, age_seconds)} for the answers younger than max_age
+        now = time.time()
+        found = {}
+        ips = list(ips)
+        for i in range(0, len(ips), 500):
+            chunk = ips[i:i + 500]
+            rows = self.conn.execute(f"SELECT ip, fetched, info FROM geo WHERE ip IN ({','.join('?' * len(chunk))})",
+                                     chunk).fetchall()
+            for ip, fetched, info in rows:
+                if now - fetched <= max_age:
+                    found[ip] = (json.loads(info), now - fetched)
+        if found:
+            with self.conn:
+                self.conn.executemany('UPDATE geo SET used = ? WHERE ip = ?', [(now, ip) for ip in found])
+        _count(len(found), len(ips) - len(found))
+        return found
+
+    def get(self, ip, max_age=DEFAULT_MAX_AGE):
+        # Returns (info, age_seconds) for an answer younger than max_age, else None
+        return self.get_many([ip], max_age).get(ip)
+
+    def put_many(self, infos, fetched=None):
+        # infos: {ip: info}
+        now = time.time()
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO geo (ip, fetched, used, info) VALUES (?, ?, ?, ?)',
+                                  [(ip, fetched or now, now, json.dumps(info)) for ip, info in infos.items()])
+            excess = self.entries() - self.max_entries
+            if excess > 0:
+                self.conn.execute('DELETE FROM geo WHERE ip IN (SELECT ip FROM geo ORDER BY used LIMIT ?)', (excess,))
+
+    def put(self, ip, info, fetched=None):
+        self.put_many({ip: info}, fetched)
+
+    def entries(self):
+        return self.conn.execute('SELECT COUNT(*) FROM geo').fetchone()[0]
+
+    def stats(self):
+        with _counters_lock:
+            counters = dict(_counters)
+        return dict(counters, entries=self.entries(), max_entries=self.max_entries)
+
+    def purge(self, max_age=DEFAULT_MAX_AGE):
+        # Drops answers older than max_age; returns how many went
+        with self.conn:
+            cur = self.conn.execute('DELETE FROM geo WHERE fetched < ?', (time.time() - max_age,))
+        return cur.rowcount
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM geo')
+        with _counters_lock:
+            _counters['hits'] = _counters['misses'] = 0
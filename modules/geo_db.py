@@ -0,0 +1,320 @@
+import bisect
+import csv
+import ipaddress
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+from shared.paths import data_path
+
+# Offline geolocation. A CSV of address ranges is compiled once into INDEX_NAME, a flat
+# file of fixed-width (start, end, record) entries sorted by start address, which is
+# memory-mapped and searched with bisect. MaxMind-format .mmdb files are already a
+# memory-mapped search tree, so they are copied as MMDB_NAME and read with the optional
+# maxminddb package. Answers have the shape of ip-api.com answers.
+
+INDEX_NAME = 'geo.tbgeo'
+MMDB_NAME = 'geo.mmdb'
+_MAGIC = b'TBGEO\x00\x01\x00'
+_HEADER = struct.Struct('<8sIII')
+_REC = struct.Struct('<I')
+_OFFSET = struct.Struct('<Q')
+# Key width per family; an entry is start key, end key and a record number
+_WIDTH = {4: 4, 6: 16}
+
+# Columns assumed for CSV files without a header row: the DB-IP lite layout
+# (dbip-city-lite-*.csv: start, end, continent code, country code, region, city, lat, lon)
+DEFAULT_COLUMNS = ('start', 'end', 'continentCode', 'countryCode', 'regionName', 'city', 'lat', 'lon')
+# Header names of the common free range databases, mapped onto ip-api field names
+_ALIASES = {
+    'start': ('start', 'start_ip', 'ip_start', 'ip_from', 'first', 'from', 'range_start'),
+    'end': ('end', 'end_ip', 'ip_end', 'ip_to', 'last', 'to', 'range_end'),
+    'network': ('network', 'cidr', 'prefix', 'subnet'),
+    'continentCode': ('continentcode', 'continent_code'),
+    'country': ('country', 'country_name'),
+    'countryCode': ('countrycode', 'country_code', 'country_iso_code', 'iso_code'),
+    'regionName': ('regionname', 'region', 'region_name', 'stateprov', 'state', 'subdivision_1_name'),
+    'city': ('city', 'city_name'),
+    'zip': ('zip', 'zipcode', 'zip_code', 'postal_code', 'postcode'),
+    'lat': ('lat', 'latitude'),
+    'lon': ('lon', 'lng', 'longitude'),
+    'isp': ('isp',),
+    'org': ('org', 'organization', 'organisation', 'autonomous_system_organization', 'as_organization'),
+    'as': ('as', 'asn', 'autonomous_system_number', 'as_number'),
+    'asname': ('asname', 'as_name', 'as_description'),
+}
+_FIELD_FOR = {alias: field for field, aliases in _ALIASES.items() for alias in aliases}
+
+
+def _address(text):
+    # IP text or an integer (IP2Location style; IPv4-mapped IPv6 integers become IPv4)
+    text = text.strip()
+    if text.isdigit():
+        value = int(text)
+        if value < 2 ** 32:
+            return ipaddress.IPv4Address(value)
+        addr = ipaddress.IPv6Address(value)
+        return addr.ipv4_mapped or addr
+    addr = ipaddress.ip_address(text)
+    return getattr(addr, 'ipv4_mapped', None) or addr
+
+
+def _key(addr):
+    return addr.packed
+
+
+def _columns(first_row):
+    # Field names for each column, from a header row if the first row is one
+    names = [_FIELD_FOR.get(c.strip().lower().replace(' ', '_')) for c in first_row]
+    if 'start' in names or 'network' in names:
+        return names, True
+    return list(DEFAULT_COLUMNS) + [None] * max(0, len(first_row) - len(DEFAULT_COLUMNS)), False
+
+
+def _value(field, text):
+    text = text.strip()
+    if field in ('lat', 'lon'):
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return text
+
+
+def compile_csv(src, dest, columns=None, on_progress=None):
+    # Builds the range index at dest from a CSV of ranges ('start,end,...' or 'network,...').
+    # columns names the CSV columns when the file has no header (see DEFAULT_COLUMNS).
+    # Returns {'ranges': n, 'records': n, 'skipped': n}.
+    entries = {4: bytearray(), 6: bytearray()}
+    last = {4: b'', 6: b''}
+    ordered = {4: True, 6: True}
+    records = {}
+    skipped = 0
+    count = 0
+    with open(src, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or row[0].lstrip().startswith('#'):
+                continue
+            if columns is None:
+                columns, header = _columns(row)
+                if header:
+                    continue
+            fields = dict(zip(columns, row))
+            try:
+                if fields.get('network'):
+                    net = ipaddress.ip_network(fields['network'].strip(), strict=False)
+                    start, end = net.network_address, net.broadcast_address
+                else:
+                    start, end = _address(fields['start']), _address(fields['end'])
+                if start.version != end.version or start > end:
+                    raise ValueError(f'bad range {start} - {end}')
+            except (KeyError, ValueError):
+                skipped += 1
+                continue
+            record = tuple((name, _value(name, text)) for name, text in fields.items()
+                           if name and name not in ('start', 'end', 'network') and text.strip())
+            number = records.setdefault(record, len(records))
+            version = start.version
+            key = _key(start)
+            if key < last[version]:
+                ordered[version] = False
+            last[version] = key
+            entries[version] += key + _key(end) + _REC.pack(number)
+            count += 1
+            if on_progress and count % 100000 == 0:
+                on_progress(count)
+    if not count:
+        raise ValueError(f'No address ranges found in {src}')
+    for version in (4, 6):
+        if not ordered[version]:
+            size = 2 * _WIDTH[version] + _REC.size
+            data = entries[version]
+            entries[version] = bytearray(b''.join(sorted(bytes(data[i:i + size]) for i in range(0, len(data), size))))
+    tmp = dest + '.tmp'
+    with open(tmp, 'wb') as out:
+        sizes = {v: 2 * _WIDTH[v] + _REC.size for v in (4, 6)}
+        out.write(_HEADER.pack(_MAGIC, len(entries[4]) // sizes[4], len(entries[6]) // sizes[6], len(records)))
+        out.write(entries[4])
+        out.write(entries[6])
+        blobs = [json.dumps(dict(record), separators=(',', ':')).encode() for record in records]
+        offset = 0
+        for blob in blobs:
+            out.write(_OFFSET.pack(offset))
+            offset += len(blob)
+        out.write(_OFFSET.pack(offset))
+        for blob in blobs:
+            out.write(blob)
+    os.replace(tmp, dest)
+    return {'ranges': count, 'records': len(records), 'skipped': skipped}
+
+
+class _Keys:
+    # Start keys of one family's entries as a read-only sequence, so bisect works on the map
+    def __init__(self, mm, base, count, width):
+        self.mm = mm
+        self.base = base
+        self.count = count
+        self.width = width
+        self.size = 2 * width + _REC.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        pos = self.base + i * self.size
+        return self.mm[pos:pos + self.width]
+
+    def entry(self, i):
+        pos = self.base + i * self.size + self.width
+        end = self.mm[pos:pos + self.width]
+        return end, _REC.unpack_from(self.mm, pos + self.width)[0]
+
+
+class RangeIndex:
+    # Read side of a compiled range index
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n4, n6, nrec = _HEADER.unpack_from(self.mm, 0)
+        if magic != _MAGIC:
+            self.mm.close()
+            raise ValueError(f'{path} is not a geolocation index')
+        pos = _HEADER.size
+        self.keys = {4: _Keys(self.mm, pos, n4, _WIDTH[4])}
+        pos += n4 * self.keys[4].size
+        self.keys[6] = _Keys(self.mm, pos, n6, _WIDTH[6])
+        pos += n6 * self.keys[6].size
+        self.offsets = pos
+        self.blobs = pos + (nrec + 1) * _OFFSET.size
+        self.ranges = n4 + n6
+        self.records = nrec
+
+    def close(self):
+        self.mm.close()
+
+    def record(self, number):
+        start, end = struct.unpack_from('<QQ', self.mm, self.offsets + number * _OFFSET.size)
+        return json.loads(self.mm[self.blobs + start:self.blobs + end])
+
+    def get(self, addr):
+        # Fields of the range holding addr, or None
+        keys = self.keys[addr.version]
+        key = _key(addr)
+        i = bisect.bisect_right(keys, key) - 1
+        if i < 0:
+            return None
+        end, number = keys.entry(i)
+        return self.record(number) if key <= end else None
+
+
+def _name(node):
+    return ((node or {}).get('names') or {}).get('en', '')
+
+
+class MMDBIndex:
+    # MaxMind DB (GeoLite2 / DB-IP .mmdb) through the optional maxminddb package
+    def __init__(self, path):
+        try:
+            import maxminddb
+        except ImportError:
+            raise ValueError('Reading .mmdb files needs the maxminddb package (pip install maxminddb)')
+        self.path = path
+        self.reader = maxminddb.open_database(path, maxminddb.MODE_MMAP)
+        self.ranges = self.reader.metadata().node_count
+        self.records = None
+
+    def close(self):
+        self.reader.close()
+
+    def get(self, addr):
+        rec = self.reader.get(str(addr))
+        if not rec:
+            return None
+        info = {}
+        country = rec.get('country') or rec.get('registered_country') or {}
+        subdivisions = rec.get('subdivisions') or [{}]
+        location = rec.get('location') or {}
+        for field, value in (('country', _name(country)), ('countryCode', country.get('iso_code', '')),
+                             ('regionName', _name(subdivisions[0])), ('city', _name(rec.get('city'))),
+                             ('zip', (rec.get('postal') or {}).get('code', '')),
+                             ('lat', location.get('latitude')), ('lon', location.get('longitude')),
+                             ('org', rec.get('autonomous_system_organization', '')),
+                             ('as', rec.get('autonomous_system_number', ''))):
+            if value not in ('', None):
+                info[field] = value
+        return info
+
+
+class GeoDB:
+    def __init__(self, index):
+        self.index = index
+
+    def close(self):
+        self.index.close()
+
+    def info(self):
+        return {'path': self.index.path, 'ranges': self.index.ranges, 'records': self.index.records}
+
+    def lookup(self, ip):
+        # ip-api shaped answer for one address; 'fail' when it is not covered
+        try:
+            addr = _address(ip)
+        except ValueError:
+            return {'status': 'fail', 'message': 'invalid query', 'query': ip}
+        fields = self.index.get(addr)
+        if fields is None:
+            if not addr.is_global:
+                return {'status': 'fail', 'message': 'private range' if addr.is_private else 'reserved range', 'query': ip}
+            return {'status': 'fail', 'message': 'not in offline database', 'query': ip}
+        if 'country' not in fields and 'countryCode' in fields:
+            # Lite databases only carry the ISO code; show it where the name would go
+            fields['country'] = fields['countryCode']
+        return {'status': 'success', **fields, 'query': ip}
+
+    def trace_many(self, ips, on_result, stop=None):
+        for ip in ips:
+            if stop and stop():
+                return
+            on_result(self.lookup(ip))
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def geo_db():
+    # The imported database, opened once per process; None when nothing was imported
+    global _db
+    with _db_lock:
+        if _db is None:
+            if os.path.exists(data_path(INDEX_NAME)):
+                _db = GeoDB(RangeIndex(data_path(INDEX_NAME)))
+            elif os.path.exists(data_path(MMDB_NAME)):
+                _db = GeoDB(MMDBIndex(data_path(MMDB_NAME)))
+        return _db
+
+
+def import_db(src, columns=None, on_progress=None):
+    # Installs src (.mmdb, or a CSV of ranges compiled here) as the offline database.
+    # Returns its info(); raises ValueError/OSError on unusable input.
+    # The open database is closed first: Windows cannot replace a mapped file
+    global _db
+    with _db_lock:
+        if _db is not None:
+            _db.close()
+            _db = None
+        if src.lower().endswith('.mmdb'):
+            MMDBIndex(src).close()
+            shutil.copyfile(src, data_path(MMDB_NAME) + '.tmp')
+            os.replace(data_path(MMDB_NAME) + '.tmp', data_path(MMDB_NAME))
+            stale = data_path(INDEX_NAME)
+        else:
+            compile_csv(src, data_path(INDEX_NAME), columns, on_progress)
+            stale = data_path(MMDB_NAME)
+        if os.path.exists(stale):
+            os.remove(stale)
+    return geo_db().info()
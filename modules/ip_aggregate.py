@@ -0,0 +1,216 @@
+import ipaddress
+import os
+import shutil
+import threading
+from shared.paths import data_path
+
+# Summaries of large address sets: minimal CIDR blocks, grouped by the AS that announces
+# them. Prefix -> ASN data comes from a local table (pyasn/ipasn 'prefix asn' lines or
+# iptoasn.com 'start end asn country name' TSV) held in a path-compressed radix trie for
+# longest-prefix matching.
+
+TABLE_NAME = 'asn_prefixes.txt'
+SUMMARY_FIELDS = ('rank', 'asn', 'name', 'ips', 'share', 'blocks', 'cidrs', 'prefixes')
+
+
+class _Node:
+    __slots__ = ('key', 'length', 'value', 'children')
+
+    def __init__(self, key, length, value=None):
+        self.key = key
+        self.length = length
+        self.value = value
+        self.children = [None, None]
+
+
+class PrefixTrie:
+    # Path-compressed binary trie over one address family. Keys are network addresses as
+    # ints; a node only exists where a prefix ends or two branches part.
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = _Node(0, 0)
+        self.size = 0
+
+    def _bit(self, key, pos):
+        return (key >> (self.bits - 1 - pos)) & 1
+
+    def _common(self, a, b):
+        return self.bits - (a ^ b).bit_length()
+
+    def insert(self, key, length, value):
+        node = self.root
+        if length == 0:
+            self.size += node.value is None
+            node.value = value
+            return
+        while True:
+            bit = self._bit(key, node.length)
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(key, length, value)
+                self.size += 1
+                return
+            common = min(child.length, length, self._common(child.key, key))
+            if common == child.length == length:
+                self.size += child.value is None
+                child.value = value
+                return
+            if common == child.length:
+                node = child
+                continue
+            if common == length:
+                # The new prefix sits above the child
+                new = _Node(key, length, value)
+                new.children[self._bit(child.key, length)] = child
+                node.children[bit] = new
+            else:
+                # Split the edge where the two part
+                mask = ((1 << common) - 1) << (self.bits - common)
+                mid = _Node(key & mask, common)
+                mid.children[self._bit(child.key, common)] = child
+                mid.children[self._bit(key, common)] = _Node(key, length, value)
+                node.children[bit] = mid
+            self.size += 1
+            return
+
+    def lookup(self, key):
+        # (network_int, length, value) of the longest prefix holding key, or None
+        node = self.root
+        best = (0, 0, node.value) if node.value is not None else None
+        while node.length < self.bits:
+            child = node.children[self._bit(key, node.length)]
+            if child is None:
+                break
+            shift = self.bits - child.length
+            if key >> shift != child.key >> shift:
+                break
+            if child.value is not None:
+                best = (child.key, child.length, child.value)
+            node = child
+        return best
+
+
+class ASNTable:
+    def __init__(self):
+        self.tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.names = {}
+
+    def add(self, network, asn, name=''):
+        self.tries[network.version].insert(int(network.network_address), network.prefixlen, asn)
+        if name and asn not in self.names:
+            self.names[asn] = name
+
+    def lookup(self, addr):
+        # (announced prefix, asn) for an ipaddress address, or None
+        hit = self.tries[addr.version].lookup(int(addr))
+        if hit is None:
+            return None
+        key, length, asn = hit
+        return ipaddress.ip_network((key, length)), asn
+
+    def __len__(self):
+        return self.tries[4].size + self.tries[6].size
+
+
+def _asn(text):
+    text = text.strip().upper()
+    return int(text[2:] if text.startswith('AS') else text)
+
+
+def parse_table(lines):
+    # Builds an ASNTable from 'prefix asn [name]' or 'start end asn [country] [name]'
+    # lines (tab, comma or space separated; '#'/';' comments). AS 0 marks unrouted space.
+    table = ASNTable()
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        sep = '\t' if '\t' in line else (',' if ',' in line else None)
+        parts = [p.strip() for p in line.split(sep)]
+        try:
+            if '/' in parts[0]:
+                networks = [ipaddress.ip_network(parts[0], strict=False)]
+                asn, rest = _asn(parts[1]), parts[2:]
+            else:
+                start, end = ipaddress.ip_address(parts[0]), ipaddress.ip_address(parts[1])
+                networks = list(ipaddress.summarize_address_range(start, end))
+                asn, rest = _asn(parts[2]), parts[3:]
+                if rest and (rest[0] == 'None' or (len(rest[0]) == 2 and rest[0].isalpha() and rest[0].isupper())):
+                    rest = rest[1:]  # country code column
+        except (IndexError, ValueError, TypeError):
+            continue
+        if asn == 0:
+            continue
+        name = ' '.join(rest)
+        for network in networks:
+            table.add(network, asn, name)
+    return table
+
+
+def load_table(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return parse_table(f)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def asn_table():
+    # The imported table, parsed once per process; None when nothing was imported
+    global _table
+    with _table_lock:
+        if _table is None and os.path.exists(data_path(TABLE_NAME)):
+            _table = load_table(data_path(TABLE_NAME))
+        return _table
+
+
+def import_table(src):
+    # Installs src as the prefix -> ASN table; returns the number of prefixes
+    global _table
+    table = load_table(src)
+    if not len(table):
+        raise ValueError(f'No prefix/ASN lines found in {src}')
+    shutil.copyfile(src, data_path(TABLE_NAME) + '.tmp')
+    os.replace(data_path(TABLE_NAME) + '.tmp', data_path(TABLE_NAME))
+    with _table_lock:
+        _table = table
+    return len(table)
+
+
+def collapse(ips):
+    # Minimal CIDR blocks covering exactly the given addresses, IPv4 first
+    by_version = {4: [], 6: []}
+    for ip in ips:
+        addr = ipaddress.ip_address(ip)
+        by_version[addr.version].append(addr)
+    return [net for version in (4, 6) for net in ipaddress.collapse_addresses(by_version[version])]
+
+
+def summarize(ips, table=None, stop=None):
+    # One row per AS, most addresses first: rank, asn, name, ips, share (% of all addresses),
+    # blocks, cidrs (the AS's addresses collapsed) and prefixes (announced prefixes hit).
+    # Addresses the table does not cover are grouped under asn ''.
+    groups = {}
+    addresses = [ipaddress.ip_address(ip) for ip in dict.fromkeys(ips)]
+    for i, addr in enumerate(addresses):
+        if stop and i % 4096 == 0 and stop():
+            break
+        hit = table.lookup(addr) if table is not None else None
+        asn, prefix = (hit[1], hit[0]) if hit else ('', None)
+        group = groups.setdefault(asn, {'ips': [], 'prefixes': set()})
+        group['ips'].append(addr)
+        if prefix is not None:
+            group['prefixes'].add(prefix)
+    rows = []
+    for asn, group in groups.items():
+        blocks = collapse(group['ips'])
+        name = (table.names.get(asn, '') if table is not None else '') if asn != '' else 'not in ASN table'
+        rows.append({'asn': f'AS{asn}' if asn != '' else '', 'name': name, 'ips': len(group['ips']),
+                     'share': 100.0 * len(group['ips']) / len(addresses), 'blocks': len(blocks),
+                     'cidrs': '; '.join(map(str, blocks)),
+                     'prefixes': '; '.join(map(str, sorted(group['prefixes'], key=lambda n: (n.version, n))))})
+    rows.sort(key=lambda r: (-r['ips'], r['asn']))
+    for rank, row in enumerate(rows, 1):
+        row['rank'] = rank
+    return rows
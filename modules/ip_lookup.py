@@ -0,0 +1,262 @@
+import ipaddress
+import os
+import re
+import socket
+import threading
+import time
+import requests
+from modules.dns_cache import resolve_ip
+
+GEO_FIELDS = "status,message,country,regionName,city,zip,lat,lon,isp,org,asname,query"
+# ip-api.com (free tier: plain HTTP). TOOLBELT_IPAPI_URL points it elsewhere, e.g. at a local stand-in.
+API_BASE = os.environ.get('TOOLBELT_IPAPI_URL', 'http://ip-api.com')
+# Most addresses the /batch endpoint takes per request
+BATCH_SIZE = 100
+# Columns of a bulk trace row (see geo_row)
+GEO_ROW_FIELDS = ('query', 'status', 'country', 'regionName', 'city', 'isp', 'org', 'asname', 'lat', 'lon')
+# How long a WAN IP answer is trusted while the local address stays the same
+WAN_IP_TTL = 600
+
+
+class GeoClient:
+    # Keep-alive session to ip-api.com, paced by its rate-limit headers: X-Rl is the number
+    # of requests left in the current window and X-Ttl the seconds until the window resets.
+    # When X-Rl hits 0 (or the server answers 429) every caller waits out X-Ttl.
+    RETRIES = 3
+
+    def __init__(self, base_url=API_BASE, timeout=8):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._resume = 0.0
+
+    def _wait(self, stop=None):
+        while True:
+            with self._lock:
+                delay = self._resume - time.monotonic()
+            if delay <= 0 or (stop and stop()):
+                return
+            time.sleep(min(delay, 0.25))
+
+    def _pace(self, resp):
+        try:
+            remaining = int(resp.headers['X-Rl'])
+            ttl = int(resp.headers['X-Ttl'])
+        except (KeyError, ValueError):
+            remaining, ttl = (0, 60) if resp.status_code == 429 else (1, 0)
+        if remaining <= 0 or resp.status_code == 429:
+            with self._lock:
+                self._resume = max(self._resume, time.monotonic() + ttl + 0.5)
+
+    def request(self, method, path, stop=None, **kw):
+        # Returns the decoded answer, or None when stop() turned true while waiting
+        for attempt in range(self.RETRIES + 1):
+            self._wait(stop)
+            if stop and stop():
+                return None
+            resp = self.session.request(method, self.base_url + path, timeout=self.timeout, **kw)
+            self._pace(resp)
+            if resp.status_code != 429:
+                resp.raise_for_status()
+                return resp.json()
+        raise requests.HTTPError('ip-api rate limit: too many requests', response=resp)
+
+    def trace(self, ip):
+        return self.request('GET', f'/json/{ip}?fields={GEO_FIELDS}')
+
+    def trace_batch(self, ips, stop=None):
+        # Up to BATCH_SIZE addresses in one POST; answers come back in the same order
+        return self.request('POST', f'/batch?fields={GEO_FIELDS}', stop=stop, json=list(ips))
+
+    def trace_many(self, ips, on_result, stop=None):
+        # Geolocates any number of addresses in BATCH_SIZE chunks, calling on_result(data)
+        # for each. Private and reserved addresses are answered locally without a request.
+        public = []
+        for ip in ips:
+            addr = ipaddress.ip_address(ip)
+            if addr.is_global:
+                public.append(ip)
+            else:
+                on_result({'status': 'fail', 'message': 'private range' if addr.is_private else 'reserved range', 'query': ip})
+        for i in range(0, len(public), BATCH_SIZE):
+            if stop and stop():
+                return
+            for data in self.trace_batch(public[i:i + BATCH_SIZE], stop) or ():
+                on_result(data)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def geo_client():
+    # Shared by every trace in the process so they reuse one connection and one rate budget
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeoClient()
+        return _client
+
+
+def offline_db():
+    # The imported offline database (see geo_db); raises ValueError when there is none
+    from modules.geo_db import geo_db
+    db = geo_db()
+    if db is None:
+        raise ValueError('No offline geolocation database imported yet')
+    return db
+
+
+def trace_ip(ip, timeout=8, bypass_cache=False, offline=False):
+    # Geolocates an IP or hostname through ip-api.com, or the offline database; returns
+    # the decoded JSON answer. Hostnames are resolved locally through the shared DNS cache
+    # when possible.
+    try:
+        ip = resolve_ip(ip, bypass=bypass_cache)
+    except (OSError, UnicodeError):
+        if offline:
+            raise
+        # let ip-api try the name itself
+    if offline:
+        return offline_db().lookup(ip)
+    client = geo_client()
+    client.timeout = timeout
+    return client.trace(ip)
+
+
+def cached_trace(ip, max_age=None, refresh=False, timeout=8, bypass_cache=False):
+    # trace_ip() through the persistent geolocation cache; returns (data, age_seconds) with
+    # age None for a fresh answer. Hostnames are cached under the address they resolve to;
+    # only successful answers are stored.
+    from modules.geo_cache import GeoCache, DEFAULT_MAX_AGE
+    max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+    try:
+        ip = resolve_ip(ip, bypass=bypass_cache)
+    except (OSError, UnicodeError):
+        return trace_ip(ip, timeout), None
+    cache = GeoCache()
+    try:
+        if not refresh and max_age > 0:
+            hit = cache.get(ip, max_age)
+            if hit is not None:
+                return hit
+        data = trace_ip(ip, timeout)
+        if data.get('status') == 'success':
+            cache.put(ip, data)
+        return data, None
+    finally:
+        cache.close()
+
+
+def cached_trace_many(ips, on_result, max_age=None, stop=None):
+    # GeoClient.trace_many() that answers cached addresses first and stores the fresh ones
+    from modules.geo_cache import GeoCache, DEFAULT_MAX_AGE
+    max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+    cache = GeoCache()
+    try:
+        hits = cache.get_many(ips, max_age) if max_age > 0 else {}
+        for ip in ips:
+            if ip in hits:
+                on_result(hits[ip][0])
+        fresh = {}
+        def on_fresh(data):
+            if data.get('status') == 'success':
+                fresh[data['query']] = data
+            on_result(data)
+        try:
+            geo_client().trace_many([ip for ip in ips if ip not in hits], on_fresh, stop)
+        finally:
+            if fresh:
+                cache.put_many(fresh)
+    finally:
+        cache.close()
+
+
+def cache_state(age=None):
+    # One-line summary of the geolocation cache for the result box
+    from modules.geo_cache import GeoCache
+    from modules.whois_lookup import format_age
+    cache = GeoCache()
+    try:
+        stats = cache.stats()
+    finally:
+        cache.close()
+    answer = 'fresh answer' if age is None else f'cached answer from {format_age(age)}'
+    return (f"Cache: {answer} ({stats['entries']}/{stats['max_entries']} entries, "
+            f"{stats['hits']} hits / {stats['misses']} misses this session)")
+
+
+_IPV4 = re.compile(r'(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])')
+_IPV6 = re.compile(r'(?<![\w:])[0-9A-Fa-f:]*:[0-9A-Fa-f:.]+(?![\w:])')
+
+
+def extract_ips(text):
+    # Every distinct IPv4/IPv6 address in free text such as a log file, in order of appearance
+    found = []
+    seen = set()
+    for pattern in (_IPV4, _IPV6):
+        for match in pattern.finditer(text):
+            try:
+                ip = str(ipaddress.ip_address(match.group(0)))
+            except ValueError:
+                continue
+            if ip not in seen:
+                seen.add(ip)
+                found.append((match.start(), ip))
+    return [ip for _, ip in sorted(found)]
+
+
+def read_ips(spec):
+    # Pasted text, or @path of a log/text file
+    spec = spec.strip()
+    if spec.startswith('@') and '\n' not in spec:
+        with open(spec[1:], encoding='utf-8', errors='ignore') as f:
+            return extract_ips(f.read())
+    return extract_ips(spec)
+
+
+def geo_row(data):
+    # Flat row of an ip-api answer for tables and export; status is OK or the failure reason.
+    # Fields the answer lacks are None so numeric columns (lat, lon) never mix in strings.
+    row = {field: data.get(field) for field in GEO_ROW_FIELDS}
+    row['status'] = 'OK' if data.get('status') == 'success' else data.get('message', 'fail')
+    return row
+
+
+def format_trace(data):
+    if data.get('status') == 'success':
+        return f"IP: {data.get('query','')}\nCountry: {data.get('country','')}\nRegion: {data.get('regionName','')}\nCity: {data.get('city','')}\nZIP: {data.get('zip','')}\nLatitude: {data.get('lat','')}\nLongitude: {data.get('lon','')}\nISP: {data.get('isp','')}\nOrg: {data.get('org','')}\nASN: {data.get('asname','')}"
+    return f"Error: {data.get('message','Unknown error')}"
+
+
+def local_ip():
+    # Address of the interface that routes to the internet; a UDP connect sends no packet
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(('8.8.8.8', 80))
+        return s.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        s.close()
+
+
+_wan = {'ip': None, 'local': None, 'expires': 0.0}
+_wan_lock = threading.Lock()
+
+
+def wan_ip(local=None, ttl=WAN_IP_TTL, timeout=5, refresh=False):
+    # Public address as seen by api.ipify.org, cached for ttl seconds. A different local
+    # address (new network, VPN up/down) makes the cached answer stale at once.
+    # Returns None when the lookup fails; failures are not cached.
+    with _wan_lock:
+        if not refresh and _wan['ip'] and _wan['local'] == local and time.monotonic() < _wan['expires']:
+            return _wan['ip']
+    try:
+        ip = requests.get('https://api.ipify.org', timeout=timeout).text.strip()
+    except requests.RequestException:
+        return None
+    with _wan_lock:
+        _wan.update(ip=ip, local=local, expires=time.monotonic() + ttl)
+    return ip
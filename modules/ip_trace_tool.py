@@ -1,29 +1,228 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit
-from PyQt6.QtCore import QThread, pyqtSignal
-import requests
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QCheckBox
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from modules.ip_lookup import (trace_ip, cached_trace, cached_trace_many, cache_state, format_trace, local_ip, wan_ip,
+                               offline_db, read_ips, geo_row, GEO_ROW_FIELDS)
+from modules.dns_cache_bar import DNSCacheBar
+from modules.ip_aggregate import summarize, asn_table, import_table, SUMMARY_FIELDS
+from modules.table_lookup_dialog import TableLookupDialog
+import time
 
 class IPTraceWorker(QThread):
     result = pyqtSignal(str)
-    def __init__(self, ip):
+    def __init__(self, ip, bypass_cache=False, offline=False, max_age=None):
         super().__init__()
         self.ip = ip
+        self.bypass_cache = bypass_cache
+        self.offline = offline
+        self.max_age = max_age
     def run(self):
         try:
-            url = f"http://ip-api.com/json/{self.ip}?fields=status,message,country,regionName,city,zip,lat,lon,isp,org,asname,query"
-            resp = requests.get(url, timeout=8)
-            data = resp.json()
-            if data.get('status') == 'success':
-                lines = [
-                    f"IP: {data.get('query','')}\nCountry: {data.get('country','')}\nRegion: {data.get('regionName','')}\nCity: {data.get('city','')}\nZIP: {data.get('zip','')}\nLatitude: {data.get('lat','')}\nLongitude: {data.get('lon','')}\nISP: {data.get('isp','')}\nOrg: {data.get('org','')}\nASN: {data.get('asname','')}"
-                ]
-                result = '\n'.join(lines)
+            if self.offline:
+                result = format_trace(trace_ip(self.ip, bypass_cache=self.bypass_cache, offline=True))
             else:
-                result = f"Error: {data.get('message','Unknown error')}"
+                data, age = cached_trace(self.ip, self.max_age, bypass_cache=self.bypass_cache)
+                result = format_trace(data) + '\n\n' + cache_state(age)
         except Exception as e:
             result = f"Error: {e}"
         self.result.emit(result)
 
+class RouteWorker(QThread):
+    # Traceroute (all TTLs probed at once); the hops are then geolocated in one batch
+    hop = pyqtSignal(int, str, float, str)
+    located = pyqtSignal(str, str)
+    error = pyqtSignal(str)
+    def __init__(self, host, offline=False, max_age=None):
+        super().__init__()
+        self.host = host
+        self.offline = offline
+        self.max_age = max_age
+        self._stopped = False
+    def stop(self):
+        self._stopped = True
+    def locate(self, addresses):
+        pending = set(addresses)
+        def on_result(data):
+            pending.discard(data.get('query'))
+            self.located.emit(data.get('query', ''), hop_location(data))
+        try:
+            if self.offline:
+                offline_db().trace_many(addresses, on_result, lambda: self._stopped)
+            else:
+                cached_trace_many(addresses, on_result, self.max_age, stop=lambda: self._stopped)
+        except Exception as e:
+            if not self._stopped:
+                for ip in addresses:
+                    if ip in pending:
+                        self.located.emit(ip, str(e))
+    def run(self):
+        from modules.traceroute import trace
+        addresses = []
+        def on_reply(ttl, address, rtt, mark):
+            self.hop.emit(ttl, address, rtt, mark)
+            if address not in addresses:
+                addresses.append(address)
+        try:
+            trace(self.host, on_reply, stop=lambda: self._stopped)
+        except (OSError, UnicodeError) as e:
+            self.error.emit(str(e))
+        if addresses and not self._stopped:
+            self.locate(addresses)
+
+def hop_location(data):
+    if data.get('status') != 'success':
+        return data.get('message', '')
+    place = ', '.join(v for v in (data.get('city'), data.get('country')) if v)
+    owner = data.get('asname') or data.get('org') or data.get('isp')
+    return f'{place} ({owner})' if owner else place
+
+class GeoImportWorker(QThread):
+    # Compiles/installs an offline geolocation database; CSV files can take a while
+    progress = pyqtSignal(str)
+    done = pyqtSignal(str)
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+    def run(self):
+        from modules.geo_db import import_db
+        try:
+            info = import_db(self.path, on_progress=lambda n: self.progress.emit(f'Importing... {n} ranges read'))
+            self.done.emit(f"Offline database ready: {info['ranges']} ranges from {self.path}")
+        except Exception as e:
+            self.done.emit(f'Import failed: {e}')
+
+class IPInfoWorker(QThread):
+    # Local and WAN address lookup off the GUI thread; empty strings mean unavailable.
+    # The WAN address comes from a TTL cache that a local address change invalidates.
+    local_result = pyqtSignal(str)
+    wan_result = pyqtSignal(str)
+    def run(self):
+        local = local_ip()
+        self.local_result.emit(local or '')
+        self.wan_result.emit(wan_ip(local) or '')
+
+class BulkTraceDialog(TableLookupDialog):
+    # Geolocates every address found in pasted text or a log file. ip-api takes 100
+    # addresses per request and its rate-limit headers set the pace, so there is no
+    # in-flight limit to choose.
+    TITLE = 'Bulk IP Trace'
+    FIELDS = GEO_ROW_FIELDS
+    HEADERS = ('Address', 'Status', 'Country', 'Region', 'City', 'ISP', 'Org', 'AS Name', 'Latitude', 'Longitude')
+    CONCURRENCY = None
+    EXPORT_NAME = 'trace'
+    def __init__(self, max_age=None, parent=None):
+        # max_age() gives the geolocation cache expiry chosen in the tool
+        self.max_age = max_age or (lambda: None)
+        super().__init__(parent=parent)
+    def add_inputs(self, layout):
+        row = QHBoxLayout()
+        row.addWidget(QLabel('Addresses or log text (@file reads a file):'))
+        row.addStretch(1)
+        self.file_btn = QPushButton('Load File...')
+        self.file_btn.clicked.connect(self.choose_file)
+        row.addWidget(self.file_btn)
+        layout.addLayout(row)
+        self.ips_input = QTextEdit()
+        self.ips_input.setAcceptRichText(False)
+        self.ips_input.setMaximumHeight(120)
+        layout.addWidget(self.ips_input)
+        self.offline_check = QCheckBox('Use offline database (no requests, no rate limit)')
+        layout.addWidget(self.offline_check)
+    def choose_file(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Addresses', '', 'Logs and text (*.log *.txt *.csv);;All files (*)')
+        if path:
+            self.ips_input.setPlainText(f'@{path}')
+    def make_job(self):
+        ips = read_ips(self.ips_input.toPlainText())
+        if not ips:
+            raise ValueError('No IP addresses found.')
+        offline, max_age = self.offline_check.isChecked(), self.max_age()
+        source = offline_db() if offline else None
+        def job(on_row, stop, note):
+            try:
+                if offline:
+                    source.trace_many(ips, lambda data: on_row(geo_row(data)), stop=stop)
+                else:
+                    cached_trace_many(ips, lambda data: on_row(geo_row(data)), max_age, stop=stop)
+            except Exception as e:
+                note(f'Stopped early: {e}')
+        return len(ips), job
+
+class SummarizeDialog(TableLookupDialog):
+    # Collapses an address list into CIDR blocks grouped by announcing AS, largest first
+    TITLE = 'Summarize Addresses'
+    FIELDS = SUMMARY_FIELDS
+    HEADERS = ('#', 'ASN', 'Organization', 'IPs', '% of IPs', 'Blocks', 'CIDR Blocks', 'Announced Prefixes')
+    CONCURRENCY = None
+    EXPORT_NAME = 'summary'
+    def add_inputs(self, layout):
+        row = QHBoxLayout()
+        row.addWidget(QLabel('Addresses or log text (@file reads a file):'))
+        row.addStretch(1)
+        self.file_btn = QPushButton('Load File...')
+        self.file_btn.clicked.connect(self.choose_file)
+        row.addWidget(self.file_btn)
+        self.table_btn = QPushButton('ASN Table...')
+        self.table_btn.setToolTip('Import a prefix -> ASN table (pyasn/ipasn "prefix asn" or iptoasn.com TSV)')
+        self.table_btn.clicked.connect(self.import_table)
+        row.addWidget(self.table_btn)
+        layout.addLayout(row)
+        self.ips_input = QTextEdit()
+        self.ips_input.setAcceptRichText(False)
+        self.ips_input.setMaximumHeight(120)
+        layout.addWidget(self.ips_input)
+        self.import_worker = None
+    def choose_file(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Addresses', '', 'Logs and text (*.log *.txt *.csv);;All files (*)')
+        if path:
+            self.ips_input.setPlainText(f'@{path}')
+    def import_table(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Import ASN Table', '', 'Prefix tables (*.txt *.tsv *.dat *.csv);;All files (*)')
+        if not path:
+            return
+        self.table_btn.setEnabled(False)
+        self.status_label.setText('Importing ASN table...')
+        self.import_worker = ASNImportWorker(path)
+        self.import_worker.done.connect(self.on_import_done)
+        self.import_worker.start()
+    def on_import_done(self, text):
+        self.status_label.setText(text)
+        self.table_btn.setEnabled(True)
+    def make_job(self):
+        ips = read_ips(self.ips_input.toPlainText())
+        if not ips:
+            raise ValueError('No IP addresses found.')
+        def job(on_row, stop, note):
+            table = asn_table()
+            if table is None:
+                note('No prefix -> ASN table imported yet (ASN Table...), so the addresses are only collapsed into CIDR blocks.')
+            rows = summarize(ips, table, stop)
+            self.blocks = sum(r['blocks'] for r in rows)
+            for r in rows:
+                on_row(r)
+        return len(ips), job
+    def progress_text(self, finished):
+        if not finished:
+            return super().progress_text(finished)
+        return (f'Done: {self.total} addresses from {self.model.rowCount()} ASes in {getattr(self, "blocks", 0)} CIDR '
+                f'blocks ({time.monotonic() - self.started:.1f} s)')
+
+class ASNImportWorker(QThread):
+    done = pyqtSignal(str)
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+    def run(self):
+        try:
+            self.done.emit(f'ASN table ready: {import_table(self.path)} prefixes from {self.path}')
+        except Exception as e:
+            self.done.emit(f'Import failed: {e}')
+
 class IPTraceTool(QWidget):
+    # Local IP changes (network switch, VPN) are noticed within this many ms
+    IP_POLL_INTERVAL = 30000
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout()
@@ -36,6 +235,25 @@ class IPTraceTool(QWidget):
         self.trace_btn = QPushButton('Trace')
         self.trace_btn.clicked.connect(self.start_trace)
         row.addWidget(self.trace_btn)
+        self.route_btn = QPushButton('Route')
+        self.route_btn.setToolTip('Traceroute: probe every hop at once and geolocate each router')
+        self.route_btn.clicked.connect(self.start_route)
+        row.addWidget(self.route_btn)
+        self.bulk_btn = QPushButton('Bulk...')
+        self.bulk_btn.setToolTip('Geolocate many addresses, e.g. every IP in a log file')
+        self.bulk_btn.clicked.connect(self.open_bulk)
+        row.addWidget(self.bulk_btn)
+        self.summarize_btn = QPushButton('Summarize...')
+        self.summarize_btn.setToolTip('Collapse many addresses into CIDR blocks grouped by ASN')
+        self.summarize_btn.clicked.connect(self.open_summarize)
+        row.addWidget(self.summarize_btn)
+        self.offline_check = QCheckBox('Offline')
+        self.offline_check.setToolTip('Answer from the imported geolocation database instead of ip-api.com')
+        row.addWidget(self.offline_check)
+        self.geodb_btn = QPushButton('Geo DB...')
+        self.geodb_btn.setToolTip('Import an offline database: a .mmdb file or a CSV of IP ranges')
+        self.geodb_btn.clicked.connect(self.import_geo_db)
+        row.addWidget(self.geodb_btn)
         layout.addLayout(row)
         # Result box
         self.result_box = QTextEdit()
@@ -55,6 +273,24 @@ class IPTraceTool(QWidget):
         self.effects_btn.clicked.connect(self.open_effects_menu)
         bottom_row.addWidget(self.effects_btn)
         bottom_row.addStretch(1)
+        from PyQt6.QtWidgets import QSpinBox
+        from modules.geo_cache import DEFAULT_MAX_AGE
+        bottom_row.addWidget(QLabel('Geo cache:'))
+        self.geo_age_input = QSpinBox()
+        self.geo_age_input.setRange(0, 24 * 365)
+        self.geo_age_input.setValue(DEFAULT_MAX_AGE // 3600)
+        self.geo_age_input.setSuffix(' h')
+        self.geo_age_input.setSpecialValueText('no cache')
+        self.geo_age_input.setToolTip('Reuse geolocation answers younger than this')
+        bottom_row.addWidget(self.geo_age_input)
+        self.geo_clear_btn = QPushButton('Clear')
+        self.geo_clear_btn.setFixedWidth(60)
+        self.geo_clear_btn.setToolTip('Forget all cached geolocation answers')
+        self.geo_clear_btn.clicked.connect(self.clear_geo_cache)
+        bottom_row.addWidget(self.geo_clear_btn)
+        bottom_row.addSpacing(20)
+        self.cache_bar = DNSCacheBar()
+        bottom_row.addWidget(self.cache_bar)
         layout.addLayout(bottom_row)
         # IP info and maps row
         ipinfo_row = QHBoxLayout()
@@ -71,6 +307,17 @@ class IPTraceTool(QWidget):
         layout.addLayout(ipinfo_row)
         self.setLayout(layout)
         self.worker = None
+        self.ip_worker = None
+        self.bulk_dialog = None
+        self.summarize_dialog = None
+        self.route_worker = None
+        self.import_worker = None
+        # Addresses fill in from a background lookup and are re-checked periodically
+        self._ip_timer = QTimer(self)
+        self._ip_timer.timeout.connect(self.update_ip_labels)
+        self._ip_timer.start(self.IP_POLL_INTERVAL)
+        # The Exit button quits without closing this widget, so stop the poll on quit too
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
         self.update_ip_labels()
         self.update_result_effects()
 
@@ -211,23 +458,25 @@ class IPTraceTool(QWidget):
         self._glitching = False
 
     def update_ip_labels(self):
-        # Local IP
-        import socket
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(('8.8.8.8', 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-        except Exception:
-            local_ip = 'N/A'
-        self.local_ip_label.setText(f'Local IP: {local_ip}')
-        # WAN IP
-        try:
-            import requests
-            wan_ip = requests.get('https://api.ipify.org', timeout=5).text
-        except Exception:
-            wan_ip = 'N/A'
-        self.wan_ip_label.setText(f'WAN IP: {wan_ip}')
+        # A slow lookup is left to finish; this tick is skipped rather than overlapping it
+        if self.ip_worker and self.ip_worker.isRunning():
+            return
+        self.ip_worker = IPInfoWorker()
+        self.ip_worker.local_result.connect(lambda ip: self.local_ip_label.setText(f"Local IP: {ip or 'N/A'}"))
+        self.ip_worker.wan_result.connect(lambda ip: self.wan_ip_label.setText(f"WAN IP: {ip or 'N/A'}"))
+        self.ip_worker.start()
+    def shutdown(self):
+        # No new polls, and no QThread destroyed while it still runs (Qt aborts on that).
+        # The address lookup is bounded by its request timeout.
+        self._ip_timer.stop()
+        if self.ip_worker and self.ip_worker.isRunning():
+            self.ip_worker.wait()
+        if self.route_worker and self.route_worker.isRunning():
+            self.route_worker.stop()
+            self.route_worker.wait()
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
     def start_trace(self):
         ip = self.input.text().strip()
         if not ip:
@@ -235,7 +484,8 @@ class IPTraceTool(QWidget):
             return
         self.result_box.setText('Tracing...')
         self.trace_btn.setEnabled(False)
-        self.worker = IPTraceWorker(ip)
+        self.worker = IPTraceWorker(ip, bypass_cache=self.cache_bar.bypass(), offline=self.offline_check.isChecked(),
+                                    max_age=self.geo_max_age())
         self.worker.result.connect(self.on_result)
         self.worker.start()
     def on_result(self, text):
@@ -254,6 +504,101 @@ class IPTraceTool(QWidget):
             self.maps_url = None
             self.maps_btn.setVisible(False)
 
+    def geo_max_age(self):
+        return self.geo_age_input.value() * 3600
+
+    def clear_geo_cache(self):
+        from modules.geo_cache import GeoCache
+        cache = GeoCache()
+        try:
+            cache.clear()
+        finally:
+            cache.close()
+        self.result_box.setText('Geolocation cache cleared.')
+
+    def start_route(self):
+        host = self.input.text().strip()
+        if not host:
+            self.result_box.setText('Please enter an IP or domain.')
+            return
+        if self.route_worker and self.route_worker.isRunning():
+            self.route_worker.stop()
+            return
+        self.route_host = host
+        self.route_hops = {}
+        self.route_geo = {}
+        self.route_error = None
+        self.maps_btn.setVisible(False)
+        self.route_btn.setText('Stop')
+        self.route_worker = RouteWorker(host, offline=self.offline_check.isChecked(), max_age=self.geo_max_age())
+        self.route_worker.hop.connect(self.on_hop)
+        self.route_worker.located.connect(self.on_located)
+        self.route_worker.error.connect(self.on_route_error)
+        self.route_worker.finished.connect(self.on_route_finished)
+        self.route_worker.start()
+        self.render_route('Tracing route...')
+
+    def on_hop(self, ttl, address, rtt, mark):
+        hop = self.route_hops.setdefault(ttl, {'ttl': ttl, 'address': address, 'rtts': [], 'mark': mark})
+        hop['rtts'].append(rtt)
+        self.render_route('Tracing route...')
+
+    def on_located(self, address, where):
+        self.route_geo[address] = where
+        self.render_route('Tracing route...' if self.route_worker.isRunning() else None)
+
+    def on_route_error(self, text):
+        self.route_error = text
+
+    def on_route_finished(self):
+        self.route_btn.setText('Route')
+        self.render_route(None)
+
+    def render_route(self, status):
+        from modules.traceroute import format_hops
+        # Probes past the target answer too; stop at the first TTL that did not pass through
+        end = min([t for t, h in self.route_hops.items() if h['mark']] or [max(self.route_hops, default=0)])
+        hops = [self.route_hops.get(t, {'ttl': t, 'address': None, 'rtts': [None], 'mark': ''}) for t in range(1, end + 1)]
+        if status is None:
+            if self.route_error:
+                status = f'Error: {self.route_error}'
+            elif any(h['mark'] == 'reached' for h in hops):
+                status = f'Reached {self.route_host} in {end} hops.'
+            else:
+                status = f'{self.route_host} did not answer; showing the hops that did.'
+        self.result_box.setPlainText(f'Route to {self.route_host}\n' + format_hops(hops, self.route_geo) + f'\n\n{status}')
+
+    def import_geo_db(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Import Geolocation Database', '',
+                                              'Geolocation databases (*.mmdb *.csv);;All files (*)')
+        if not path:
+            return
+        self.geodb_btn.setEnabled(False)
+        self.result_box.setText('Importing...')
+        self.import_worker = GeoImportWorker(path)
+        self.import_worker.progress.connect(self.result_box.setText)
+        self.import_worker.done.connect(self.on_import_done)
+        self.import_worker.start()
+
+    def on_import_done(self, text):
+        self.result_box.setText(text)
+        self.geodb_btn.setEnabled(True)
+        if not text.startswith('Import failed'):
+            self.offline_check.setChecked(True)
+
+    def open_bulk(self):
+        if self.bulk_dialog is None:
+            self.bulk_dialog = BulkTraceDialog(self.geo_max_age, self)
+        self.bulk_dialog.show()
+        self.bulk_dialog.raise_()
+
+    def open_summarize(self):
+        if self.summarize_dialog is None:
+            self.summarize_dialog = SummarizeDialog(parent=self)
+        self.summarize_dialog.show()
+        self.summarize_dialog.raise_()
+
     def open_maps_url(self):
         import webbrowser
         if hasattr(self, 'maps_url') and self.maps_url:
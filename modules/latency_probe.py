@@ -0,0 +1,149 @@
+import os
+import select
+import socket
+import struct
+import time
+from modules.dns_cache import getaddrinfo
+
+# In-process latency measurement: unprivileged ICMP echo over datagram sockets where
+# the kernel allows it (Linux ping_group_range, macOS), otherwise TCP connect RTT.
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+DEFAULT_TCP_PORTS = (443, 80, 22)
+
+
+def _checksum(data):
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def open_icmp_socket(family=socket.AF_INET):
+    # Returns an ICMP datagram socket, or None when the kernel does not permit it
+    proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+    try:
+        return socket.socket(family, socket.SOCK_DGRAM, proto)
+    except (OSError, AttributeError):
+        return None
+
+
+def icmp_echo(sock, family, address, seq, timeout):
+    # Sends one echo request and waits for its reply; returns RTT in ms or None
+    req_type = ICMP_ECHO_REQUEST if family == socket.AF_INET else ICMP6_ECHO_REQUEST
+    rep_type = ICMP_ECHO_REPLY if family == socket.AF_INET else ICMP6_ECHO_REPLY
+    payload = struct.pack('!d', time.perf_counter()) + b'toolbelt'
+    header = struct.pack('!BBHHH', req_type, 0, 0, 0, seq)
+    packet = struct.pack('!BBHHH', req_type, 0, _checksum(header + payload), 0, seq) + payload
+    start = time.perf_counter()
+    sock.sendto(packet, (address, 0))
+    deadline = start + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        ready, _, _ = select.select([sock], [], [], remaining)
+        if not ready:
+            return None
+        data = sock.recv(1024)
+        if family == socket.AF_INET and data and data[0] >> 4 == 4:
+            # macOS hands over the IP header too
+            data = data[(data[0] & 0x0f) * 4:]
+        if len(data) >= 8:
+            rtype, _, _, _, rseq = struct.unpack('!BBHHH', data[:8])
+            if rtype == rep_type and rseq == seq:
+                return (time.perf_counter() - start) * 1000
+
+
+def tcp_rtt(family, address, port, timeout):
+    # SYN -> SYN/ACK (open) or SYN -> RST (closed) both measure one round trip
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    start = time.perf_counter()
+    try:
+        sock.connect((address, port))
+    except ConnectionRefusedError:
+        pass
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(samples, sent):
+    # Stats over the RTTs that came back; jitter is the mean delta between consecutive replies
+    rtts = [s for s in samples if s is not None]
+    stats = {'sent': sent, 'received': len(rtts), 'loss': round(100.0 * (sent - len(rtts)) / sent, 1) if sent else 0.0,
+             'min': None, 'avg': None, 'max': None, 'jitter': None, 'samples': [round(s, 3) if s is not None else None for s in samples]}
+    if rtts:
+        stats['min'] = min(rtts)
+        stats['avg'] = sum(rtts) / len(rtts)
+        stats['max'] = max(rtts)
+        deltas = [abs(b - a) for a, b in zip(rtts, rtts[1:])]
+        stats['jitter'] = sum(deltas) / len(deltas) if deltas else 0.0
+    return stats
+
+
+def measure(host, count=5, interval=0.2, timeout=1.0, method='auto', port=None, stop=None):
+    # Takes `count` samples against host and returns a stats dict (see summarize) plus
+    # 'method' ('icmp' or 'tcp:<port>'), 'address' and, on failure, 'error'.
+    # stop is an optional callable checked between samples.
+    try:
+        family, _, _, _, sockaddr = getaddrinfo(host, type=socket.SOCK_STREAM)[0]
+    except (OSError, UnicodeError) as e:
+        return dict(summarize([], 0), method=method, address=None, error=str(e))
+    address = sockaddr[0]
+    icmp = open_icmp_socket(family) if method in ('auto', 'icmp') else None
+    if icmp is None and method == 'icmp':
+        return dict(summarize([], 0), method='icmp', address=address, error='ICMP sockets not permitted')
+    samples = []
+    error = None
+    try:
+        if icmp is not None:
+            used = 'icmp'
+            base = os.getpid() & 0x7fff
+            for i in range(count):
+                if stop and stop():
+                    break
+                try:
+                    samples.append(icmp_echo(icmp, family, address, (base + i) & 0xffff, timeout))
+                except OSError as e:
+                    # e.g. ENETUNREACH; in auto mode try TCP instead, else the probe is lost
+                    error = str(e)
+                    if method == 'auto' and not any(s is not None for s in samples):
+                        samples = []
+                        break
+                    samples.append(None)
+                if i < count - 1:
+                    time.sleep(interval)
+        if icmp is None or (error and not samples):
+            if port is None:
+                # Pick the first common port that answers at all (open or RST)
+                for candidate in DEFAULT_TCP_PORTS:
+                    rtt = tcp_rtt(family, address, candidate, timeout)
+                    if rtt is not None:
+                        port = candidate
+                        samples.append(rtt)
+                        break
+                else:
+                    port = DEFAULT_TCP_PORTS[0]
+                    samples.append(None)
+            used = f'tcp:{port}'
+            while len(samples) < count:
+                if stop and stop():
+                    break
+                time.sleep(interval)
+                samples.append(tcp_rtt(family, address, port, timeout))
+    finally:
+        if icmp is not None:
+            icmp.close()
+    stats = dict(summarize(samples, len(samples)), method=used, address=address)
+    if error and not stats['received']:
+        stats['error'] = error
+    return stats
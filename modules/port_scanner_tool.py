@@ -1,76 +1,170 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSpinBox
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSpinBox, QDialog, QTableView, QComboBox, QHeaderView
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-import socket
+from modules.scan_engine import PortScanEngine, parse_ports, parse_hosts, OPEN, CLOSED, FILTERED, ERROR
+from modules.scan_results_model import ScanResultsModel
+from modules.service_probe import printable
+from modules.latency_probe import measure
 import time
-import subprocess
 
 class PortScanWorker(QThread):
-    result = pyqtSignal(bool, float)
-    def __init__(self, host, port, timeout=10):
+    # Results are handed to the GUI in batches (every BATCH_SIZE results or
+    # BATCH_INTERVAL seconds) so large scans cost one queued signal per batch
+    BATCH_SIZE = 512
+    BATCH_INTERVAL = 0.1
+    results = pyqtSignal(list)
+    unresolved = pyqtSignal(str)
+    host_status = pyqtSignal(str, bool)
+    planned = pyqtSignal(int)
+    saved = pyqtSignal(int)
+    save_failed = pyqtSignal(str)
+    service = pyqtSignal(str, int, str, str, str)
+    def __init__(self, hosts, ports, concurrency=200, max_timeout=10, discover=True, history_target=None, ports_spec='', banners=False,
+                 rate=0, per_host=0):
         super().__init__()
-        self.host = host
-        self.port = port
-        self.timeout = timeout
+        self.hosts = hosts
+        self.ports = ports
+        self.discover = discover
+        self.history_target = history_target
+        self.ports_spec = ports_spec
+        # Connect timeouts adapt to each host's measured RTT, never exceeding max_timeout
+        self.engine = PortScanEngine(concurrency=concurrency, max_timeout=max_timeout, banners=banners,
+                                     rate=rate, per_host=per_host)
+    def stop(self):
+        self.engine.stop()
     def run(self):
-        start = time.time()
-        is_open = False
-        try:
-            with socket.create_connection((self.host, self.port), timeout=self.timeout):
-                is_open = True
-        except Exception:
-            is_open = False
-        elapsed = (time.time() - start) * 1000
-        self.result.emit(is_open, elapsed)
+        started = time.time()
+        rows = []
+        row_index = {}
+        batch = []
+        last_flush = [time.monotonic()]
+        def flush():
+            if batch:
+                self.results.emit(batch[:])
+                batch.clear()
+            last_flush[0] = time.monotonic()
+        def on_result(host, port, state, elapsed):
+            if not port:
+                self.unresolved.emit(host)
+                return
+            row_index[(host, port)] = len(rows)
+            rows.append([host, port, state, elapsed, time.time(), None, None])
+            batch.append((host, port, state, elapsed))
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() - last_flush[0] >= self.BATCH_INTERVAL:
+                flush()
+        def on_service(host, port, service, version, banner):
+            text = printable(banner)
+            row = rows[row_index[(host, port)]]
+            row[5] = text or None
+            row[6] = f'{service} {version}'.strip() or None
+            flush()  # the port's row must reach the model before its service does
+            self.service.emit(host, port, service, version, text)
+        self.engine.run(self.hosts, self.ports, on_result, discover=self.discover,
+                        on_host=self.host_status.emit, on_plan=self.planned.emit, on_service=on_service)
+        flush()
+        if self.history_target:
+            # Persist the whole run in one transaction from this thread
+            import sqlite3
+            from modules.scan_history import ScanHistory
+            try:
+                history = ScanHistory()
+                try:
+                    run_id = history.start_run(self.history_target, self.ports_spec, started)
+                    history.add_results(run_id, rows)
+                    if not self.engine.stopped:
+                        # A stopped run stays unfinished so it is never used as a baseline
+                        history.finish_run(run_id)
+                finally:
+                    history.close()
+            except (sqlite3.Error, OSError) as e:
+                self.save_failed.emit(str(e))
+                return
+            self.saved.emit(run_id)
 
 class PingWorker(QThread):
-    result = pyqtSignal(float)
-    def __init__(self, host):
+    result = pyqtSignal(dict)
+    def __init__(self, host, count=5, port=None):
         super().__init__()
         self.host = host
+        self.count = count
+        self.port = port
     def run(self):
-        try:
-            # Windows ping: -n 1, Linux/Mac: -c 1
-            count_flag = '-n' if socket.gethostname().find('.') == -1 else '-c'
-            proc = subprocess.run(['ping', count_flag, '1', self.host], capture_output=True, text=True, timeout=5)
-            output = proc.stdout
-            # Parse ms from output
-            import re
-            match = re.search(r'([0-9]+(?:\.[0-9]+)?) ?ms', output)
-            if match:
-                ms = float(match.group(1))
-            else:
-                ms = -1
-        except Exception:
-            ms = -1
-        self.result.emit(ms)
+        # ICMP echo over an unprivileged datagram socket, or TCP connect RTT as fallback
+        self.result.emit(measure(self.host, count=self.count, port=self.port))
 
 class PortScannerTool(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        from PyQt6.QtWidgets import QGroupBox, QProgressBar
+        from PyQt6.QtWidgets import QGroupBox, QProgressBar, QCheckBox
         layout = QVBoxLayout()
         # Card-style group for input
         input_group = QGroupBox("Port Scan")
         input_group.setStyleSheet("QGroupBox { font-weight: bold; border-radius: 8px; margin-top: 10px; padding: 10px; border: 1px solid #444; } ")
         input_layout = QHBoxLayout()
         self.host_input = QLineEdit()
-        self.host_input.setPlaceholderText('e.g. 8.8.8.8 or example.com')
+        self.host_input.setPlaceholderText('e.g. example.com, 10.0.0.0/24 or 10.0.0.1-50')
         self.host_input.setMinimumWidth(180)
         input_layout.addWidget(QLabel('Host/IP:'))
         input_layout.addWidget(self.host_input)
-        self.port_input = QSpinBox()
-        self.port_input.setRange(1, 65535)
-        self.port_input.setValue(22)
-        input_layout.addWidget(QLabel('Port:'))
+        self.hosts_file_btn = QPushButton('File...')
+        self.hosts_file_btn.setToolTip('Load targets from a file (one host, range or CIDR per line)')
+        self.hosts_file_btn.clicked.connect(self.choose_hosts_file)
+        input_layout.addWidget(self.hosts_file_btn)
+        self.port_input = QLineEdit('22')
+        self.port_input.setPlaceholderText('e.g. 22 or 1-1024,3306,8080-8090')
+        self.port_input.setMinimumWidth(140)
+        input_layout.addWidget(QLabel('Ports:'))
         input_layout.addWidget(self.port_input)
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 5000)
+        self.concurrency_input.setValue(200)
+        self.concurrency_input.setToolTip('Maximum number of probes in flight at the same time')
+        input_layout.addWidget(QLabel('In-flight:'))
+        input_layout.addWidget(self.concurrency_input)
         self.scan_btn = QPushButton('Scan')
         self.scan_btn.setStyleSheet("padding: 6px 18px; font-weight: bold;")
         self.scan_btn.clicked.connect(self.start_scan)
         input_layout.addWidget(self.scan_btn)
+        self.stop_btn = QPushButton('Stop')
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_scan)
+        input_layout.addWidget(self.stop_btn)
         input_group.setLayout(input_layout)
         layout.addWidget(input_group)
+        # Sweep options
+        options_row = QHBoxLayout()
+        self.discover_check = QCheckBox('Skip dead hosts (liveness pre-pass)')
+        self.discover_check.setChecked(True)
+        self.discover_check.setToolTip('Before a multi-host sweep, knock on a few common ports and only scan hosts that answer')
+        options_row.addWidget(self.discover_check)
+        self.history_check = QCheckBox('Save to history')
+        self.history_check.setChecked(True)
+        self.history_check.setToolTip('Record every result in the local scan history database')
+        options_row.addWidget(self.history_check)
+        self.banner_check = QCheckBox('Grab banners')
+        self.banner_check.setToolTip('Read the banner of each open port (HTTP HEAD, SSH ident, SMTP greeting, Redis INFO...) to identify the service')
+        options_row.addWidget(self.banner_check)
+        options_row.addStretch(1)
+        self.rate_input = QSpinBox()
+        self.rate_input.setRange(0, 100000)
+        self.rate_input.setSingleStep(100)
+        self.rate_input.setSpecialValueText('∞')
+        self.rate_input.setToolTip('Global connect attempts per second across all targets (∞ = unlimited)')
+        options_row.addWidget(QLabel('Rate (pps):'))
+        options_row.addWidget(self.rate_input)
+        self.per_host_input = QSpinBox()
+        self.per_host_input.setRange(0, 5000)
+        self.per_host_input.setSpecialValueText('∞')
+        self.per_host_input.setToolTip('Maximum probes in flight against any single host (∞ = unlimited)')
+        options_row.addWidget(QLabel('Per host:'))
+        options_row.addWidget(self.per_host_input)
+        self.diff_btn = QPushButton('Diff vs Previous')
+        self.diff_btn.setEnabled(False)
+        self.diff_btn.setToolTip('Show ports opened or closed since the previous run of this target')
+        self.diff_btn.clicked.connect(self.show_diff)
+        options_row.addWidget(self.diff_btn)
+        layout.addLayout(options_row)
         # Status label with icon
-        self.status_label = QLabel('Enter host and port, then click Scan.')
+        self.status_label = QLabel('Enter host and ports, then click Scan.')
         self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #232b36; color: #fff;")
         layout.addWidget(self.status_label)
         # Progress bar
@@ -78,43 +172,274 @@ class PortScannerTool(QWidget):
         self.progress.setRange(0, 0)
         self.progress.setVisible(False)
         layout.addWidget(self.progress)
+        # Discovery / history notes
+        self.notes_label = QLabel('')
+        self.notes_label.setStyleSheet("font-size: 13px; color: #b0eaff; padding: 2px 8px;")
+        self.notes_label.setWordWrap(True)
+        layout.addWidget(self.notes_label)
+        # Results table: filter by state, click a header to sort
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(QLabel('Show:'))
+        self.state_filter = QComboBox()
+        for label, state in (('Open', OPEN), ('All', None), ('Closed', CLOSED), ('Filtered', FILTERED), ('Error', ERROR)):
+            self.state_filter.addItem(label, state)
+        self.state_filter.currentIndexChanged.connect(self.on_state_filter_changed)
+        filter_row.addWidget(self.state_filter)
+        filter_row.addStretch(1)
+        self.counts_label = QLabel('')
+        self.counts_label.setStyleSheet("color: #b0eaff;")
+        filter_row.addWidget(self.counts_label)
+        layout.addLayout(filter_row)
+        self.results_model = ScanResultsModel(self)
+        self.results_model.set_state_filter(OPEN)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.results_view.horizontalHeader().setStretchLastSection(True)
+        self.results_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.results_view.verticalHeader().setVisible(False)
+        # Fixed row height lets the view skip per-row size queries on huge tables
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().setDefaultSectionSize(22)
+        self.results_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.results_view.setStyleSheet('background: #101014; color: #c0c0ff; font-family: Consolas; font-size: 13px;')
+        self.results_view.setColumnWidth(0, 160)
+        self.results_view.setColumnWidth(4, 160)
+        layout.addWidget(self.results_view)
         # Ping label
         self.ping_label = QLabel('Ping: - ms')
         self.ping_label.setStyleSheet("font-size: 14px; color: #7ecfff; padding: 4px;")
-        layout.addWidget(self.ping_label)
-        layout.addStretch(1)
+        stats_row = QHBoxLayout()
+        stats_row.addWidget(self.ping_label)
+        stats_row.addStretch(1)
+        # Achieved throughput, sampled once per second while a scan runs
+        self.rate_label = QLabel('')
+        self.rate_label.setStyleSheet("font-size: 14px; color: #7ecfff; padding: 4px;")
+        stats_row.addWidget(self.rate_label)
+        layout.addLayout(stats_row)
+        from PyQt6.QtCore import QTimer
+        self._rate_timer = QTimer(self)
+        self._rate_timer.setInterval(1000)
+        self._rate_timer.timeout.connect(self._update_rate)
         self.setLayout(layout)
         self.worker = None
         self.ping_worker = None
+        self._scan_total = 0
+        self._scan_done = 0
+        self._scan_open = 0
+        self._hosts_total = 0
+        self._hosts_alive = 0
+        self._ports_count = 0
+        self._last_result = None
+        self._last_run_id = None
+        self._scan_started = 0.0
+        self._rate_mark = (0.0, 0)
+    def _update_rate(self):
+        now = time.monotonic()
+        then, done = self._rate_mark
+        if now > then:
+            self.rate_label.setText(f'{(self._scan_done - done) / (now - then):.0f} ports/s')
+        self._rate_mark = (now, self._scan_done)
+    def choose_hosts_file(self):
+        from PyQt6.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Hosts File', '', 'Text files (*.txt *.lst);;All files (*)')
+        if path:
+            self.host_input.setText(f'@{path}')
     def start_scan(self):
-        host = self.host_input.text().strip()
-        port = self.port_input.value()
-        if not host:
+        host_spec = self.host_input.text().strip()
+        if not host_spec:
             self.status_label.setText('Please enter a host or IP.')
             self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #232b36; color: #fff;")
             return
-        self.status_label.setText('Scanning...')
+        try:
+            hosts = parse_hosts(host_spec)
+        except (ValueError, OSError) as e:
+            self.status_label.setText(f'Invalid hosts: {e}')
+            self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #232b36; color: #fff;")
+            return
+        try:
+            ports = parse_ports(self.port_input.text())
+        except ValueError as e:
+            self.status_label.setText(f'Invalid ports: {e}')
+            self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #232b36; color: #fff;")
+            return
+        self._scan_total = len(hosts) * len(ports)
+        self._scan_done = 0
+        self._scan_open = 0
+        self._hosts_total = len(hosts)
+        self._hosts_alive = 0
+        self._ports_count = len(ports)
+        self._last_result = None
+        self._unresolved = 0
+        self.results_model.clear()
+        self.results_model.set_state_filter(self.state_filter.currentData())
+        self.notes_label.setText('')
+        self.counts_label.setText('')
+        self.diff_btn.setEnabled(False)
+        discover = self.discover_check.isChecked() and len(hosts) > 1
+        if discover:
+            self.status_label.setText(f'Discovering live hosts among {len(hosts)}...')
+            self.progress.setRange(0, 0)
+        else:
+            self.status_label.setText(f'Scanning {self._scan_total} port(s)...')
+            self.progress.setRange(0, self._scan_total)
+            self.progress.setValue(0)
         self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #232b36; color: #fff;")
         self.scan_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
         self.progress.setVisible(True)
-        self.worker = PortScanWorker(host, port)
-        self.worker.result.connect(self.on_scan_result)
+        history_target = host_spec if self.history_check.isChecked() else None
+        self.worker = PortScanWorker(hosts, ports, concurrency=self.concurrency_input.value(), discover=discover,
+                                     history_target=history_target, ports_spec=self.port_input.text().strip(),
+                                     banners=self.banner_check.isChecked(), rate=self.rate_input.value(),
+                                     per_host=self.per_host_input.value())
+        self.worker.results.connect(self.on_scan_results)
+        self.worker.unresolved.connect(self.on_unresolved)
+        self.worker.service.connect(self.on_service_result)
+        self.worker.saved.connect(self.on_scan_saved)
+        self.worker.save_failed.connect(self.on_save_failed)
+        self.worker.host_status.connect(self.on_host_status)
+        self.worker.planned.connect(self.on_scan_planned)
+        self.worker.finished.connect(self.on_scan_finished)
         self.worker.start()
-        self.ping_label.setText('Pinging...')
-        self.ping_worker = PingWorker(host)
-        self.ping_worker.result.connect(self.on_ping_result)
-        self.ping_worker.start()
-    def on_scan_result(self, is_open, elapsed):
-        if is_open:
-            self.status_label.setText(f'🟢 Port is <b>OPEN</b> ({elapsed:.1f} ms)')
+        self._scan_started = time.monotonic()
+        self._rate_mark = (self._scan_started, 0)
+        self.rate_label.setText('')
+        self._rate_timer.start()
+        if len(hosts) == 1:
+            self.ping_label.setText('Pinging...')
+            self.ping_worker = PingWorker(hosts[0], port=ports[0] if len(ports) == 1 else None)
+            self.ping_worker.result.connect(self.on_ping_result)
+            self.ping_worker.start()
+        else:
+            self.ping_label.setText('Ping: - ms')
+    def on_host_status(self, host, alive):
+        if alive:
+            self._hosts_alive += 1
+            self.notes_label.setText(f'Discovery: {self._hosts_alive} live host(s) so far')
+    def on_scan_planned(self, total):
+        self._scan_total = total
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(self._scan_done)
+        if self._hosts_total > 1:
+            self.notes_label.setText(f'{total // self._ports_count} of {self._hosts_total} host(s) to scan')
+    def on_unresolved(self, host):
+        self._unresolved += 1
+        self.notes_label.setText(f'Could not resolve {self._unresolved} host(s), e.g. {host}')
+    def on_state_filter_changed(self):
+        self.results_model.set_state_filter(self.state_filter.currentData())
+    def _update_counts(self):
+        counts = self.results_model.counts()
+        self.counts_label.setText(' · '.join(f'{n} {state}' for state, n in counts.items() if n))
+    def stop_scan(self):
+        if self.worker:
+            self.worker.stop()
+        self.stop_btn.setEnabled(False)
+    def on_scan_results(self, batch):
+        self.results_model.append_results(batch)
+        self._scan_done += len(batch)
+        self._scan_open += sum(1 for r in batch if r[2] == OPEN)
+        _, port, state, elapsed = batch[-1]
+        self._last_result = (port, state, elapsed)
+        self.progress.setValue(self._scan_done)
+        self.status_label.setText(f'Scanning... {self._scan_done}/{self._scan_total} done, {self._scan_open} open')
+        self._update_counts()
+    def on_service_result(self, host, port, service, version, banner):
+        self.results_model.set_service(host, port, f'{service} {version}'.strip() or '?', banner)
+    def on_scan_finished(self):
+        if self._scan_total == 1 and self._last_result:
+            # Single port: keep the classic open/closed banner
+            port, state, elapsed = self._last_result
+            if state == OPEN:
+                self.status_label.setText(f'🟢 Port is <b>OPEN</b> ({elapsed:.1f} ms)')
+                self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #1e3a1e; color: #aaffaa; border: 1px solid #3c6; font-weight: bold;")
+            else:
+                self.status_label.setText(f'🔴 Port is <b>CLOSED</b> or unreachable ({elapsed:.1f} ms)')
+                self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #3a1e1e; color: #ffaaaa; border: 1px solid #c66; font-weight: bold;")
+        elif self._scan_open:
+            self.status_label.setText(f'🟢 <b>{self._scan_open}</b> open of {self._scan_done}/{self._scan_total} scanned')
             self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #1e3a1e; color: #aaffaa; border: 1px solid #3c6; font-weight: bold;")
         else:
-            self.status_label.setText(f'🔴 Port is <b>CLOSED</b> or unreachable ({elapsed:.1f} ms)')
+            self.status_label.setText(f'🔴 No open ports ({self._scan_done}/{self._scan_total} scanned)')
             self.status_label.setStyleSheet("font-size: 16px; padding: 8px; border-radius: 6px; background: #3a1e1e; color: #ffaaaa; border: 1px solid #c66; font-weight: bold;")
         self.scan_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
         self.progress.setVisible(False)
-    def on_ping_result(self, ms):
-        if ms >= 0:
-            self.ping_label.setText(f'Ping: {ms:.1f} ms')
+        self.results_model.resort()
+        self._update_counts()
+        self._rate_timer.stop()
+        elapsed = time.monotonic() - self._scan_started
+        if self._scan_done and elapsed > 0:
+            self.rate_label.setText(f'{self._scan_done} ports in {elapsed:.1f} s ({self._scan_done / elapsed:.0f}/s avg)')
+    def on_scan_saved(self, run_id):
+        from modules.scan_history import ScanHistory
+        self._last_run_id = run_id
+        try:
+            history = ScanHistory()
+            try:
+                previous_id, opened, closed = history.diff(run_id)
+            finally:
+                history.close()
+        except Exception as e:
+            self.notes_label.setText(f'History error: {e}')
+            return
+        if previous_id is None:
+            self.notes_label.setText('First recorded run for this target.')
+            return
+        self.diff_btn.setEnabled(True)
+        if opened or closed:
+            self.notes_label.setText(f'Since previous run: {len(opened)} opened, {len(closed)} closed (see Diff).')
+        else:
+            self.notes_label.setText('No change since previous run.')
+    def on_save_failed(self, text):
+        # The run is not in the history, so there is nothing to diff against
+        self._last_run_id = None
+        self.notes_label.setText(f'History error: run not saved ({text})')
+    def show_diff(self):
+        if self._last_run_id is not None:
+            ScanDiffDialog(self._last_run_id, self).exec()
+    def on_ping_result(self, stats):
+        if stats.get('received'):
+            self.ping_label.setText(f"Ping ({stats['method']}): avg {stats['avg']:.1f} ms · min {stats['min']:.1f} · max {stats['max']:.1f} · "
+                                    f"jitter {stats['jitter']:.1f} · loss {stats['loss']:.0f}%")
         else:
             self.ping_label.setText('Ping: timeout or unreachable')
+
+class ScanDiffDialog(QDialog):
+    def __init__(self, run_id, parent=None):
+        super().__init__(parent)
+        from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
+        from modules.scan_history import ScanHistory
+        self.setWindowTitle("Scan Diff")
+        self.resize(560, 400)
+        layout = QVBoxLayout()
+        history = ScanHistory()
+        try:
+            previous_id, opened, closed = history.diff(run_id)
+            current = history.run(run_id)
+            previous = history.run(previous_id) if previous_id is not None else None
+        finally:
+            history.close()
+        if previous_id is None:
+            layout.addWidget(QLabel("No previous run of this target to compare with."))
+        else:
+            fmt = lambda run: time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run[3]))
+            layout.addWidget(QLabel(f"Target: {current[1]}\nPrevious: {fmt(previous)}  →  Current: {fmt(current)}"))
+            table = QTableWidget(len(opened) + len(closed), 4)
+            table.setHorizontalHeaderLabels(['Change', 'Host', 'Port', 'Was → Now'])
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            table.verticalHeader().setVisible(False)
+            table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            for row, (change, (host, port, old, new)) in enumerate([('🟢 Opened', c) for c in opened] + [('🔴 Closed', c) for c in closed]):
+                table.setItem(row, 0, QTableWidgetItem(change))
+                table.setItem(row, 1, QTableWidgetItem(host))
+                table.setItem(row, 2, QTableWidgetItem(str(port)))
+                table.setItem(row, 3, QTableWidgetItem(f"{old or 'not scanned'} → {new or 'not scanned'}"))
+            layout.addWidget(table)
+            if not opened and not closed:
+                layout.addWidget(QLabel("No ports opened or closed since the previous run."))
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+        self.setLayout(layout)
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+# Compares DNS resolvers by sending each the same query set. Resolvers are given as
+# 'system' (the nameservers from resolv.conf / the OS) or 'ip', 'ip:port', '[v6]:port'.
+
+SYSTEM = 'system'
+DEFAULT_RESOLVERS = (SYSTEM, '1.1.1.1', '8.8.8.8', '9.9.9.9')
+DEFAULT_QUERIES = (('example.com', 'A'), ('google.com', 'A'), ('wikipedia.org', 'AAAA'), ('github.com', 'MX'),
+                   ('cloudflare.com', 'NS'), ('amazon.com', 'A'), ('python.org', 'TXT'), ('nonexistent.invalid', 'A'))
+# A resolver is healthy when at most this share of queries time out and at least this
+# share of its answers agree with the other resolvers
+MAX_TIMEOUT_RATE = 0.1
+MIN_CONSISTENCY = 0.8
+
+
+def parse_spec(spec):
+    # 'system' -> None; '1.1.1.1' -> ('1.1.1.1', 53); '[::1]:5353' -> ('::1', 5353)
+    spec = spec.strip()
+    if not spec or spec.lower() == SYSTEM:
+        return None
+    if spec.startswith('['):
+        host, _, port = spec[1:].partition(']')
+        return host, int(port.lstrip(':') or 53)
+    if spec.count(':') == 1:
+        host, port = spec.split(':')
+        return host, int(port)
+    return spec, 53
+
+
+def make_resolver(spec):
+    import dns.asyncresolver
+    target = parse_spec(spec)
+    if target is None:
+        return dns.asyncresolver.Resolver()
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    resolver.nameservers = [target[0]]
+    resolver.port = target[1]
+    return resolver
+
+
+def parse_queries(text):
+    # 'name [TYPE]' per line or comma separated; the type defaults to A
+    queries = []
+    for item in text.replace(',', '\n').splitlines():
+        parts = item.split()
+        if parts:
+            queries.append((parts[0], parts[1].upper() if len(parts) > 1 else 'A'))
+    return queries
+
+
+async def timed_query(resolver, name, rtype, deadline):
+    # Returns (elapsed_ms, answer) where answer is a frozenset of rdata text,
+    # 'NXDOMAIN', 'ERROR' (e.g. SERVFAIL) or None when the query timed out
+    import dns.resolver
+    import dns.exception
+    start = time.perf_counter()
+    try:
+        answer = await resolver.resolve(name, rtype, lifetime=deadline, raise_on_no_answer=False)
+        result = frozenset(r.to_text() for r in answer.rrset) if answer.rrset is not None else frozenset()
+    except dns.resolver.NXDOMAIN:
+        result = 'NXDOMAIN'
+    except dns.exception.Timeout:
+        result = None
+    except Exception:
+        result = 'ERROR'
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))]
+
+
+def _agrees(answer, reference):
+    # CDNs hand out different address sets, so overlapping answers count as agreeing
+    if isinstance(answer, frozenset) and isinstance(reference, frozenset):
+        return answer == reference or bool(answer & reference)
+    return answer == reference
+
+
+def summarize(specs, samples, answers):
+    # samples: spec -> [ms or None]; answers: spec -> {query: answer}. Returns one stats
+    # dict per resolver, fastest healthy first, with 'best' set on the winner.
+    majority = {}
+    for query in {q for per in answers.values() for q in per}:
+        seen = [per[query] for per in answers.values() if per.get(query) is not None]
+        if seen:
+            majority[query] = max(seen, key=lambda a: sum(_agrees(a, b) for b in seen))
+    stats = []
+    for spec in specs:
+        rtts = [s for s in samples[spec] if s is not None]
+        sent = len(samples[spec])
+        compared = [q for q, a in answers[spec].items() if a is not None and q in majority]
+        agree = sum(_agrees(answers[spec][q], majority[q]) for q in compared)
+        row = {
+            'resolver': spec,
+            'sent': sent,
+            'answered': len(rtts),
+            'timeout_rate': round((sent - len(rtts)) / sent, 3) if sent else 0.0,
+            'p50': _percentile(rtts, 50),
+            'p90': _percentile(rtts, 90),
+            'max': max(rtts) if rtts else None,
+            'consistency': round(agree / len(compared), 3) if compared else None,
+        }
+        row['healthy'] = bool(rtts) and row['timeout_rate'] <= MAX_TIMEOUT_RATE and (row['consistency'] or 0) >= MIN_CONSISTENCY
+        row['best'] = False
+        stats.append(row)
+    stats.sort(key=lambda r: (not r['healthy'], r['p50'] if r['p50'] is not None else float('inf')))
+    if stats and stats[0]['healthy']:
+        stats[0]['best'] = True
+    return stats
+
+
+async def bench_async(specs, queries=DEFAULT_QUERIES, rounds=3, deadline=2.0, on_progress=None, stop=None):
+    # All resolvers run side by side; each sends its queries one after another so the
+    # timings are not skewed by its own parallel load. Consistency is judged on the
+    # first answer each query got.
+    samples = {spec: [] for spec in specs}
+    answers = {spec: {} for spec in specs}
+    total = len(specs) * len(queries) * rounds
+    done = [0]
+
+    async def run(spec):
+        resolver = make_resolver(spec)
+        for _ in range(rounds):
+            for name, rtype in queries:
+                if stop and stop():
+                    return
+                elapsed, answer = await timed_query(resolver, name, rtype, deadline)
+                samples[spec].append(elapsed if answer is not None else None)
+                if answers[spec].get((name, rtype)) is None:
+                    answers[spec][(name, rtype)] = answer
+                done[0] += 1
+                if on_progress:
+                    on_progress(done[0], total)
+
+    await asyncio.gather(*(run(spec) for spec in specs))
+    return summarize(specs, samples, answers)
+
+
+def bench(specs, queries=DEFAULT_QUERIES, rounds=3, deadline=2.0, on_progress=None, stop=None):
+    return asyncio.run(bench_async(specs, queries, rounds, deadline, on_progress, stop))
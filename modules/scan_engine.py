@@ -0,0 +1,413 @@
+import asyncio
+import collections
+import errno
+import ipaddress
+import socket
+import threading
+import time
+
+# Port states reported by the engine
+OPEN = 'open'
+CLOSED = 'closed'
+FILTERED = 'filtered'
+ERROR = 'error'
+
+_REFUSED_ERRNOS = (errno.ECONNREFUSED, getattr(errno, 'WSAECONNREFUSED', 10061))
+
+# Ports used for the liveness pre-pass; any answer (even a RST) proves the host is up
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389, 8080)
+MAX_HOSTS = 65536
+
+
+def parse_ports(spec):
+    # Accepts "22", "1-1024", "1-1024,3306,8080-8090"; returns a sorted list of unique ports
+    ports = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            lo, _, hi = part.partition('-')
+            lo = int(lo) if lo else 1
+            hi = int(hi) if hi else 65535
+            if lo > hi:
+                lo, hi = hi, lo
+        else:
+            lo = hi = int(part)
+        if lo < 1 or hi > 65535:
+            raise ValueError(f"Port out of range: {part}")
+        ports.update(range(lo, hi + 1))
+    if not ports:
+        raise ValueError("No ports given")
+    return sorted(ports)
+
+
+def _expand_range(token):
+    # "10.0.0.1-10.0.0.50" or the short form "10.0.0.1-50"
+    first, _, last = token.partition('-')
+    start = ipaddress.ip_address(first)
+    if '.' not in last and ':' not in last:
+        prefix = first.rsplit('.', 1)[0] if start.version == 4 else first.rsplit(':', 1)[0]
+        sep = '.' if start.version == 4 else ':'
+        last = f"{prefix}{sep}{last}"
+    end = ipaddress.ip_address(last)
+    if end < start:
+        start, end = end, start
+    if int(end) - int(start) + 1 > MAX_HOSTS:
+        raise ValueError(f"Range too large: {token}")
+    return [str(ipaddress.ip_address(i)) for i in range(int(start), int(end) + 1)]
+
+
+def parse_hosts(spec):
+    # Accepts hostnames, IPs, CIDR blocks (10.0.0.0/22), IP ranges and @file references,
+    # separated by commas, whitespace or newlines. Order is kept, duplicates dropped.
+    hosts = []
+    seen = set()
+
+    def add(h):
+        if h not in seen:
+            seen.add(h)
+            hosts.append(h)
+            if len(hosts) > MAX_HOSTS:
+                raise ValueError(f"Too many hosts (max {MAX_HOSTS})")
+
+    for token in spec.replace(',', ' ').split():
+        if token.startswith('@'):
+            with open(token[1:], encoding='utf-8', errors='ignore') as f:
+                lines = [line.split('#', 1)[0].strip() for line in f]
+            for h in parse_hosts(' '.join(line for line in lines if line)):
+                add(h)
+        elif '/' in token:
+            net = ipaddress.ip_network(token, strict=False)
+            if net.num_addresses > MAX_HOSTS * 2:
+                raise ValueError(f"Network too large: {token}")
+            for ip in net.hosts():
+                add(str(ip))
+        elif '-' in token and _is_ip(token.split('-', 1)[0]):
+            for h in _expand_range(token):
+                add(h)
+        else:
+            add(token)
+    if not hosts:
+        raise ValueError("No hosts given")
+    return hosts
+
+
+def _is_ip(text):
+    try:
+        ipaddress.ip_address(text)
+        return True
+    except ValueError:
+        return False
+
+
+def fd_budget(reserve=64):
+    # Sockets we can open without starving the rest of the app (None = no known limit)
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return max(1, soft - reserve)
+
+
+class TokenBucket:
+    # Classic token bucket: `rate` tokens per second, bursts of up to `burst`.
+    # reserve() takes a token and returns how long the caller must wait before
+    # using it, so it works from coroutines (asyncio.sleep) and threads (time.sleep).
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, self.rate / 10))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1.0):
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def wait(self, tokens=1.0, stop=None):
+        # Sleeps in short slices so a stop() can cut a long wait short
+        delay = self.reserve(tokens)
+        deadline = time.monotonic() + delay
+        while delay > 0:
+            if stop and stop():
+                return
+            await asyncio.sleep(min(delay, 0.1))
+            delay = deadline - time.monotonic()
+
+
+class RoundRobinScheduler:
+    # Hands out (target, port) jobs one host at a time in rotation, so a sweep never
+    # works through one host's port list in a burst. Hosts that already have
+    # `per_host` probes in flight are skipped until one of them completes.
+    # Once stop() returns true no further jobs are handed out.
+    def __init__(self, targets, ports, per_host=0, stop=None):
+        self.per_host = per_host
+        self.stop = stop
+        self._ring = collections.deque((t, iter(ports)) for t in targets)
+        self._inflight = collections.Counter()
+        self._cond = asyncio.Condition()
+
+    async def next(self):
+        async with self._cond:
+            while self._ring:
+                if self.stop and self.stop():
+                    return None
+                for _ in range(len(self._ring)):
+                    target, ports = self._ring[0]
+                    self._ring.rotate(-1)
+                    if self.per_host and self._inflight[target] >= self.per_host:
+                        continue
+                    port = next(ports, None)
+                    if port is None:
+                        self._ring.pop()
+                        continue
+                    self._inflight[target] += 1
+                    return target, port
+                if self._ring:
+                    # stop() comes from another thread and cannot notify, so re-check it regularly
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), 0.1)
+                    except asyncio.TimeoutError:
+                        pass
+            return None
+
+    async def done(self, target):
+        async with self._cond:
+            self._inflight[target] -= 1
+            self._cond.notify_all()
+
+
+class RttEstimator:
+    # Per-host smoothed round-trip estimate in the style of TCP (RFC 6298):
+    # SRTT/RTTVAR are updated from every answered connect (SYN/ACK or RST) and the
+    # connect timeout is SRTT + 4 * RTTVAR, clamped to [min_timeout, max_timeout].
+    ALPHA = 0.125
+    BETA = 0.25
+    def __init__(self, initial=1.0, min_timeout=0.1, max_timeout=10):
+        self.initial = initial
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+
+    def timeout(self, attempt=0):
+        if self.srtt is None:
+            base = self.initial
+        else:
+            base = self.srtt + max(4 * self.rttvar, 0.01)
+        # Exponential backoff on retries, like a retransmission timer
+        return min(max(base, self.min_timeout) * 2 ** attempt, self.max_timeout)
+
+
+class PortScanEngine:
+    # Scans (host, port) pairs with a fixed pool of coroutines on a single event loop.
+    # Memory stays flat regardless of how many ports are queued, and at most
+    # `concurrency` sockets are open at any moment.
+    # With timeout=None each host gets an RttEstimator and connect timeouts adapt to
+    # the measured round trip (bounded by max_timeout); a timed-out port is retried
+    # up to `retries` times with backoff before it is reported as filtered.
+    # With banners=True open sockets are handed to a second stage with its own pool
+    # (banner_concurrency) and read deadline (banner_timeout) for service detection.
+    # `rate` caps connect attempts per second across all hosts (0 = unlimited) and
+    # `per_host` caps probes in flight against any single host (0 = unlimited).
+    def __init__(self, concurrency=200, timeout=None, max_timeout=10, min_timeout=0.1, retries=1,
+                 banners=False, banner_concurrency=50, banner_timeout=3.0, rate=0, per_host=0):
+        self.concurrency = max(1, int(concurrency))
+        budget = fd_budget()
+        if budget is not None:
+            # Never plan for more sockets than the process may open
+            self.concurrency = min(self.concurrency, budget)
+            banner_concurrency = min(banner_concurrency, max(1, budget - self.concurrency))
+        self.bucket = TokenBucket(rate)
+        self.per_host = max(0, int(per_host))
+        self.attempts = 0
+        self.timeout = timeout
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.retries = max(0, int(retries))
+        self.banners = banners
+        self.banner_concurrency = max(1, int(banner_concurrency))
+        self.banner_timeout = banner_timeout
+        self._rtt = {}
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    async def resolve(self, host):
+        from modules.dns_cache import getaddrinfo_async
+        infos = await getaddrinfo_async(host, type=socket.SOCK_STREAM)
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0]
+
+    async def connect(self, family, address, port, timeout, keep_open=False):
+        # Returns (state, elapsed_ms, sock); sock is only left open for an OPEN port with keep_open.
+        # state is None when the engine was stopped before the probe went out.
+        loop = asyncio.get_running_loop()
+        await self.bucket.wait(stop=lambda: self._stopped)
+        if self._stopped:
+            return None, 0.0, None
+        self.attempts += 1
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+            state = OPEN
+        except asyncio.TimeoutError:
+            state = FILTERED
+        except ConnectionRefusedError:
+            state = CLOSED
+        except OSError as e:
+            state = CLOSED if e.errno in _REFUSED_ERRNOS else ERROR
+        elapsed = (time.perf_counter() - start) * 1000
+        if state == OPEN and keep_open:
+            return state, elapsed, sock
+        sock.close()
+        return state, elapsed, None
+
+    async def probe(self, family, address, port, timeout):
+        state, elapsed, _ = await self.connect(family, address, port, timeout)
+        return state, elapsed
+
+    def rtt_for(self, address):
+        est = self._rtt.get(address)
+        if est is None:
+            est = RttEstimator(initial=min(1.0, self.max_timeout), min_timeout=self.min_timeout, max_timeout=self.max_timeout)
+            self._rtt[address] = est
+        return est
+
+    async def probe_adaptive(self, family, address, port, keep_open=False):
+        if self.timeout is not None:
+            return await self.connect(family, address, port, self.timeout, keep_open)
+        est = self.rtt_for(address)
+        for attempt in range(self.retries + 1):
+            state, elapsed, sock = await self.connect(family, address, port, est.timeout(attempt), keep_open)
+            if state in (OPEN, CLOSED):
+                est.update(elapsed / 1000)
+            if state != FILTERED or self._stopped:
+                break
+        return state, elapsed, sock
+
+    async def _grab(self, host, port, sock, slots, on_service):
+        from modules.service_probe import grab_banner, identify
+        try:
+            banner = await grab_banner(sock, host, port, self.banner_timeout)
+        finally:
+            sock.close()
+            slots.release()
+        service, version = identify(port, banner)
+        on_service(host, port, service, version, banner)
+
+    async def _resolve_all(self, hosts, on_result):
+        sem = asyncio.Semaphore(min(self.concurrency, 64))
+
+        async def resolve_one(host):
+            async with sem:
+                try:
+                    family, address = await self.resolve(host)
+                except (OSError, UnicodeError):
+                    on_result(host, 0, ERROR, 0.0)
+                    return None
+                return host, family, address
+
+        resolved = await asyncio.gather(*(resolve_one(h) for h in hosts))
+        return [t for t in resolved if t]
+
+    async def discover(self, targets, on_host=None, ports=DISCOVERY_PORTS, timeout=1.5):
+        # Cheap liveness pre-pass: a handful of concurrent connects per host
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def knock(family, address, port):
+            async with sem:
+                if self._stopped:
+                    return FILTERED
+                state, elapsed = await self.probe(family, address, port, min(timeout, self.max_timeout))
+                if state in (OPEN, CLOSED):
+                    # Discovery answers seed the host's RTT estimate for the full scan
+                    self.rtt_for(address).update(elapsed / 1000)
+                return state
+
+        async def check(target):
+            host, family, address = target
+            states = await asyncio.gather(*(knock(family, address, p) for p in ports))
+            alive = OPEN in states or CLOSED in states
+            if on_host:
+                on_host(host, alive)
+            return alive
+
+        alive = await asyncio.gather(*(check(t) for t in targets))
+        return [t for t, up in zip(targets, alive) if up]
+
+    async def scan(self, hosts, ports, on_result, discover=False, on_host=None, on_plan=None, on_service=None):
+        # on_result(host, port, state, elapsed_ms) is called as soon as each port resolves.
+        # With discover=True and more than one host, dead hosts are dropped before the
+        # full scan; on_host(host, alive) reports each verdict and on_plan(total) the
+        # number of (host, port) probes that will actually run. When banner grabbing is
+        # on, on_service(host, port, service, version, banner_bytes) follows for open ports.
+        targets = await self._resolve_all(hosts, on_result)
+        if discover and len(targets) > 1:
+            targets = await self.discover(targets, on_host)
+        if on_plan:
+            on_plan(len(targets) * len(ports))
+        if not targets or self._stopped:
+            return
+        scheduler = RoundRobinScheduler(targets, ports, self.per_host, stop=lambda: self._stopped)
+        grab = self.banners and on_service is not None
+        # A free slot is taken before handing off, so at most banner_concurrency
+        # sockets sit in the second stage and connect workers only wait when it is full
+        slots = asyncio.Semaphore(self.banner_concurrency)
+        grabs = set()
+
+        async def worker():
+            while not self._stopped:
+                job = await scheduler.next()
+                if job is None:
+                    return
+                target, port = job
+                host, family, address = target
+                try:
+                    state, elapsed, sock = await self.probe_adaptive(family, address, port, keep_open=grab)
+                finally:
+                    await scheduler.done(target)
+                if state is None:
+                    return
+                on_result(host, port, state, elapsed)
+                if sock is not None:
+                    await slots.acquire()
+                    task = asyncio.ensure_future(self._grab(host, port, sock, slots, on_service))
+                    grabs.add(task)
+                    task.add_done_callback(grabs.discard)
+
+        workers = min(self.concurrency, len(targets) * len(ports))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if grabs:
+            await asyncio.gather(*grabs, return_exceptions=True)
+
+    def run(self, hosts, ports, on_result, **kwargs):
+        asyncio.run(self.scan(hosts, ports, on_result, **kwargs))
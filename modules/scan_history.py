@@ -0,0 +1,103 @@
+import sqlite3
+import time
+from shared.paths import data_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target TEXT NOT NULL,
+    ports TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    latency REAL,
+    ts REAL NOT NULL,
+    banner TEXT,
+    service TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_target ON runs(target, started);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS idx_results_host ON results(host, port);
+CREATE INDEX IF NOT EXISTS idx_results_port ON results(port);
+CREATE INDEX IF NOT EXISTS idx_results_ts ON results(ts);
+"""
+
+
+class ScanHistory:
+    # SQLite-backed log of every port scan run. Each connection is bound to the
+    # thread that opened it, so workers and dialogs open their own instance.
+    def __init__(self, path=None):
+        self.path = path or data_path('scan_history.db')
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(results)')}
+        if 'service' not in columns:
+            # Databases created before service detection existed
+            self.conn.execute('ALTER TABLE results ADD COLUMN service TEXT')
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, target, ports, started=None):
+        with self.conn:
+            cur = self.conn.execute('INSERT INTO runs (target, ports, started) VALUES (?, ?, ?)',
+                                    (target, ports, started or time.time()))
+        return cur.lastrowid
+
+    def add_results(self, run_id, rows):
+        # rows: iterable of (host, port, state, latency_ms, timestamp, banner[, service])
+        with self.conn:
+            self.conn.executemany('INSERT INTO results (run_id, host, port, state, latency, ts, banner, service) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                  ((run_id,) + tuple(r) + (None,) * (7 - len(r)) for r in rows))
+
+    def finish_run(self, run_id, finished=None):
+        with self.conn:
+            self.conn.execute('UPDATE runs SET finished = ? WHERE id = ?', (finished or time.time(), run_id))
+
+    def runs(self, target=None, limit=50):
+        if target is None:
+            cur = self.conn.execute('SELECT id, target, ports, started, finished FROM runs ORDER BY started DESC LIMIT ?', (limit,))
+        else:
+            cur = self.conn.execute('SELECT id, target, ports, started, finished FROM runs WHERE target = ? ORDER BY started DESC LIMIT ?', (target, limit))
+        return cur.fetchall()
+
+    def run(self, run_id):
+        cur = self.conn.execute('SELECT id, target, ports, started, finished FROM runs WHERE id = ?', (run_id,))
+        return cur.fetchone()
+
+    def previous_run(self, run_id):
+        # Latest earlier complete run of the same target; stopped runs are never finished
+        cur = self.conn.execute('SELECT id FROM runs WHERE target = (SELECT target FROM runs WHERE id = ?) AND id < ? AND finished IS NOT NULL ORDER BY id DESC LIMIT 1',
+                                (run_id, run_id))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def results(self, run_id):
+        cur = self.conn.execute('SELECT host, port, state, latency, ts, banner, service FROM results WHERE run_id = ? ORDER BY host, port', (run_id,))
+        return cur.fetchall()
+
+    def _states(self, run_id):
+        cur = self.conn.execute('SELECT host, port, state FROM results WHERE run_id = ?', (run_id,))
+        return {(host, port): state for host, port, state in cur}
+
+    def diff(self, run_id, previous_id=None):
+        # Returns (previous_id, opened, closed); each change is (host, port, old_state, new_state).
+        # Only (host, port) pairs both runs probed are compared, so a different port list
+        # or a stopped run does not show up as ports that opened or closed.
+        if previous_id is None:
+            previous_id = self.previous_run(run_id)
+        if previous_id is None:
+            return None, [], []
+        old = self._states(previous_id)
+        new = self._states(run_id)
+        common = old.keys() & new.keys()
+        opened = [(h, p, old[(h, p)], new[(h, p)]) for h, p in common if new[(h, p)] == 'open' and old[(h, p)] != 'open']
+        closed = [(h, p, old[(h, p)], new[(h, p)]) for h, p in common if old[(h, p)] == 'open' and new[(h, p)] != 'open']
+        return previous_id, sorted(opened, key=lambda c: c[:2]), sorted(closed, key=lambda c: c[:2])
@@ -0,0 +1,160 @@
+from array import array
+import ipaddress
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from modules.scan_engine import OPEN, CLOSED, FILTERED, ERROR
+
+STATES = (OPEN, CLOSED, FILTERED, ERROR)
+_STATE_CODES = {s: i for i, s in enumerate(STATES)}
+_STATE_COLORS = (QColor('#aaffaa'), QColor('#8888aa'), QColor('#ffd27f'), QColor('#ffaaaa'))
+
+
+def _host_key(host):
+    # IPs sort numerically (v4 before v6), names alphabetically after them
+    try:
+        ip = ipaddress.ip_address(host)
+        return (0, ip.version, int(ip), '')
+    except ValueError:
+        return (1, 0, 0, host)
+
+
+class ScanResultsModel(QAbstractTableModel):
+    # Column-oriented result store for the port scanner. Every result costs a few bytes
+    # in typed arrays (host id, port, state code, latency); service info is kept only
+    # for open ports. The view shows `_view`, a list of storage rows that reflects the
+    # active state filter and sort, so neither needs a proxy model.
+    HEADERS = ['Host', 'Port', 'State', 'Latency (ms)', 'Service', 'Banner']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clear()
+
+    def clear(self):
+        self.beginResetModel()
+        self._hosts = []
+        self._host_ids = {}
+        self._host = array('I')
+        self._port = array('H')
+        self._state = array('B')
+        self._latency = array('f')
+        self._services = {}
+        self._open_rows = {}
+        self._counts = [0] * len(STATES)
+        self._view = array('I')
+        self._filter = None
+        self._sort = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._view[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self._hosts[self._host[row]]
+            if col == 1:
+                return str(self._port[row])
+            if col == 2:
+                return STATES[self._state[row]].upper()
+            if col == 3:
+                return f'{self._latency[row]:.1f}'
+            service = self._services.get(row)
+            if service:
+                return service[col - 4]
+            return ''
+        if role == Qt.ItemDataRole.ForegroundRole and col == 2:
+            return _STATE_COLORS[self._state[row]]
+        if role == Qt.ItemDataRole.TextAlignmentRole and col in (1, 3):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def append_results(self, batch):
+        # batch: list of (host, port, state, elapsed_ms); inserted with a single beginInsertRows
+        shown = array('I')
+        for host, port, state, elapsed in batch:
+            host_id = self._host_ids.get(host)
+            if host_id is None:
+                host_id = self._host_ids[host] = len(self._hosts)
+                self._hosts.append(host)
+            code = _STATE_CODES.get(state, _STATE_CODES[ERROR])
+            row = len(self._port)
+            self._host.append(host_id)
+            self._port.append(port)
+            self._state.append(code)
+            self._latency.append(elapsed)
+            self._counts[code] += 1
+            if code == 0:
+                self._open_rows[(host, port)] = row
+            if self._filter is None or self._filter == code:
+                shown.append(row)
+        if shown:
+            first = len(self._view)
+            self.beginInsertRows(QModelIndex(), first, first + len(shown) - 1)
+            self._view.extend(shown)
+            self.endInsertRows()
+
+    def set_service(self, host, port, service, banner):
+        row = self._open_rows.get((host, port))
+        if row is None:
+            return
+        self._services[row] = (service, banner)
+        if self._view:
+            self.dataChanged.emit(self.index(0, 4), self.index(len(self._view) - 1, 5))
+
+    def counts(self):
+        return dict(zip(STATES, self._counts))
+
+    def total(self):
+        return len(self._port)
+
+    def set_state_filter(self, state):
+        self._filter = None if state is None else _STATE_CODES[state]
+        self._rebuild_view()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort = (column, order) if column >= 0 else None
+        self._rebuild_view()
+
+    def _sort_key(self, column):
+        if column == 0:
+            ranks = {hid: rank for rank, hid in enumerate(sorted(range(len(self._hosts)), key=lambda h: _host_key(self._hosts[h])))}
+            host, port = self._host, self._port
+            return lambda r: (ranks[host[r]], port[r])
+        if column == 1:
+            return self._port.__getitem__
+        if column == 2:
+            return self._state.__getitem__
+        if column == 3:
+            return self._latency.__getitem__
+        services = self._services
+        return lambda r: services.get(r, ('', ''))[column - 4]
+
+    def _rebuild_view(self):
+        if self._filter is None:
+            rows = range(len(self._port))
+        else:
+            code = self._filter
+            rows = [r for r, s in enumerate(self._state) if s == code]
+        if self._sort is not None:
+            column, order = self._sort
+            rows = sorted(rows, key=self._sort_key(column), reverse=order == Qt.SortOrder.DescendingOrder)
+        self.beginResetModel()
+        self._view = array('I', rows)
+        self.endResetModel()
+
+    def resort(self):
+        # Rows streamed in during a scan are appended unsorted; restore the order afterwards
+        if self._sort is not None:
+            self._rebuild_view()
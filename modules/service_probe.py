@@ -0,0 +1,97 @@
+import asyncio
+import re
+import socket
+
+# Ports where the server speaks first; we only listen
+PASSIVE_PORTS = {21, 22, 23, 25, 110, 143, 465, 587, 2525, 3306, 5900, 5901}
+HTTP_PORTS = {80, 81, 591, 3000, 5000, 5601, 8000, 8008, 8080, 8081, 8088, 8888, 9000, 9090, 9200}
+REDIS_PORTS = {6379}
+
+MAX_BANNER = 4096
+
+
+def probe_for(port, host):
+    # Returns the bytes to send after connect, or None to wait for a greeting
+    if port in HTTP_PORTS:
+        return f"HEAD / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: toolbelt\r\n\r\n".encode()
+    if port in REDIS_PORTS:
+        return b"INFO server\r\n"
+    return None
+
+
+async def grab_banner(sock, host, port, timeout=3.0):
+    # Reads whatever the service volunteers on an already connected non-blocking socket.
+    # Ports with no known greeting get half the deadline to speak, then an HTTP HEAD.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    payload = probe_for(port, host)
+    data = b''
+    if payload is None and port not in PASSIVE_PORTS:
+        data = await _read(loop, sock, timeout / 2)
+        if not data:
+            payload = probe_for(80, host)
+    if payload is not None:
+        try:
+            await asyncio.wait_for(loop.sock_sendall(sock, payload), max(deadline - loop.time(), 0.05))
+        except (OSError, asyncio.TimeoutError):
+            return data
+    if not data:
+        data = await _read(loop, sock, max(deadline - loop.time(), 0.05))
+    return data
+
+
+async def _read(loop, sock, timeout):
+    # One read for the first chunk, then keep draining briefly for multi-line greetings
+    chunks = []
+    try:
+        chunk = await asyncio.wait_for(loop.sock_recv(sock, MAX_BANNER), timeout)
+        while chunk:
+            chunks.append(chunk)
+            if sum(len(c) for c in chunks) >= MAX_BANNER:
+                break
+            chunk = await asyncio.wait_for(loop.sock_recv(sock, MAX_BANNER), 0.2)
+    except (OSError, asyncio.TimeoutError):
+        pass
+    return b''.join(chunks)[:MAX_BANNER]
+
+
+_TEXT_RULES = [
+    (re.compile(r'^SSH-[\d.]+-(\S+)'), 'ssh'),
+    (re.compile(r'^HTTP/\d(?:\.\d)? \d{3}[^\n]*\n(?:.*\n)*?server:\s*([^\r\n]+)', re.I), 'http'),
+    (re.compile(r'^HTTP/\d(?:\.\d)? \d{3}()'), 'http'),
+    (re.compile(r'redis_version:(\S+)'), 'redis'),
+    (re.compile(r'^-(?:NOAUTH|ERR|DENIED)()'), 'redis'),
+    (re.compile(r'^220[ -][^\r\n]*?E?SMTP\s*([^\r\n]*)', re.I), 'smtp'),
+    (re.compile(r'^220[ -]([^\r\n]*)'), 'ftp'),
+    (re.compile(r'^\+OK\s*([^\r\n]*)'), 'pop3'),
+    (re.compile(r'^\* OK\s*([^\r\n]*)'), 'imap'),
+    (re.compile(r'^RFB (\d{3}\.\d{3})'), 'vnc'),
+]
+
+
+def identify(port, banner):
+    # Returns (service, version) from a raw banner, falling back to the well-known port name
+    if len(banner) > 5 and banner[4] == 0x0a and b'\0' in banner[5:64]:
+        # MySQL/MariaDB initial handshake packet: protocol 10 followed by the version string
+        version = banner[5:banner.index(b'\0', 5)].decode(errors='ignore')
+        return ('mariadb' if 'mariadb' in version.lower() else 'mysql'), version
+    text = banner.decode(errors='ignore')
+    for pattern, service in _TEXT_RULES:
+        match = pattern.search(text)
+        if match:
+            if service == 'redis' and port not in REDIS_PORTS and not match.group(1):
+                continue
+            if service == 'ftp' and port in (25, 465, 587, 2525):
+                service = 'smtp'
+            return service, match.group(1).strip()
+    try:
+        service = socket.getservbyport(port, 'tcp')
+    except OSError:
+        service = ''
+    return service, ''
+
+
+def printable(banner, limit=200):
+    text = banner.decode(errors='ignore')
+    text = ''.join(c if c.isprintable() else ' ' for c in text.replace('\r\n', ' | ').replace('\n', ' | '))
+    return ' '.join(text.split()).rstrip(' |')[:limit]
@@ -36,10 +36,19 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal
 import paramiko
 import socket
 import re
+from modules.dns_cache import create_connection
 
 class SSHWorker(QThread):
+    # Most bytes taken off the channel per recv, and per output signal while draining
+    READ_SIZE = 65536
+    MAX_EMIT = 1 << 20
     def stop(self):
         self.running = False
+        # Wake the read loop's select() right away
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            pass
         if self.channel:
             try:
                 self.channel.close()
@@ -72,13 +81,17 @@ class SSHWorker(QThread):
         self.client = None
         self.channel = None
         self.running = True
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
         self.command_input.connect(self.send_command)
 
     def run(self):
         try:
             self.client = paramiko.SSHClient()
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.client.connect(self.hostname, username=self.username, password=self.password, timeout=8)
+            # Connect through the shared DNS cache; paramiko keeps the hostname for host keys
+            sock = create_connection(self.hostname, 22, timeout=8)
+            self.client.connect(self.hostname, username=self.username, password=self.password, timeout=8, sock=sock)
             self.channel = self.client.invoke_shell()
             self.connected.emit(True)
             # Detect OS
@@ -106,18 +119,51 @@ class SSHWorker(QThread):
                 else:
                     self.remote_os = 'Unknown'
                     self.os_detected.emit('Unknown')
-            import time
-            while self.running and self.channel and not self.channel.closed:
-                if self.channel.recv_ready():
-                    data = self.channel.recv(4096).decode(errors='ignore')
-                    self.output.emit(data)
-                time.sleep(0.01)
+            self.read_loop()
         except (paramiko.ssh_exception.SSHException, socket.error) as e:
             self.output.emit(f"Connection error: {e}\n")
             self.connected.emit(False)
         finally:
             if self.client:
                 self.client.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def read_loop(self):
+        # Blocks until the channel has data or stop() writes to the wake socket, then
+        # drains everything buffered. The incremental decoder keeps multi-byte characters
+        # split across reads intact.
+        import codecs
+        import selectors
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        buf = bytearray()
+        selector = selectors.DefaultSelector()
+        selector.register(self.channel, selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while self.running and not self.channel.closed:
+                for key, _ in selector.select():
+                    if key.fileobj is self._wake_r:
+                        try:
+                            self._wake_r.recv(64)
+                        except OSError:
+                            pass
+                while self.channel.recv_ready():
+                    buf += self.channel.recv(self.READ_SIZE)
+                    if len(buf) >= self.MAX_EMIT:
+                        self.emit_output(decoder, buf)
+                self.emit_output(decoder, buf)
+                if self.channel.eof_received and not self.channel.recv_ready():
+                    break
+        finally:
+            selector.close()
+
+    def emit_output(self, decoder, buf):
+        if buf:
+            text = decoder.decode(buf)
+            del buf[:]
+            if text:
+                self.output.emit(text)
 
 class SSHTool(QWidget):
     def closeEvent(self, event):
@@ -3,39 +3,7 @@ from PyQt6.QtCore import QTimer, Qt
 from PyQt6.QtGui import QColor, QFont
 import platform, os, psutil
 from modules.circular_progress import CircularProgress
-
-# Try to get a better CPU name on Windows
-import sys
-_cpu_name = None
-if sys.platform == 'win32':
-    try:
-        import wmi
-        _wmi = wmi.WMI()
-        _cpu_name = _wmi.Win32_Processor()[0].Name.strip()
-    except Exception:
-        _cpu_name = platform.processor()
-elif sys.platform.startswith('linux'):
-    try:
-        # Try /proc/cpuinfo first
-        with open('/proc/cpuinfo') as f:
-            for line in f:
-                if 'model name' in line:
-                    _cpu_name = line.split(':', 1)[1].strip()
-                    break
-    except Exception:
-        pass
-    if not _cpu_name:
-        try:
-            import subprocess
-            _cpu_name = subprocess.check_output(['lscpu'], text=True)
-            for line in _cpu_name.splitlines():
-                if 'Model name' in line:
-                    _cpu_name = line.split(':', 1)[1].strip()
-                    break
-        except Exception:
-            _cpu_name = platform.processor()
-else:
-    _cpu_name = platform.processor()
+from modules.system_probe import cpu_name, gpu_name, gpu_usage
 
 class SystemInfoTab(QWidget):
     def __init__(self, parent=None):
@@ -163,7 +131,7 @@ class SystemInfoTab(QWidget):
         self.timer.start(1000)
         self.update_info()
         self.os_label.setText(f"{platform.system()} {platform.release()} ({platform.machine()})")
-        self.cpu_label.setText(f"{os.cpu_count()} cores, {_cpu_name}")
+        self.cpu_label.setText(f"{os.cpu_count()} cores, {cpu_name()}")
         self.ram_label.setText(f"{round(psutil.virtual_memory().used/1024**3,2)} / {round(psutil.virtual_memory().total/1024**3,2)} GB")
         self.gpu_label.setText(f"{self.get_gpu_name()}")
         # Drives info (right side)
@@ -241,125 +209,14 @@ class SystemInfoTab(QWidget):
                 # Removed invalid leftover disk widget code
 
     def get_gpu_usage(self):
-        import sys
-        if sys.platform.startswith('linux') or sys.platform == 'win32':
-            try:
-                import subprocess
-                result = subprocess.run([
-                    'nvidia-smi',
-                    '--query-gpu=utilization.gpu',
-                    '--format=csv,noheader,nounits'
-                ], capture_output=True, text=True)
-                if result.returncode == 0 and result.stdout.strip():
-                    usage = result.stdout.strip().split('\n')[0]
-                    return float(usage)
-            except Exception:
-                pass
-        return None
-        # DISK(s)
-        self.disk_circs = []
-        disk_partitions = psutil.disk_partitions()
-        if len(disk_partitions) > 1:
-            disk_group = QVBoxLayout()
-            # Removed disk_label
-            from PyQt6.QtWidgets import QGridLayout
-            disks_grid = QGridLayout()
-            disks_grid.setHorizontalSpacing(12)
-            disks_grid.setVerticalSpacing(12)
-            for idx, part in enumerate(disk_partitions):
-                circ = CircularProgress(part.device.rstrip('\\/'), QColor(255, 180, 0), self)
-                circ.setToolTip(f"Disk {part.device}")
-                circ.setFixedSize(70, 70)
-                circ.thickness = 7  # Custom attribute for thin ring
-                circ.font_size = 9  # Custom attribute for small text
-                self.disk_circs.append(circ)
-                row = idx % 2  # max 2 rows
-                col = idx // 2
-                disks_grid.addWidget(circ, row, col)
-            disk_group.addLayout(disks_grid)
-            circ_row.addLayout(disk_group)
-        else:
-            self.disk_circ = CircularProgress('DISK', QColor(255, 180, 0), self)
-            self.disk_circ.setToolTip('Disk Usage')
-            self.disk_circ.setFixedSize(140, 140)
-            circ_row.addWidget(self.disk_circ)
-        circ_row.addStretch(1)
-        usage_card.setLayout(circ_row)
-        layout.addWidget(usage_card)
-        # Section: Battery
-        batt_header = QLabel('Battery')
-        batt_header.setFont(QFont('Consolas', 18, QFont.Weight.Bold))
-        batt_header.setStyleSheet('color: #7ecfff; padding-bottom: 4px;')
-        layout.addWidget(batt_header)
-        batt_card = QFrame()
-        batt_card.setStyleSheet('background: rgba(30,40,50,0.7); border-radius: 10px; padding: 12px;')
-        batt_layout = QHBoxLayout()
-        batt_layout.setSpacing(12)
-        self.battery_label = QLabel()
-        self.battery_label.setFont(QFont('Consolas', 14))
-        self.battery_bar = QProgressBar()
-        self.battery_bar.setRange(0, 100)
-        self.battery_bar.setFixedHeight(18)
-        self.battery_bar.setTextVisible(False)
-        self.battery_bar.setStyleSheet('QProgressBar {background: #222; border-radius: 8px;} QProgressBar::chunk {border-radius: 8px;}')
-        batt_layout.addWidget(self.battery_label)
-        batt_layout.addWidget(self.battery_bar)
-        batt_card.setLayout(batt_layout)
-        layout.addWidget(batt_card)
-        layout.addStretch(1)
-        self.setLayout(layout)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_info)
-        self.timer.start(1000)
-        self.update_info()
+        return gpu_usage()
 
     def get_gpu_name(self):
-        import sys
-        # Windows: use wmi, fallback to nvidia-smi if virtual/basic
-        if sys.platform == 'win32':
-            gpu_name = None
-            try:
-                import wmi
-                w = wmi.WMI()
-                gpus = w.Win32_VideoController()
-                if gpus:
-                    gpu_name = gpus[0].Name
-            except Exception:
-                pass
-            # Fallback if virtual/basic
-            if gpu_name and any(x in gpu_name.lower() for x in ['virtual', 'basic', 'microsoft']):
-                try:
-                    import subprocess
-                    result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'], capture_output=True, text=True)
-                    if result.returncode == 0 and result.stdout.strip():
-                        return result.stdout.strip().split('\n')[0]
-                except Exception:
-                    pass
-            if gpu_name:
-                return gpu_name
-        # Linux: try nvidia-smi, then lspci
-        elif sys.platform.startswith('linux'):
-            try:
-                import subprocess
-                # Try nvidia-smi first
-                result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'], capture_output=True, text=True)
-                if result.returncode == 0 and result.stdout.strip():
-                    return result.stdout.strip().split('\n')[0]
-            except Exception:
-                pass
-            try:
-                import subprocess
-                result = subprocess.run(['lspci'], capture_output=True, text=True)
-                for line in result.stdout.splitlines():
-                    if 'VGA compatible controller' in line or '3D controller' in line:
-                        return line.split(':', 2)[-1].strip()
-            except Exception:
-                pass
-        return 'N/A'
+        return gpu_name()
 
     def update_info(self):
         self.os_label.setText(f"{platform.system()} {platform.release()} ({platform.machine()})")
-        self.cpu_label.setText(f"{os.cpu_count()} cores, {_cpu_name}")
+        self.cpu_label.setText(f"{os.cpu_count()} cores, {cpu_name()}")
         self.ram_label.setText(f"{round(psutil.virtual_memory().used/1024**3,2)} / {round(psutil.virtual_memory().total/1024**3,2)} GB")
         self.gpu_label.setText(f"{self.get_gpu_name()}")
         # Drives info (right side)
@@ -0,0 +1,137 @@
+import os
+import platform
+import subprocess
+import sys
+import psutil
+
+_cpu_name = None
+
+
+def cpu_name():
+    # Best-effort marketing name of the CPU, looked up once per process
+    global _cpu_name
+    if _cpu_name is not None:
+        return _cpu_name
+    name = None
+    if sys.platform == 'win32':
+        try:
+            import wmi
+            name = wmi.WMI().Win32_Processor()[0].Name.strip()
+        except Exception:
+            name = platform.processor()
+    elif sys.platform.startswith('linux'):
+        try:
+            # Try /proc/cpuinfo first
+            with open('/proc/cpuinfo') as f:
+                for line in f:
+                    if 'model name' in line:
+                        name = line.split(':', 1)[1].strip()
+                        break
+        except Exception:
+            pass
+        if not name:
+            try:
+                for line in subprocess.check_output(['lscpu'], text=True).splitlines():
+                    if 'Model name' in line:
+                        name = line.split(':', 1)[1].strip()
+                        break
+            except Exception:
+                pass
+        if not name:
+            name = platform.processor()
+    else:
+        name = platform.processor()
+    _cpu_name = name or ''
+    return _cpu_name
+
+
+def gpu_name():
+    # Windows: use wmi, fallback to nvidia-smi if virtual/basic
+    if sys.platform == 'win32':
+        name = None
+        try:
+            import wmi
+            gpus = wmi.WMI().Win32_VideoController()
+            if gpus:
+                name = gpus[0].Name
+        except Exception:
+            pass
+        # Fallback if virtual/basic
+        if name and any(x in name.lower() for x in ['virtual', 'basic', 'microsoft']):
+            try:
+                result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'], capture_output=True, text=True)
+                if result.returncode == 0 and result.stdout.strip():
+                    return result.stdout.strip().split('\n')[0]
+            except Exception:
+                pass
+        if name:
+            return name
+    # Linux: try nvidia-smi, then lspci
+    elif sys.platform.startswith('linux'):
+        try:
+            result = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader'], capture_output=True, text=True)
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout.strip().split('\n')[0]
+        except Exception:
+            pass
+        try:
+            result = subprocess.run(['lspci'], capture_output=True, text=True)
+            for line in result.stdout.splitlines():
+                if 'VGA compatible controller' in line or '3D controller' in line:
+                    return line.split(':', 2)[-1].strip()
+        except Exception:
+            pass
+    return 'N/A'
+
+
+def gpu_usage():
+    if sys.platform.startswith('linux') or sys.platform == 'win32':
+        try:
+            result = subprocess.run([
+                'nvidia-smi',
+                '--query-gpu=utilization.gpu',
+                '--format=csv,noheader,nounits'
+            ], capture_output=True, text=True)
+            if result.returncode == 0 and result.stdout.strip():
+                return float(result.stdout.strip().split('\n')[0])
+        except Exception:
+            pass
+    return None
+
+
+def disks():
+    out = []
+    for part in psutil.disk_partitions():
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except Exception:
+            continue
+        out.append({'device': part.device, 'mountpoint': part.mountpoint,
+                    'used_gb': round(usage.used / 1024**3, 1), 'total_gb': round(usage.total / 1024**3, 1),
+                    'percent': usage.percent})
+    return out
+
+
+def battery():
+    batt = psutil.sensors_battery() if hasattr(psutil, 'sensors_battery') else None
+    if not batt:
+        return None
+    return {'percent': batt.percent, 'plugged': batt.power_plugged}
+
+
+def sample(include_gpu=True):
+    # One snapshot of the values the System Info tab displays
+    mem = psutil.virtual_memory()
+    return {
+        'os': f"{platform.system()} {platform.release()} ({platform.machine()})",
+        'cpu': cpu_name(),
+        'cores': os.cpu_count(),
+        'cpu_percent': psutil.cpu_percent(),
+        'ram_used_gb': round(mem.used / 1024**3, 2),
+        'ram_total_gb': round(mem.total / 1024**3, 2),
+        'ram_percent': mem.percent,
+        'gpu': gpu_name() if include_gpu else None,
+        'gpu_percent': gpu_usage() if include_gpu else None,
+        'disks': disks(),
+        'battery': battery(),
+    }
@@ -0,0 +1,175 @@
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialog
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+import time
+from abc import ABCMeta, abstractmethod
+from modules.dns_lookup import export_rows
+
+class TableLookupWorker(QThread):
+    # Runs job(on_row, stop, note) and hands its rows to the GUI in batches
+    # (every BATCH_SIZE rows or BATCH_INTERVAL seconds); note(text) shows a remark
+    BATCH_SIZE = 256
+    BATCH_INTERVAL = 0.1
+    results = pyqtSignal(list)
+    notice = pyqtSignal(str)
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self._stopped = False
+    def stop(self):
+        self._stopped = True
+    def run(self):
+        batch = []
+        last_flush = [time.monotonic()]
+        def flush():
+            if batch:
+                self.results.emit(batch[:])
+                batch.clear()
+            last_flush[0] = time.monotonic()
+        def on_row(row):
+            batch.append(row)
+            if len(batch) >= self.BATCH_SIZE or time.monotonic() - last_flush[0] >= self.BATCH_INTERVAL:
+                flush()
+        self.job(on_row, lambda: self._stopped, self.notice.emit)
+        flush()
+
+class _AbstractDialogMeta(type(QDialog), ABCMeta):
+    # Qt's wrapper metaclass combined with ABCMeta so abstract methods are enforced
+    pass
+
+class TableLookupDialog(QDialog, metaclass=_AbstractDialogMeta):
+    # Shared frame of the many-queries dialogs: an input area from add_inputs(), an
+    # in-flight limit, start/stop, a streaming sortable table and CSV/JSON export.
+    # Subclasses set the class attributes and implement add_inputs() and make_job();
+    # one that misses either fails when it is created.
+    TITLE = ''
+    FIELDS = ()
+    HEADERS = ()
+    CONCURRENCY = 200  # None hides the in-flight limit
+    EXPORT_NAME = 'results'
+    def __init__(self, cache_bar=None, parent=None):
+        super().__init__(parent)
+        from PyQt6.QtWidgets import QTableView, QHeaderView, QSpinBox
+        from modules.dns_table_model import DNSTableModel
+        self.setWindowTitle(self.TITLE)
+        self.resize(900, 600)
+        self.cache_bar = cache_bar
+        self.worker = None
+        self.total = 0
+        layout = QVBoxLayout()
+        self.add_inputs(layout)
+        row = QHBoxLayout()
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 4000)
+        self.concurrency_input.setValue(self.CONCURRENCY or 1)
+        self.concurrency_input.setToolTip('Queries running at the same time')
+        if self.CONCURRENCY:
+            row.addWidget(QLabel('In-flight:'))
+            row.addWidget(self.concurrency_input)
+        self.start_btn = QPushButton('Start')
+        self.start_btn.clicked.connect(self.start)
+        row.addWidget(self.start_btn)
+        self.stop_btn = QPushButton('Stop')
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        row.addWidget(self.stop_btn)
+        row.addStretch(1)
+        self.csv_btn = QPushButton('Export CSV')
+        self.csv_btn.clicked.connect(lambda: self.export('csv'))
+        row.addWidget(self.csv_btn)
+        self.json_btn = QPushButton('Export JSON')
+        self.json_btn.clicked.connect(lambda: self.export('json'))
+        row.addWidget(self.json_btn)
+        layout.addLayout(row)
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+        self.notes_label = QLabel('')
+        self.notes_label.setWordWrap(True)
+        self.notes_label.setStyleSheet('color: #ffd27f;')
+        self.notes_label.setVisible(False)
+        layout.addWidget(self.notes_label)
+        self.model = DNSTableModel(self.FIELDS, self.HEADERS, self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSortingEnabled(True)
+        self.view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.view.verticalHeader().setVisible(False)
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(22)
+        self.view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.view.setStyleSheet('background: #101014; color: #c0c0ff; font-family: Consolas; font-size: 13px;')
+        for col in range(len(self.FIELDS) - 1):
+            self.view.setColumnWidth(col, 200 if col == 0 else 140)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+    @abstractmethod
+    def add_inputs(self, layout):
+        pass
+    @abstractmethod
+    def make_job(self):
+        # Returns (item_count, job) where job(on_row, stop, note) produces the rows; raises ValueError/OSError on bad input
+        pass
+    def bypass_cache(self):
+        return self.cache_bar.bypass() if self.cache_bar else False
+    def start(self):
+        try:
+            self.total, job = self.make_job()
+        except (ValueError, OSError) as e:
+            self.status_label.setText(str(e))
+            return
+        self.model.clear()
+        self.notes_label.setVisible(False)
+        self.started = time.monotonic()
+        self.status_label.setText(f'Running {self.total} queries...')
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.worker = TableLookupWorker(job)
+        self.worker.results.connect(self.on_results)
+        self.worker.notice.connect(self.on_notice)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.start()
+    def on_notice(self, text):
+        self.notes_label.setText(text)
+        self.notes_label.setVisible(True)
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+        self.stop_btn.setEnabled(False)
+    def on_results(self, batch):
+        self.model.append_rows(batch)
+        self.status_label.setText(self.progress_text(False))
+    def progress_text(self, finished):
+        done = self.model.rowCount()
+        elapsed = time.monotonic() - self.started
+        if finished:
+            ok = sum(1 for r in self.model.rows() if r.get('status') == 'OK')
+            return f'Done: {done}/{self.total} in {elapsed:.1f} s, {ok} resolved'
+        return f'{done}/{self.total} ({done / elapsed if elapsed else 0:.0f}/s)'
+    def on_finished(self):
+        self.model.resort()
+        self.status_label.setText(self.progress_text(True))
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        if self.cache_bar:
+            self.cache_bar.refresh()
+    def export(self, fmt):
+        from PyQt6.QtWidgets import QFileDialog
+        rows = self.model.rows()
+        if not rows:
+            self.status_label.setText('Nothing to export yet.')
+            return
+        filters = 'CSV files (*.csv)' if fmt == 'csv' else 'JSON files (*.json)'
+        path, _ = QFileDialog.getSaveFileName(self, 'Export Results', f'{self.EXPORT_NAME}.{fmt}', filters)
+        if not path:
+            return
+        try:
+            export_rows(path, rows, fmt, self.FIELDS)
+            self.status_label.setText(f'Exported {len(rows)} rows to {path}')
+        except OSError as e:
+            self.status_label.setText(f'Export failed: {e}')
+    def closeEvent(self, event):
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(5000)
+        super().closeEvent(event)
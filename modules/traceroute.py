@@ -0,0 +1,148 @@
+import os
+import select
+import socket
+import struct
+import time
+from modules.dns_cache import getaddrinfo
+
+# Unprivileged traceroute for Linux. UDP probes for every TTL go out at once from one
+# socket with IP_RECVERR set; the ICMP time-exceeded / port-unreachable answers land on
+# the socket's error queue (read with MSG_ERRQUEUE) together with the probe payload, so
+# each answer is matched to its TTL without raw sockets. A whole trace takes about one
+# round trip to the farthest hop plus the timeout for hops that never answer.
+
+BASE_PORT = 33434
+MAX_HOPS = 30
+# Linux values (<linux/in.h>, <linux/in6.h>, <linux/errqueue.h>)
+IP_RECVERR = getattr(socket, 'IP_RECVERR', 11)
+IPV6_RECVERR = getattr(socket, 'IPV6_RECVERR', 25)
+SO_EE_ORIGIN_ICMP = 2
+SO_EE_ORIGIN_ICMP6 = 3
+_EXTENDED_ERR = struct.Struct('=IBBBBII')
+_PROBE = struct.Struct('!HH')
+# ICMP (type, code) answers that mean the probe reached the target, per family
+_REACHED = {socket.AF_INET: (3, 3), socket.AF_INET6: (1, 4)}
+_TIME_EXCEEDED = {socket.AF_INET: 11, socket.AF_INET6: 3}
+# Unreachable codes shown like traceroute does (!H host, !N network, !P protocol, !X filtered)
+_UNREACHABLE = {socket.AF_INET: {0: '!N', 1: '!H', 2: '!P', 9: '!X', 10: '!X', 13: '!X'},
+                socket.AF_INET6: {0: '!N', 1: '!X', 3: '!H', 6: '!X'}}
+
+
+def supported():
+    return hasattr(socket, 'MSG_ERRQUEUE')
+
+
+def _offender(family, cdata):
+    # The sockaddr of the router that sent the ICMP error follows sock_extended_err
+    pos = _EXTENDED_ERR.size
+    if family == socket.AF_INET:
+        return socket.inet_ntop(socket.AF_INET, cdata[pos + 4:pos + 8])
+    return socket.inet_ntop(socket.AF_INET6, cdata[pos + 8:pos + 24])
+
+
+def read_errors(sock, family):
+    # Drains the error queue; yields (ttl, query, router, icmp_type, icmp_code)
+    level, kind = (socket.IPPROTO_IP, IP_RECVERR) if family == socket.AF_INET else (socket.IPPROTO_IPV6, IPV6_RECVERR)
+    origin = SO_EE_ORIGIN_ICMP if family == socket.AF_INET else SO_EE_ORIGIN_ICMP6
+    while True:
+        try:
+            data, ancdata, _, _ = sock.recvmsg(512, 512, socket.MSG_ERRQUEUE | socket.MSG_DONTWAIT)
+        except (BlockingIOError, InterruptedError):
+            return
+        if len(data) < _PROBE.size:
+            continue
+        ttl, query = _PROBE.unpack_from(data)
+        for clevel, ctype, cdata in ancdata:
+            if clevel != level or ctype != kind or len(cdata) < _EXTENDED_ERR.size:
+                continue
+            _, ee_origin, icmp_type, icmp_code, _, _, _ = _EXTENDED_ERR.unpack_from(cdata)
+            if ee_origin == origin:
+                yield ttl, query, _offender(family, cdata), icmp_type, icmp_code
+
+
+def trace(host, on_reply=None, max_hops=MAX_HOPS, queries=3, timeout=2.0, stop=None):
+    # Traces the path to host. on_reply(ttl, address, rtt_ms, mark) is called for every
+    # answer as it arrives; mark is '' for a router, 'reached' for the target and
+    # '!H'-style for other unreachables. Returns {'address', 'hops', 'reached'} where hops
+    # holds one {'ttl', 'address', 'rtts', 'mark'} per TTL up to the target (address None
+    # and rtts [None, ...] for silent hops). Raises OSError on unsupported platforms.
+    if not supported():
+        raise OSError('traceroute needs the Linux socket error queue (IP_RECVERR)')
+    family, _, _, _, sockaddr = getaddrinfo(host, type=socket.SOCK_DGRAM)[0]
+    address = sockaddr[0]
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sent = {}
+    replies = {}
+    try:
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+            ttl_opt = (socket.IPPROTO_IP, socket.IP_TTL)
+        else:
+            sock.setsockopt(socket.IPPROTO_IPV6, IPV6_RECVERR, 1)
+            ttl_opt = (socket.IPPROTO_IPV6, socket.IPV6_UNICAST_HOPS)
+        sock.setblocking(False)
+        port = BASE_PORT + (os.getpid() % 1000)
+        # Round by round so a target that rate-limits its ICMP answers still gets one
+        # probe per TTL answered early on
+        for query in range(queries):
+            for ttl in range(1, max_hops + 1):
+                sock.setsockopt(*ttl_opt, ttl)
+                try:
+                    sock.sendto(_PROBE.pack(ttl, query), (address, port))
+                except OSError:
+                    pass  # the error queue reports what went wrong with this probe
+                sent[(ttl, query)] = time.perf_counter()
+        deadline = time.perf_counter() + timeout
+        target = None  # lowest TTL the target answered at
+        poller = select.poll()
+        poller.register(sock, select.POLLERR)
+        while True:
+            if stop and stop():
+                break
+            expected = [key for key in sent if target is None or key[0] <= target]
+            if all(key in replies for key in expected):
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            if not poller.poll(min(remaining, 0.25) * 1000):
+                continue
+            now = time.perf_counter()
+            for ttl, query, router, icmp_type, icmp_code in read_errors(sock, family):
+                key = (ttl, query)
+                if key not in sent or key in replies:
+                    continue
+                if (icmp_type, icmp_code) == _REACHED[family]:
+                    mark = 'reached'
+                elif icmp_type == _TIME_EXCEEDED[family]:
+                    mark = ''
+                else:
+                    mark = _UNREACHABLE[family].get(icmp_code, f'!{icmp_code}')
+                if mark and (target is None or ttl < target):
+                    target = ttl
+                rtt = (now - sent[key]) * 1000
+                replies[key] = (router, rtt, mark)
+                if on_reply and (target is None or ttl <= target):
+                    on_reply(ttl, router, rtt, mark)
+    finally:
+        sock.close()
+    hops = []
+    for ttl in range(1, (target or max_hops) + 1):
+        answers = [replies.get((ttl, query)) for query in range(queries)]
+        seen = [a for a in answers if a]
+        hops.append({'ttl': ttl, 'address': seen[0][0] if seen else None,
+                     'rtts': [a[1] if a else None for a in answers], 'mark': seen[0][2] if seen else ''})
+    return {'address': address, 'hops': hops, 'reached': any(h['mark'] == 'reached' for h in hops)}
+
+
+def format_hops(hops, geo=None):
+    # Text table of trace() hops; geo maps an address to a short location string
+    lines = []
+    for hop in hops:
+        rtts = '  '.join(f'{r:7.1f} ms' if r is not None else '      * ' for r in hop['rtts'])
+        address = hop['address'] or '*'
+        where = (geo or {}).get(hop['address'], '') if hop['address'] else ''
+        mark = hop['mark'] if hop['mark'] != 'reached' else ''
+        notes = ' '.join(text for text in (mark, where) if text)
+        lines.append(f"{hop['ttl']:>2}  {address:<39} {rtts}  {notes}".rstrip())
+    return '\n'.join(lines)
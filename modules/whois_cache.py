@@ -0,0 +1,63 @@
+import json
+import sqlite3
+import time
+from shared.paths import data_path
+
+# WHOIS data changes at most daily, so answers are reused for a day by default
+DEFAULT_MAX_AGE = 86400
+# An empty answer may be a throttled or truncated reply rather than a real one, so it is
+# only reused this long (like dns_cache.NEGATIVE_TTL for failed lookups)
+NEGATIVE_MAX_AGE = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS whois (
+    domain TEXT PRIMARY KEY,
+    fetched REAL NOT NULL,
+    info TEXT NOT NULL
+);
+"""
+
+
+def normalize(info):
+    # The JSON round trip a cached answer goes through (dates become strings)
+    return json.loads(json.dumps(info, default=str))
+
+
+class WhoisCache:
+    # SQLite-backed WHOIS answers keyed by domain. Like ScanHistory, each connection
+    # belongs to the thread that opened it.
+    def __init__(self, path=None):
+        self.path = path or data_path('whois_cache.db')
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, domain, max_age=DEFAULT_MAX_AGE):
+        # Returns (info, age_seconds) for an answer younger than max_age (NEGATIVE_MAX_AGE
+        # for empty answers), else None
+        row = self.conn.execute('SELECT fetched, info FROM whois WHERE domain = ?', (domain.lower(),)).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[0]
+        info = json.loads(row[1])
+        if age > (max_age if any(info.values()) else min(max_age, NEGATIVE_MAX_AGE)):
+            return None
+        return info, age
+
+    def put(self, domain, info, fetched=None):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO whois (domain, fetched, info) VALUES (?, ?, ?)',
+                              (domain.lower(), fetched or time.time(), json.dumps(info, default=str)))
+
+    def purge(self, max_age=DEFAULT_MAX_AGE):
+        # Drops answers older than max_age; returns how many went
+        with self.conn:
+            cur = self.conn.execute('DELETE FROM whois WHERE fetched < ?', (time.time() - max_age,))
+        return cur.rowcount
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM whois')
@@ -0,0 +1,140 @@
+import socket
+import threading
+import time
+from modules.whois_cache import WhoisCache, DEFAULT_MAX_AGE, normalize
+
+# Fields shown for a WHOIS answer, in display order
+WHOIS_FIELDS = ["domain_name", "registrar", "creation_date", "expiration_date", "name_servers", "org", "country", "emails"]
+# Phrases registries use when they refuse to answer because we asked too often; only
+# looked for in replies that carried no WHOIS fields
+_THROTTLE_WORDS = ('rate limit', 'query limit', 'limit exceeded', 'queries exceeded', 'too many',
+                   'quota', 'try again later')
+
+
+class WhoisThrottled(Exception):
+    pass
+
+
+def whois_lookup(domain):
+    # Returns {field: value} for the populated WHOIS_FIELDS; raises on lookup errors
+    # (WhoisThrottled when the registry refused the query)
+    import whois
+    w = whois.whois(domain, ignore_socket_errors=False)
+    info = {}
+    for k in WHOIS_FIELDS:
+        v = w.get(k, None)
+        if v:
+            info[k] = v
+    if not info:
+        text = (getattr(w, 'text', '') or '').lower()
+        if any(word in text for word in _THROTTLE_WORDS):
+            raise WhoisThrottled(f"registry refused the query for {domain} (rate limited)")
+    return info
+
+
+def _whois_errors():
+    # (permanent, quota) exception types of the installed python-whois; releases before
+    # whois.exceptions existed only raise PywhoisError, so both may be empty
+    try:
+        import whois.exceptions as errors
+    except ImportError:
+        return (), ()
+    permanent = tuple(getattr(errors, name) for name in
+                      ('WhoisDomainNotFoundError', 'FailedParsingWhoisOutputError', 'UnknownTldError')
+                      if hasattr(errors, name))
+    quota = (errors.WhoisQuotaExceededError,) if hasattr(errors, 'WhoisQuotaExceededError') else ()
+    return permanent, quota
+
+
+def _throttled(e):
+    # Network failures and explicit refusals are worth a retry after backing off;
+    # "no such domain", parse errors and our own DNS failures are not. Error messages
+    # often carry the raw registry reply, so they are not searched for throttle words.
+    permanent, quota = _whois_errors()
+    if isinstance(e, quota):
+        return True
+    if isinstance(e, permanent) or isinstance(e, socket.gaierror):
+        return False
+    return isinstance(e, (WhoisThrottled, OSError))
+
+
+class _Registry:
+    def __init__(self, rate, burst):
+        from modules.scan_engine import TokenBucket
+        self.lock = threading.Lock()
+        self.bucket = TokenBucket(rate, burst)
+        self.backoff = 0.0
+        self.backoff_until = 0.0
+
+
+class RegistryQueue:
+    # Serializes WHOIS queries per registry (approximated by the TLD, which decides the
+    # server python-whois asks), paces each registry with a token bucket and backs off
+    # exponentially after refusals or network errors. Different registries run in parallel.
+    def __init__(self, rate=0.5, burst=3, retries=3, backoff=5.0, max_backoff=300.0):
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+        self._registries = {}
+        self._lock = threading.Lock()
+
+    def registry_for(self, domain):
+        tld = domain.lower().rstrip('.').rsplit('.', 1)[-1]
+        with self._lock:
+            reg = self._registries.get(tld)
+            if reg is None:
+                reg = self._registries[tld] = _Registry(self.rate, self.burst)
+            return reg
+
+    def run(self, domain, fn=whois_lookup):
+        reg = self.registry_for(domain)
+        with reg.lock:
+            for attempt in range(self.retries + 1):
+                wait = max(0.0, reg.backoff_until - time.monotonic()) + reg.bucket.reserve()
+                if wait:
+                    time.sleep(wait)
+                try:
+                    result = fn(domain)
+                except Exception as e:
+                    if not _throttled(e) or attempt == self.retries:
+                        raise
+                    reg.backoff = min(reg.backoff * 2 if reg.backoff else self.initial_backoff, self.max_backoff)
+                    reg.backoff_until = time.monotonic() + reg.backoff
+                    continue
+                reg.backoff = 0.0
+                return result
+
+
+_queue = RegistryQueue()
+
+
+def cached_whois(domain, max_age=DEFAULT_MAX_AGE, refresh=False):
+    # Returns (info, age_seconds); age is 0 for a fresh answer. Cache misses go through
+    # the shared registry queue and are stored for later runs.
+    domain = domain.strip().lower()
+    cache = WhoisCache()
+    try:
+        if not refresh:
+            hit = cache.get(domain, max_age)
+            if hit is not None:
+                return hit
+        info = normalize(_queue.run(domain))
+        cache.put(domain, info)
+        return info, 0.0
+    finally:
+        cache.close()
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return 'just now'
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f'{minutes}m ago'
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f'{hours}h {minutes}m ago'
+    return f'{hours // 24}d {hours % 24}h ago'
+
@@ -0,0 +1,12 @@
+import os
+
+
+def data_dir():
+    # Per-user storage for caches and history (~/.toolbelt, or $TOOLBELT_HOME)
+    path = os.environ.get('TOOLBELT_HOME') or os.path.join(os.path.expanduser('~'), '.toolbelt')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(name):
+    return os.path.join(data_dir(), name)
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+from PyQt6.QtCore import Qt  # noqa: E402
+
+from modules.dns_table_model import DNSTableModel  # noqa: E402
+from modules.ip_lookup import GEO_ROW_FIELDS, geo_row  # noqa: E402
+
+
+def geo_model():
+    model = DNSTableModel(GEO_ROW_FIELDS, GEO_ROW_FIELDS)
+    model.append_rows([
+        geo_row({'status': 'success', 'query': '8.8.8.8', 'country': 'United States', 'lat': 37.4056, 'lon': -122.0775}),
+        geo_row({'status': 'fail', 'message': 'private range', 'query': '10.0.0.1'}),
+        geo_row({'status': 'success', 'query': '1.1.1.1', 'country': 'Australia', 'lat': -27.4766, 'lon': 153.0166}),
+        geo_row({'status': 'success', 'query': '9.9.9.9', 'country': 'Switzerland', 'lat': 47.3769, 'lon': 8.5417}),
+    ])
+    return model
+
+
+def column(model, field):
+    return [row[field] for row in model.rows()]
+
+
+def test_missing_fields_are_none():
+    row = geo_row({'status': 'fail', 'message': 'private range', 'query': '10.0.0.1'})
+    assert row['lat'] is None and row['country'] is None
+    assert row['status'] == 'private range'
+
+
+@pytest.mark.parametrize('field', ['lat', 'lon', 'country'])
+def test_sort_mixed_rows_puts_empty_cells_last(field):
+    model = geo_model()
+    model.sort(GEO_ROW_FIELDS.index(field), Qt.SortOrder.AscendingOrder)
+    values = column(model, field)
+    assert values[-1] is None
+    assert values[:-1] == sorted(values[:-1])
+    model.sort(GEO_ROW_FIELDS.index(field), Qt.SortOrder.DescendingOrder)
+    assert column(model, field)[1:] == sorted(values[:-1], reverse=True)
+
+
+def test_query_sorts_by_address():
+    model = geo_model()
+    model.sort(GEO_ROW_FIELDS.index('query'))
+    assert column(model, 'query') == ['1.1.1.1', '8.8.8.8', '9.9.9.9', '10.0.0.1']
+
+
+def test_coordinates_are_shown_in_full():
+    model = geo_model()
+    lat = model.index(0, GEO_ROW_FIELDS.index('lat'))
+    assert model.data(lat) == '37.4056'
+    assert model.data(model.index(1, GEO_ROW_FIELDS.index('lat'))) is None
@@ -0,0 +1,56 @@
+from modules.geo_db import GeoDB, RangeIndex, compile_csv
+
+
+def load(tmp_path, text, columns=None):
+    src = tmp_path / 'ranges.csv'
+    src.write_text(text)
+    dest = str(tmp_path / 'geo.tbgeo')
+    summary = compile_csv(str(src), dest, columns)
+    return GeoDB(RangeIndex(dest)), summary
+
+
+def test_dbip_lite_without_header(tmp_path):
+    # Lines exactly as dbip-city-lite-*.csv ships them: no header, continent after end
+    db, summary = load(tmp_path, '8.8.8.0,8.8.8.255,NA,US,California,Mountain View,37.422,-122.085\n'
+                                 '2001:4860::,2001:4860:ffff:ffff:ffff:ffff:ffff:ffff,NA,US,California,Mountain View,37.422,-122.085\n'
+                                 '1.1.1.0,1.1.1.255,OC,AU,Queensland,"South Brisbane",-27.4766,153.0166\n')
+    try:
+        assert summary == {'ranges': 3, 'records': 2, 'skipped': 0}
+        info = db.lookup('8.8.8.8')
+        assert info['status'] == 'success'
+        assert (info['continentCode'], info['countryCode'], info['country']) == ('NA', 'US', 'US')
+        assert (info['regionName'], info['city']) == ('California', 'Mountain View')
+        assert (info['lat'], info['lon']) == (37.422, -122.085)
+        assert db.lookup('2001:4860:4860::8888')['city'] == 'Mountain View'
+        assert db.lookup('1.1.1.1')['city'] == 'South Brisbane'
+    finally:
+        db.close()
+
+
+def test_header_row_names_the_columns(tmp_path):
+    db, _ = load(tmp_path, 'network,country_name,city_name,latitude,longitude\n'
+                           '192.0.2.0/24,Testland,Testville,1.5,-2.25\n')
+    try:
+        info = db.lookup('192.0.2.77')
+        assert (info['country'], info['city'], info['lat'], info['lon']) == ('Testland', 'Testville', 1.5, -2.25)
+    finally:
+        db.close()
+
+
+def test_explicit_columns(tmp_path):
+    db, _ = load(tmp_path, '9.9.9.0,9.9.9.255,Switzerland,,Zurich\n', ['start', 'end', 'country', None, 'city'])
+    try:
+        info = db.lookup('9.9.9.9')
+        assert (info['country'], info['city']) == ('Switzerland', 'Zurich')
+    finally:
+        db.close()
+
+
+def test_uncovered_addresses(tmp_path):
+    db, _ = load(tmp_path, '8.8.8.0,8.8.8.255,NA,US,California,Mountain View,37.422,-122.085\n')
+    try:
+        assert db.lookup('8.8.9.1')['message'] == 'not in offline database'
+        assert db.lookup('10.0.0.1')['message'] == 'private range'
+        assert db.lookup('nonsense')['message'] == 'invalid query'
+    finally:
+        db.close()
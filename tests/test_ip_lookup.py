@@ -0,0 +1,172 @@
+import ipaddress
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from modules.ip_lookup import GeoClient
+
+
+class StandIn(ThreadingHTTPServer):
+    # Local ip-api.com: /json/<ip> and /batch answer every address as a success.
+    # Responses are taken from `script` first ((status, headers) pairs), then default to
+    # 200 with plenty of budget left. Every request is logged as (time, method, path,
+    # posted addresses, client port).
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.script = []
+        self.log = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def answer(self, body):
+        server = self.server
+        status, headers = server.script.pop(0) if server.script else (200, {'X-Rl': '44', 'X-Ttl': '60'})
+        data = json.dumps(body if status == 200 else {'status': 'fail', 'message': 'too many'}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        ip = self.path.split('?')[0].rsplit('/', 1)[-1]
+        self.server.log.append((time.monotonic(), 'GET', self.path, None, self.client_address[1]))
+        self.answer({'status': 'success', 'country': 'Testland', 'query': ip})
+
+    def do_POST(self):
+        ips = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.log.append((time.monotonic(), 'POST', self.path, ips, self.client_address[1]))
+        self.answer([{'status': 'success', 'country': 'Testland', 'query': ip} for ip in ips])
+
+
+@pytest.fixture
+def server():
+    srv = StandIn()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def public_ips(count):
+    return [str(ipaddress.ip_address('8.0.0.1') + i) for i in range(count)]
+
+
+def test_single_trace_reuses_connection(server):
+    client = GeoClient(server.url)
+    for ip in ('8.8.8.8', '1.1.1.1'):
+        assert client.trace(ip) == {'status': 'success', 'country': 'Testland', 'query': ip}
+    assert [entry[1] for entry in server.log] == ['GET', 'GET']
+    assert len({entry[4] for entry in server.log}) == 1
+
+
+def test_waits_out_window_when_budget_is_spent(server):
+    # X-Rl 0 means the next request must wait X-Ttl seconds (plus a little slack)
+    server.script = [(200, {'X-Rl': '0', 'X-Ttl': '1'})]
+    client = GeoClient(server.url)
+    client.trace('8.8.8.8')
+    client.trace('8.8.4.4')
+    first, second = server.log[0][0], server.log[1][0]
+    assert second - first >= 1.4
+
+
+def test_no_wait_while_budget_remains(server):
+    server.script = [(200, {'X-Rl': '1', 'X-Ttl': '30'})]
+    client = GeoClient(server.url)
+    start = time.monotonic()
+    client.trace('8.8.8.8')
+    client.trace('8.8.4.4')
+    assert time.monotonic() - start < 1
+
+
+def test_retries_after_429(server):
+    server.script = [(429, {'X-Rl': '0', 'X-Ttl': '0'})]
+    client = GeoClient(server.url)
+    assert client.trace('8.8.8.8')['status'] == 'success'
+    assert len(server.log) == 2
+    assert server.log[1][0] - server.log[0][0] >= 0.4
+
+
+def test_gives_up_after_retries(server):
+    server.script = [(429, {'X-Rl': '0', 'X-Ttl': '0'})] * 10
+    client = GeoClient(server.url)
+    client.RETRIES = 1
+    with pytest.raises(requests.HTTPError):
+        client.trace('8.8.8.8')
+    assert len(server.log) == 2
+
+
+def test_429_without_headers_backs_off_a_minute():
+    client = GeoClient('http://127.0.0.1:9')
+    resp = requests.Response()
+    resp.status_code = 429
+    client._pace(resp)
+    assert 60 < client._resume - time.monotonic() <= 60.5
+
+
+def test_trace_many_splits_into_batches(server):
+    ips = public_ips(250)
+    results = []
+    GeoClient(server.url).trace_many(ips, results.append)
+    posts = [entry for entry in server.log if entry[1] == 'POST']
+    assert [len(entry[3]) for entry in posts] == [100, 100, 50]
+    assert all(entry[2].startswith('/batch?fields=') for entry in posts)
+    assert [data['query'] for data in results] == ips
+
+
+def test_trace_many_answers_private_and_reserved_locally(server):
+    results = []
+    # 100.64.0.0/10 (carrier-grade NAT) is neither global nor private
+    GeoClient(server.url).trace_many(['10.1.2.3', '127.0.0.1', 'fe80::1', '100.64.0.1'], results.append)
+    assert server.log == []
+    assert [(data['query'], data['status'], data['message']) for data in results] == [
+        ('10.1.2.3', 'fail', 'private range'),
+        ('127.0.0.1', 'fail', 'private range'),
+        ('fe80::1', 'fail', 'private range'),
+        ('100.64.0.1', 'fail', 'reserved range'),
+    ]
+
+
+def test_trace_many_sends_only_public_addresses(server):
+    results = []
+    GeoClient(server.url).trace_many(['192.168.0.1', '8.8.8.8', '10.0.0.1', '1.1.1.1'], results.append)
+    assert [entry[3] for entry in server.log] == [['8.8.8.8', '1.1.1.1']]
+    assert {data['query'] for data in results} == {'192.168.0.1', '8.8.8.8', '10.0.0.1', '1.1.1.1'}
+
+
+def test_trace_many_stops_between_batches(server):
+    results = []
+    GeoClient(server.url).trace_many(public_ips(300), results.append, stop=lambda: len(results) >= 100)
+    assert len(server.log) == 1 and len(results) == 100
+
+
+
+def test_stop_while_waiting_sends_nothing(server):
+    server.script = [(200, {'X-Rl': '0', 'X-Ttl': '60'})]
+    client = GeoClient(server.url)
+    client.trace('8.8.8.8')
+    stopped = threading.Event()
+    threading.Timer(0.3, stopped.set).start()
+    results = []
+    start = time.monotonic()
+    client.trace_many(public_ips(150), results.append, stop=stopped.is_set)
+    assert time.monotonic() - start < 2
+    assert len(server.log) == 1 and results == []
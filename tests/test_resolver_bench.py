@@ -0,0 +1,153 @@
+import socket
+import threading
+
+import pytest
+
+from modules import resolver_bench
+from modules.resolver_bench import summarize
+
+A = ('example.com', 'A')
+MX = ('example.com', 'MX')
+GONE = ('nonexistent.invalid', 'A')
+
+
+def by_resolver(rows):
+    return {row['resolver']: row for row in rows}
+
+
+def test_majority_answer_decides_consistency():
+    answers = {
+        'r1': {A: frozenset({'192.0.2.1'}), GONE: 'NXDOMAIN'},
+        'r2': {A: frozenset({'192.0.2.1'}), GONE: 'NXDOMAIN'},
+        # Hijacks the missing name, and answers the address with something else
+        'r3': {A: frozenset({'203.0.113.9'}), GONE: frozenset({'203.0.113.9'})},
+    }
+    samples = {spec: [10.0, 10.0] for spec in answers}
+    rows = by_resolver(summarize(list(answers), samples, answers))
+    assert rows['r1']['consistency'] == rows['r2']['consistency'] == 1.0
+    assert rows['r3']['consistency'] == 0.0
+    assert rows['r1']['healthy'] and not rows['r3']['healthy']
+
+
+def test_overlapping_address_sets_agree():
+    # CDN answers rotate through a pool; sharing any address counts as the same answer
+    answers = {
+        'r1': {A: frozenset({'192.0.2.1', '192.0.2.2'})},
+        'r2': {A: frozenset({'192.0.2.2', '192.0.2.3'})},
+        'r3': {A: frozenset({'192.0.2.3'})},
+    }
+    samples = {spec: [5.0] for spec in answers}
+    rows = summarize(list(answers), samples, answers)
+    assert all(row['consistency'] == 1.0 for row in rows)
+
+
+def test_timed_out_queries_are_not_compared():
+    answers = {
+        'r1': {A: frozenset({'192.0.2.1'}), MX: frozenset({'10 mx.example.com.'})},
+        'r2': {A: frozenset({'192.0.2.1'}), MX: None},
+    }
+    samples = {'r1': [5.0, 5.0], 'r2': [5.0, None]}
+    rows = by_resolver(summarize(list(answers), samples, answers))
+    assert rows['r2']['consistency'] == 1.0
+    assert rows['r2']['timeout_rate'] == 0.5
+
+
+def test_timeouts_make_a_resolver_unhealthy():
+    answers = {'fast': {A: frozenset({'192.0.2.1'})}, 'flaky': {A: frozenset({'192.0.2.1'})},
+               'dead': {A: None}}
+    samples = {
+        'fast': [5.0] * 10,
+        # One timeout in ten is still within MAX_TIMEOUT_RATE, two are not
+        'flaky': [1.0] * 8 + [None] * 2,
+        'dead': [None] * 10,
+    }
+    rows = by_resolver(summarize(list(answers), samples, answers))
+    assert rows['fast']['healthy']
+    assert rows['flaky']['timeout_rate'] == 0.2 and not rows['flaky']['healthy']
+    assert rows['dead']['answered'] == 0 and rows['dead']['p50'] is None
+    assert rows['dead']['consistency'] is None and not rows['dead']['healthy']
+    samples['flaky'] = [1.0] * 9 + [None]
+    assert by_resolver(summarize(list(answers), samples, answers))['flaky']['healthy']
+
+
+def test_ranking_puts_fastest_healthy_first():
+    answers = {spec: {A: frozenset({'192.0.2.1'})} for spec in ('slow', 'fast', 'fastest-but-broken')}
+    answers['fastest-but-broken'][A] = 'ERROR'
+    samples = {'slow': [40.0, 50.0, 60.0], 'fast': [8.0, 9.0, 30.0], 'fastest-but-broken': [1.0, 1.0, 1.0]}
+    rows = summarize(list(answers), samples, answers)
+    assert [row['resolver'] for row in rows] == ['fast', 'slow', 'fastest-but-broken']
+    assert [row['best'] for row in rows] == [True, False, False]
+    assert rows[0]['p50'] == 9.0 and rows[0]['p90'] == 30.0 and rows[0]['max'] == 30.0
+
+
+def test_no_best_when_nothing_is_healthy():
+    answers = {'r1': {A: None}, 'r2': {A: None}}
+    samples = {'r1': [None], 'r2': [None]}
+    rows = summarize(list(answers), samples, answers)
+    assert not any(row['best'] or row['healthy'] for row in rows)
+
+
+@pytest.mark.parametrize('spec, target', [
+    ('system', None),
+    ('1.1.1.1', ('1.1.1.1', 53)),
+    ('127.0.0.1:5353', ('127.0.0.1', 5353)),
+    ('[::1]:5353', ('::1', 5353)),
+    ('2001:db8::53', ('2001:db8::53', 53)),
+])
+def test_parse_spec(spec, target):
+    assert resolver_bench.parse_spec(spec) == target
+
+
+def stub_server(address):
+    # UDP DNS server on loopback: answers A queries with `address`, or never answers
+    # when address is None. Returns (spec, close).
+    import dns.message
+    import dns.rrset
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(0.1)
+    done = threading.Event()
+
+    def serve():
+        while not done.is_set():
+            try:
+                data, peer = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if address is None:
+                continue
+            query = dns.message.from_wire(data)
+            reply = dns.message.make_response(query)
+            question = query.question[0]
+            reply.answer.append(dns.rrset.from_text(question.name, 300, 'IN', 'A', address))
+            sock.sendto(reply.to_wire(), peer)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+
+    def close():
+        done.set()
+        thread.join()
+        sock.close()
+
+    return f'127.0.0.1:{sock.getsockname()[1]}', close
+
+
+def test_bench_against_stub_servers():
+    pytest.importorskip('dns.asyncresolver')
+    servers = [stub_server('192.0.2.1'), stub_server('192.0.2.1'), stub_server('203.0.113.9'), stub_server(None)]
+    good, also_good, liar, silent = [spec for spec, _ in servers]
+    try:
+        rows = resolver_bench.bench([good, also_good, liar, silent], queries=[A, ('example.org', 'A')],
+                                    rounds=2, deadline=0.3)
+    finally:
+        for _, close in servers:
+            close()
+    rows = by_resolver(rows)
+    assert rows[good]['healthy'] and rows[also_good]['healthy']
+    assert rows[good]['sent'] == 4 and rows[good]['timeout_rate'] == 0.0
+    assert rows[liar]['consistency'] == 0.0 and not rows[liar]['healthy']
+    assert rows[silent]['timeout_rate'] == 1.0 and not rows[silent]['healthy']
+    assert rows[good]['best'] or rows[also_good]['best']
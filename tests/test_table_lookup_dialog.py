@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+from modules.table_lookup_dialog import TableLookupDialog  # noqa: E402
+
+
+def test_incomplete_subclass_fails_when_created():
+    class NoJob(TableLookupDialog):
+        def add_inputs(self, layout):
+            pass
+
+    with pytest.raises(TypeError, match='make_job'):
+        NoJob()
@@ -0,0 +1,27 @@
+import time
+
+from modules.whois_cache import DEFAULT_MAX_AGE, NEGATIVE_MAX_AGE, WhoisCache
+
+
+def test_answers_are_reused_for_max_age(tmp_path):
+    cache = WhoisCache(str(tmp_path / 'whois.db'))
+    try:
+        cache.put('Example.com', {'registrar': 'Example Registrar'}, fetched=time.time() - 3600)
+        info, age = cache.get('example.com')
+        assert info == {'registrar': 'Example Registrar'} and 3590 < age < 3610
+        assert cache.get('example.com', max_age=60) is None
+    finally:
+        cache.close()
+
+
+def test_empty_answers_expire_early(tmp_path):
+    cache = WhoisCache(str(tmp_path / 'whois.db'))
+    try:
+        cache.put('fresh.example', {})
+        cache.put('stale.example', {}, fetched=time.time() - NEGATIVE_MAX_AGE - 1)
+        cache.put('blank.example', {'registrar': '', 'name_servers': []}, fetched=time.time() - NEGATIVE_MAX_AGE - 1)
+        assert cache.get('fresh.example') is not None
+        assert cache.get('stale.example', DEFAULT_MAX_AGE) is None
+        assert cache.get('blank.example', DEFAULT_MAX_AGE) is None
+    finally:
+        cache.close()